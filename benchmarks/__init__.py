@@ -0,0 +1 @@
+"""Synthetic-data benchmarks; never point these tools at real statements."""
@@ -0,0 +1,46 @@
+"""Compare two benchmark result files stage by stage.
+
+Usage: ``python -m benchmarks.compare BASELINE.json CANDIDATE.json``
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any
+
+CaseKey = tuple[str, int, str]
+
+
+def _throughput(path: Path) -> dict[CaseKey, float | None]:
+    payload: dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+    return {
+        (case["statement_type"], case["rows"], stage["stage"]): stage["rows_per_second"]
+        for case in payload["cases"]
+        for stage in case["stages"]
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    args = parser.parse_args(argv)
+
+    baseline = _throughput(args.baseline)
+    candidate = _throughput(args.candidate)
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[key], candidate[key]
+        if not before or not after:
+            continue
+        statement_type, rows, stage = key
+        print(
+            f"{statement_type:<12} {rows:>10} {stage:<9} "
+            f"{before:>14.1f} -> {after:>14.1f} rows/s ({after / before:.2f}x)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,175 @@
+"""Time parse, clean, write and snapshot stages on synthetic statements.
+
+Run ``python -m benchmarks.pipeline --rows 1000 100000`` from the repository
+root. Each (type, size) case runs in a fresh interpreter so that peak RSS is
+not inflated by earlier cases. Results are written as JSON for comparison
+across commits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from benchmarks.synthetic import (
+    FORMATS,
+    SYNTHETIC_YEAR,
+    synthetic_suffix,
+    write_statement,
+)
+
+RESULT_SCHEMA_VERSION = 1
+DEFAULT_ROWS = (1_000, 10_000, 100_000, 1_000_000)
+SNAPSHOT_MONTH = f"{SYNTHETIC_YEAR}-07"
+
+
+def _peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _stage(name: str, rows: int, started: float) -> dict[str, Any]:
+    seconds = time.perf_counter() - started
+    return {
+        "stage": name,
+        "rows": rows,
+        "seconds": round(seconds, 6),
+        "rows_per_second": round(rows / seconds, 1) if seconds > 0 else None,
+        "peak_rss_bytes": _peak_rss_bytes(),
+    }
+
+
+def run_case(statement_type: str, rows: int, seed: int = 0) -> dict[str, Any]:
+    """Benchmark one synthetic statement; ``peak_rss_bytes`` is cumulative."""
+    from src.kakeibo.domain.cleaning import CleaningPipeline
+    from src.kakeibo.monthly_snapshot import build_monthly_snapshot
+    from src.kakeibo.statement_types import STATEMENT_TYPES
+
+    spec = STATEMENT_TYPES[statement_type]
+    stages: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="kakeibo-bench-") as temp_dir:
+        work = Path(temp_dir)
+        source = write_statement(
+            statement_type,
+            rows,
+            work / f"synthetic{synthetic_suffix(statement_type)}",
+            seed=seed,
+        )
+        parser = spec.parser_factory()
+
+        started = time.perf_counter()
+        raw = parser.parse(source, spec.encoding)
+        stages.append(_stage("parse", raw.height, started))
+
+        started = time.perf_counter()
+        cleaned = CleaningPipeline().process(raw, statement_type)
+        stages.append(_stage("clean", cleaned.height, started))
+
+        normalized = work / "normalized.csv"
+        started = time.perf_counter()
+        cleaned.write_csv(normalized)
+        stages.append(_stage("write", cleaned.height, started))
+
+        started = time.perf_counter()
+        build_monthly_snapshot(
+            month=SNAPSHOT_MONTH,
+            input_paths=[normalized],
+            artifact_root=work / "artifacts",
+            fx_source="synthetic://fx",
+            fx_retrieved_at=f"{SYNTHETIC_YEAR}-08-01T00:00:00Z",
+        )
+        stages.append(_stage("snapshot", cleaned.height, started))
+
+        input_bytes = source.stat().st_size
+
+    return {
+        "statement_type": statement_type,
+        "rows": rows,
+        "seed": seed,
+        "input_bytes": input_bytes,
+        "stages": stages,
+    }
+
+
+def _run_isolated(statement_type: str, rows: int, seed: int) -> dict[str, Any]:
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes=1) as pool:
+        return pool.apply(run_case, (statement_type, rows, seed))
+
+
+def _git_commit() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def _environment() -> dict[str, Any]:
+    import polars as pl
+
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "polars": pl.__version__,
+        "platform": platform.platform(),
+        "cpu_count": multiprocessing.cpu_count(),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--types",
+        nargs="+",
+        choices=sorted(FORMATS),
+        default=sorted(FORMATS),
+    )
+    parser.add_argument("--rows", nargs="+", type=int, default=list(DEFAULT_ROWS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    environment = _environment()
+    cases = []
+    for statement_type in args.types:
+        for rows in args.rows:
+            case = _run_isolated(statement_type, rows, args.seed)
+            cases.append(case)
+            summary = " ".join(
+                f"{stage['stage']}={stage['rows_per_second']}rows/s"
+                for stage in case["stages"]
+            )
+            print(f"{statement_type} rows={rows} {summary}", flush=True)
+
+    output = args.output or Path(
+        "bench-results", f"{environment['commit'] or 'worktree'}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "schema_version": RESULT_SCHEMA_VERSION,
+        "environment": environment,
+        "cases": cases,
+    }
+    output.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    print(f"results={output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,166 @@
+"""Compare Rakuten order HTML extraction engines on synthetic bundles.
+
+Run ``python -m benchmarks.rakuten_html --records 1000 10000`` from the
+repository root. Orders are generated deterministically from the seed and
+carry the page chrome, entities, comments and scripts of rendered history
+pages, but no real merchant or purchase data.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from collections.abc import Callable
+from datetime import date, timedelta
+from typing import Any
+
+from src.kakeibo.commerce_history.hashing import raw_record_sha256
+
+DEFAULT_RECORDS = (1_000, 10_000)
+_ITEM_ROW = "flex-row-start--1GHo9 padding-all-xlarge--1DSZs"
+
+
+def _chrome(rng: random.Random, depth: int) -> str:
+    # Layout noise outside item rows: nested divs, icons and tracking attrs.
+    return (
+        "".join(
+            f'<div class="layout--{rng.randrange(10**6):06x} text-small--2tWgE" '
+            f'data-ratid="ph_pc_{index}" style="margin:0 {index}px">'
+            f'<span class="icon--3K7dL"><img src="https://r.r10s.jp/i{index}.svg" '
+            f'alt="" width="16" height="16"></span>'
+            f"<!-- slot {index} -->"
+            for index in range(depth)
+        )
+        + "</div>" * depth
+    )
+
+
+def _item(rng: random.Random, index: int, price: int) -> str:
+    bookmark = (
+        "https://my.bookmark.rakuten.co.jp/item/add?"
+        f"shop_bid={rng.randrange(1, 10**6)}&amp;iid={rng.randrange(1, 10**8)}"
+    )
+    if rng.random() < 0.1:
+        name = (
+            '<div class="text--unavailable">商品ページがありません</div>'
+            f"<div><span>Synthetic unavailable item {index}</span></div>"
+        )
+    else:
+        name = (
+            f'<a class="item-name--1zZ3H" href="https://item.rakuten.co.jp/'
+            f'synthetic/{index}/?s-id=ph_pc_itemname&amp;l-id=x">'
+            f"Synthetic item {index} &amp; accessory</a>"
+        )
+    return (
+        f'<div class="{_ITEM_ROW}" data-index="{index}">'
+        '<div class="thumbnail--2G7Zg"><img src="https://thumbnail.image.'
+        f'rakuten.co.jp/{index}.jpg" alt="synthetic"></div>'
+        f'<div class="item-info--3LbuD">{name}'
+        f'<div class="price--3bK9e"><div class="value--21p0x">{price:,}</div>'
+        "<span>円</span></div>"
+        '<div class="actions"><a href="https://review.rakuten.co.jp/">'
+        "商品レビューを書く</a>"
+        f'<a href="{bookmark}">お気に入りに追加する</a>'
+        "<button type=button>リンクをコピー</button></div>"
+        "</div></div>"
+    )
+
+
+def synthetic_rakuten_record(
+    position: int, order_date: date, rng: random.Random
+) -> dict[str, Any]:
+    order_id = f"{rng.randrange(100000, 999999)}-{order_date:%Y%m%d}-{position:07d}"
+    items = "".join(
+        _item(rng, index, rng.randrange(100, 30_000))
+        for index in range(1, rng.randint(1, 4) + 1)
+    )
+    html = (
+        "<section class='order--1a2b3'>"
+        f"{_chrome(rng, 6)}"
+        '<script>window.__RAT={"pageType":"purchase_history","a":1<2};</script>'
+        '<div class="shop--2xYz1"><a href="https://www.rakuten.co.jp/synthetic/'
+        '?l-id=ph_pc_shopname">Synthetic Shop &amp; Co.</a></div>'
+        f"{items}{_chrome(rng, 3)}</section>"
+    )
+    text = f"注文日：{order_date:%Y/%m/%d} 注文番号：{order_id}"
+    return {
+        "source": "rakuten.co.jp",
+        "captured_at": "2026-08-10T00:00:00Z",
+        "partition": str(order_date.year),
+        "page": str(position // 25 + 1),
+        "record_position": position,
+        "source_page_url": "https://order.my.rakuten.co.jp/",
+        "rendered_html": html,
+        "rendered_text": text,
+        "raw_record_sha256": raw_record_sha256(rendered_html=html, rendered_text=text),
+    }
+
+
+def synthetic_rakuten_bundle(records: int, seed: int = 0) -> dict[str, Any]:
+    rng = random.Random(seed)
+    start = date(2026, 1, 1)
+    return {
+        "source": "rakuten.co.jp",
+        "capture_status": "PASS",
+        "field_coverage_status": "PASS",
+        "reported_records": records,
+        "records": [
+            synthetic_rakuten_record(
+                position, start + timedelta(days=position % 365), rng
+            )
+            for position in range(1, records + 1)
+        ],
+    }
+
+
+def _rate(records: int, run: Callable[[], object]) -> dict[str, float]:
+    started = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - started
+    return {
+        "seconds": round(seconds, 6),
+        "records_per_second": round(records / seconds, 1) if seconds > 0 else 0.0,
+    }
+
+
+def run_case(records: int, seed: int = 0) -> dict[str, Any]:
+    """Time both extraction engines and the full bundle parse."""
+    from src.kakeibo.commerce_history.parsers import parse_rakuten_bundle
+    from src.kakeibo.commerce_history.parsers.rakuten_jp import (
+        _RakutenOrderHTMLParser,
+        _scan_order_html,
+    )
+
+    bundle = synthetic_rakuten_bundle(records, seed)
+    pages = [record["rendered_html"] for record in bundle["records"]]
+
+    def stdlib_engine() -> None:
+        for page in pages:
+            _RakutenOrderHTMLParser().feed(page)
+
+    def tokenizer_engine() -> None:
+        for page in pages:
+            _scan_order_html(page)
+
+    return {
+        "records": records,
+        "html_bytes": sum(len(page.encode("utf-8")) for page in pages),
+        "html_parser": _rate(records, stdlib_engine),
+        "tokenizer": _rate(records, tokenizer_engine),
+        "bundle_parse": _rate(records, lambda: parse_rakuten_bundle(bundle)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, nargs="+", default=DEFAULT_RECORDS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    results = [run_case(records, args.seed) for records in args.records]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Deterministic synthetic statements for every registered statement type."""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Callable, Iterator
+from datetime import date, timedelta
+from pathlib import Path
+
+from src.kakeibo.statement_types import STATEMENT_TYPES
+
+SYNTHETIC_YEAR = 2026
+_MERCHANTS = tuple(f"SYNTHETIC MERCHANT {index:03d}" for index in range(200))
+_CHUNK_ROWS = 50_000
+
+Row = tuple[date, int, str]
+LineFormatter = Callable[[Row, int], str]
+
+
+def _rows(count: int, seed: int) -> Iterator[Row]:
+    generator = random.Random(seed)
+    start = date(SYNTHETIC_YEAR, 1, 1)
+    for _ in range(count):
+        day = start + timedelta(days=generator.randrange(365))
+        amount = generator.randrange(100, 200_000)
+        if generator.random() < 0.2:
+            amount = -amount
+        yield day, amount, generator.choice(_MERCHANTS)
+
+
+def _sony_line(row: Row, balance: int) -> str:
+    day, amount, merchant = row
+    kind = "給与入金" if amount < 0 else "振込"
+    return (
+        f"{day.year}年{day.month}月{day.day}日 {kind} {abs(amount):,}円 "
+        f"{merchant} {balance:,}円"
+    )
+
+
+def _card_line(row: Row, _: int) -> str:
+    day, amount, merchant = row
+    return f"{day:%Y/%m/%d},{merchant},本人,1回払い,{amount},0,{amount}"
+
+
+def _transaction_line(row: Row, _: int) -> str:
+    day, amount, merchant = row
+    return f"{day.isoformat()},{merchant},{amount}"
+
+
+def _generic_line(row: Row, _: int) -> str:
+    day, amount, merchant = row
+    return f"{day:%Y/%m/%d},{merchant},{amount}"
+
+
+_CARD_HEADER = "利用日,利用店名・商品名,利用者,支払方法,利用金額,支払手数料,支払総額"
+FORMATS: dict[str, tuple[str | None, LineFormatter]] = {
+    "sony": (None, _sony_line),
+    "enavi": (_CARD_HEADER, _card_line),
+    "aplus": (_CARD_HEADER.replace("支払総額", "支払金額"), _card_line),
+    "transaction": ("Date,Description,Amount", _transaction_line),
+    "generic": ("日付,摘要,出金", _generic_line),
+}
+
+
+def synthetic_suffix(statement_type: str) -> str:
+    return STATEMENT_TYPES[statement_type].allowed_suffixes[0]
+
+
+def write_statement(statement_type: str, rows: int, path: Path, seed: int = 0) -> Path:
+    """Write ``rows`` synthetic lines in the type's registered encoding.
+
+    Output depends only on ``statement_type``, ``rows`` and ``seed`` and is
+    written in chunks so that multi-million-row files stay cheap to generate.
+    """
+    spec = STATEMENT_TYPES[statement_type]
+    header, formatter = FORMATS[statement_type]
+    balance = 10_000_000
+    with path.open("w", encoding=spec.encoding, newline="\n") as handle:
+        if header is not None:
+            handle.write(header + "\n")
+        chunk: list[str] = []
+        for row in _rows(rows, seed):
+            balance -= row[1]
+            chunk.append(formatter(row, abs(balance)))
+            if len(chunk) >= _CHUNK_ROWS:
+                handle.write("\n".join(chunk) + "\n")
+                chunk.clear()
+        if chunk:
+            handle.write("\n".join(chunk) + "\n")
+    return path
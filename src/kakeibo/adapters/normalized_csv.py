@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from pathlib import Path
+
+import polars as pl
+
+from src.kakeibo.domain.categorization import (
+    CATEGORIZED_SCHEMA,
+    CATEGORY_COLUMNS,
+)
+
+
+def _typed_columns(names: Sequence[str]) -> list[pl.Expr]:
+    # schema_overrides with names absent from the header are applied by
+    # position, so cast only the columns that the file actually has.
+    return [
+        pl.col(name).cast(dtype)
+        for name, dtype in CATEGORIZED_SCHEMA.items()
+        if name in names
+    ]
+
+
+def read_normalized_csv(path: Path) -> pl.DataFrame:
+    """Read a private normalized CSV with the CleaningPipeline column types."""
+    frame = pl.read_csv(path, infer_schema=False)
+    return frame.with_columns(_typed_columns(frame.columns))
+
+
+def scan_normalized_csv(paths: Sequence[Path]) -> pl.LazyFrame:
+    """Lazily scan normalized CSVs, with or without category columns."""
+    if not paths:
+        return pl.LazyFrame(schema=CATEGORIZED_SCHEMA)
+    scans = []
+    for path in paths:
+        scan = pl.scan_csv(path, infer_schema=False)
+        names = scan.collect_schema().names()
+        # Outputs written before categorization existed have no category
+        # columns; add them as null like the ledger's v2 migration does.
+        missing = [
+            pl.lit(None, dtype=CATEGORIZED_SCHEMA[name]).alias(name)
+            for name in CATEGORY_COLUMNS
+            if name not in names
+        ]
+        scans.append(scan.with_columns(*_typed_columns(names), *missing))
+    return pl.concat(scans, how="diagonal_relaxed")
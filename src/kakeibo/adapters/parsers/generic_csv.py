@@ -1,72 +1,129 @@
+import codecs
+import csv
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 import polars as pl
 
-from src.kakeibo.ports.parser import ParserPort
+from src.kakeibo.ports.parser import RAW_SCHEMA, ParserPort, StatementSource
+
+# 正規化後のカラム名ごとの候補。先に並ぶ候補を優先する。
+# 入金・出金が分かれている場合と符号付きの場合があるが、genericな明細は
+# クレジットカード明細が中心なので金額は raw_withdrawal として扱う。
+COLUMN_CANDIDATES = {
+    "raw_date": ("利用日", "日付", "年月日", "Date"),
+    "raw_description": ("利用店名・商品名", "利用店名", "摘要", "内容", "Description"),
+    "raw_withdrawal": ("支払総額", "支払金額", "出金", "Amount"),
+}
+
+EXPECTED_COLUMNS = list(RAW_SCHEMA)
+
+_UTF8_ENCODINGS = {"utf-8", "utf-8-sig", "utf8"}
+_TRANSCODE_CHUNK_BYTES = 1024 * 1024
+
+
+def _read_header(source: Path | bytes, encoding: str) -> list[str]:
+    """先頭行だけを読み、前後の空白とBOMを除いたヘッダー名を返す。"""
+    if isinstance(source, Path):
+        with source.open(encoding=encoding, newline="") as handle:
+            line = handle.readline()
+    else:
+        end = source.find(b"\n")
+        line = source[: end if end >= 0 else len(source)].decode(encoding)
+    names = next(csv.reader([line]), [])
+    return [name.lstrip("\ufeff").strip() for name in names]
+
+
+def resolve_column_mapping(header: list[str]) -> dict[int, str]:
+    """ヘッダー名から、読み込む列位置と正規化後のカラム名を決める。"""
+    mapping: dict[int, str] = {}
+    for target, candidates in COLUMN_CANDIDATES.items():
+        for candidate in candidates:
+            if candidate in header:
+                mapping[header.index(candidate)] = target
+                break
+    return mapping
+
+
+@contextmanager
+def _utf8_path(source: Path, encoding: str) -> Iterator[Path]:
+    """UTF-8以外の明細は、一定サイズずつ一時ファイルへUTF-8変換してから読む。"""
+    if encoding.lower().replace("_", "-") in _UTF8_ENCODINGS:
+        yield source
+        return
+    with tempfile.TemporaryDirectory(prefix="kakeibo-private-") as temp_dir:
+        converted = Path(temp_dir) / "statement.csv"
+        decoder = codecs.getincrementaldecoder(encoding)()
+        with (
+            source.open("rb") as reader,
+            converted.open("w", encoding="utf-8") as writer,
+        ):
+            for chunk in iter(lambda: reader.read(_TRANSCODE_CHUNK_BYTES), b""):
+                writer.write(decoder.decode(chunk))
+            writer.write(decoder.decode(b"", final=True))
+        yield converted
+
+
+def _select_mapped(
+    df: pl.DataFrame, mapping: dict[int, str], positions: list[int]
+) -> pl.DataFrame:
+    df = df.rename(
+        {
+            column: mapping[position]
+            for column, position in zip(df.columns, positions, strict=True)
+            if position in mapping
+        }
+    )
+
+    # マッピングできなかったカラムは null列として追加する
+    for col in EXPECTED_COLUMNS:
+        if col not in df.columns:
+            df = df.with_columns(pl.lit(None).cast(pl.Utf8).alias(col))
+
+    return df.select(EXPECTED_COLUMNS)
 
 
 class GenericCsvParser(ParserPort):
-    def parse(self, file_path: Path, encoding: str) -> pl.DataFrame:
+    def parse(self, source: StatementSource, encoding: str) -> pl.DataFrame:
         """
         一般的なCSVをパースする。
-        ヘッダーが含まれていることを前提とし、カラム名マッピングを行う。
+        ヘッダー行からカラム名マッピングを先に決め、使用する列だけを読み込む。
         """
-        # PolarsでCSV読み込み
-        try:
-            df = pl.read_csv(
-                file_path, encoding=encoding, has_header=True, infer_schema_length=0
-            )
-        except Exception:
-            # 失敗時はスキップ行数を変えるなどのリトライが必要かもしれないが、一旦シンプルに
-            # 読み込みエラーの場合は空DFを返すかエラーを上げる
-            raise
-
-        # カラム名の正規化 (スペース除去など)
-        df = df.rename({col: col.strip() for col in df.columns})
-
-        # 必要なカラムが存在するかチェックし、マッピング
-        # ここでは一般的なカラム名を想定
-        column_mapping = {}
-
-        # 利用日/日付
-        for col in ["利用日", "日付", "年月日", "Date"]:
-            if col in df.columns:
-                column_mapping[col] = "raw_date"
-                break
-
-        # 利用店名/摘要
-        for col in ["利用店名・商品名", "利用店名", "摘要", "内容", "Description"]:
-            if col in df.columns:
-                column_mapping[col] = "raw_description"
-                break
-
-        # 支払総額/金額
-        # 入金・出金が分かれている場合と、符号付きの場合がある
-
-        # 支払金額(出金)
-        for col in ["支払総額", "支払金額", "出金", "Amount"]:
-            if col in df.columns:
-                # ここは "raw_withdrawal" か "raw_amount" か迷うが、
-                # genericな場合、まずは raw_amount に入れて pipeline で処理分けするか、
-                # ここで分岐する。
-                # とりあえず raw_withdrawal 扱いにしておく (クレジットカード明細は基本出金のみなので)
-                column_mapping[col] = "raw_withdrawal"
-                break
+        # Polarsはファイル記述子を持つストリームでencodingを無視するため、本文を取り出して渡す
+        if not isinstance(source, Path | bytes):
+            source = source.read()
 
-        # もしマッピングできればリネーム、なければ null列を追加
-        df = df.rename(column_mapping)
+        mapping = resolve_column_mapping(_read_header(source, encoding))
+        # マッピングできる列が無い場合も行数を保つため、先頭列だけは読む
+        positions = sorted(mapping) or [0]
 
-        expected_cols = [
-            "raw_date",
-            "raw_deposit",
-            "raw_withdrawal",
-            "raw_description",
-            "raw_balance",
-            "raw_memo",
-        ]
+        df = pl.read_csv(
+            source,
+            encoding=encoding,
+            has_header=True,
+            infer_schema_length=0,
+            columns=positions,
+        )
+        return _select_mapped(df, mapping, positions)
 
-        for col in expected_cols:
-            if col not in df.columns:
-                df = df.with_columns(pl.lit(None).cast(pl.Utf8).alias(col))
+    def iter_batches(
+        self, source: StatementSource, encoding: str, batch_rows: int
+    ) -> Iterator[pl.DataFrame]:
+        """
+        ファイル全体を読み込まず、batch_rows 行ずつ使用する列だけを返す。
+        メモリ上の本文は既に展開済みなので、全体をパースしてから分割する。
+        """
+        if not isinstance(source, Path):
+            yield from super().iter_batches(source, encoding, batch_rows)
+            return
 
-        return df.select(expected_cols)
+        with _utf8_path(source, encoding) as utf8_source:
+            mapping = resolve_column_mapping(_read_header(utf8_source, "utf-8-sig"))
+            positions = sorted(mapping) or [0]
+            lazy = pl.scan_csv(utf8_source, has_header=True, infer_schema=False)
+            for batch in lazy.select(pl.nth(positions)).collect_batches(
+                chunk_size=batch_rows
+            ):
+                yield _select_mapped(batch, mapping, positions)
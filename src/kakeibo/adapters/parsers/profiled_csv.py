@@ -1,10 +1,16 @@
 from __future__ import annotations
 
-from pathlib import Path
+from collections.abc import Iterator
 
 import polars as pl
 
 from src.kakeibo.adapters.parsers.generic_csv import GenericCsvParser
+from src.kakeibo.ports.parser import StatementSource
+
+
+def _require_utf8(encoding: str) -> None:
+    if encoding.lower().replace("_", "-") not in {"utf-8", "utf-8-sig"}:
+        raise ValueError("transaction history requires UTF-8 encoding")
 
 
 class EnaviCsvParser(GenericCsvParser):
@@ -18,7 +24,12 @@ class AplusCsvParser(GenericCsvParser):
 class TransactionHistoryCsvParser(GenericCsvParser):
     """Explicit parser profile for UTF-8 transaction-history exports."""
 
-    def parse(self, file_path: Path, encoding: str) -> pl.DataFrame:
-        if encoding.lower().replace("_", "-") not in {"utf-8", "utf-8-sig"}:
-            raise ValueError("transaction history requires UTF-8 encoding")
-        return super().parse(file_path, encoding)
+    def parse(self, source: StatementSource, encoding: str) -> pl.DataFrame:
+        _require_utf8(encoding)
+        return super().parse(source, encoding)
+
+    def iter_batches(
+        self, source: StatementSource, encoding: str, batch_rows: int
+    ) -> Iterator[pl.DataFrame]:
+        _require_utf8(encoding)
+        return super().iter_batches(source, encoding, batch_rows)
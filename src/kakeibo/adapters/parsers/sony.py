@@ -1,40 +1,74 @@
+import io
 import re
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 import polars as pl
 
-from src.kakeibo.ports.parser import ParserPort
+from src.kakeibo.ports.parser import RAW_SCHEMA, ParserPort, StatementSource
 
 SonyRow = dict[str, str | None]
 
+# parse() でも一定行数ごとに列へまとめ、行の辞書を全件保持しない
+PARSE_BATCH_ROWS = 10_000
+
+_DATE = re.compile(r"(\d{4}年\d{1,2}月\d{1,2}日)")
+_BALANCE = re.compile(r"([0-9,]+円)\s*$")
+_AMOUNT = re.compile(r"([0-9,]+円)")
+
+
+@contextmanager
+def _text_lines(source: StatementSource, encoding: str) -> Iterator[Iterator[str]]:
+    """本文全体を文字列へ展開せず、1行ずつ読み出す。ストリームは閉じない。"""
+    if isinstance(source, Path):
+        with source.open(encoding=encoding) as handle:
+            yield handle
+        return
+
+    stream = io.BytesIO(source) if isinstance(source, bytes) else source
+    wrapper = io.TextIOWrapper(stream, encoding=encoding)
+    try:
+        yield wrapper
+    finally:
+        wrapper.detach()
+
+
+def _empty_columns() -> dict[str, list[str | None]]:
+    return {name: [] for name in RAW_SCHEMA}
+
 
 class SonyBankParser(ParserPort):
-    def parse(self, file_path: Path, encoding: str) -> pl.DataFrame:
-        with file_path.open(encoding=encoding) as source:
-            text = source.read()
-
-        rows: list[SonyRow] = []
-        for raw_line in text.strip().split("\n"):
-            line = raw_line.strip()
-            if not line:
-                continue
-            if not re.search(r"(\d{4}年\d{1,2}月\d{1,2}日)", line):
-                continue
-            row = self._parse_line(line)
-            if row:
-                rows.append(row)
-
-        schema = {
-            "raw_date": pl.Utf8,
-            "raw_deposit": pl.Utf8,
-            "raw_withdrawal": pl.Utf8,
-            "raw_description": pl.Utf8,
-            "raw_balance": pl.Utf8,
-            "raw_memo": pl.Utf8,
-        }
-        if not rows:
-            return pl.DataFrame(schema=schema)
-        return pl.DataFrame(rows, schema=schema, orient="row")
+    def parse(self, source: StatementSource, encoding: str) -> pl.DataFrame:
+        batches = list(self.iter_batches(source, encoding, PARSE_BATCH_ROWS))
+        if not batches:
+            return pl.DataFrame(schema=RAW_SCHEMA)
+        return pl.concat(batches, rechunk=True)
+
+    def iter_batches(
+        self, source: StatementSource, encoding: str, batch_rows: int
+    ) -> Iterator[pl.DataFrame]:
+        """
+        明細を1行ずつ読み、batch_rows 行ごとに型付きの列へまとめて返す。
+
+        メモリ使用量は入力全体ではなくbatchの大きさで抑えられる。
+        """
+        columns = _empty_columns()
+        rows = 0
+        with _text_lines(source, encoding) as lines:
+            for raw_line in lines:
+                line = raw_line.strip()
+                if not line or not _DATE.search(line):
+                    continue
+                for name, value in self._parse_line(line).items():
+                    columns[name].append(value)
+                rows += 1
+                if rows == batch_rows:
+                    yield pl.DataFrame(columns, schema=RAW_SCHEMA)
+                    columns = _empty_columns()
+                    rows = 0
+        if rows:
+            yield pl.DataFrame(columns, schema=RAW_SCHEMA)
 
     def _parse_line(self, line: str) -> SonyRow:
         """1行を解析して正規化前の項目辞書を返す。"""
@@ -48,17 +82,17 @@ class SonyBankParser(ParserPort):
             "raw_memo": None,
         }
 
-        date_match = re.search(r"(\d{4}年\d{1,2}月\d{1,2}日)", remaining)
+        date_match = _DATE.search(remaining)
         if date_match:
             result["raw_date"] = date_match.group(1)
             remaining = remaining[date_match.end() :].strip()
 
-        balance_match = re.search(r"([0-9,]+円)\s*$", remaining)
+        balance_match = _BALANCE.search(remaining)
         if balance_match:
             result["raw_balance"] = balance_match.group(1)
             remaining = remaining[: balance_match.start()].strip()
 
-        amount_match = re.search(r"([0-9,]+円)", remaining)
+        amount_match = _AMOUNT.search(remaining)
         if amount_match:
             amount = amount_match.group(1)
             result["raw_description"] = remaining[amount_match.end() :].strip()
@@ -1,16 +1,25 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import io
 import secrets
+import tarfile
 import tempfile
+from contextlib import ExitStack
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Annotated
+from typing import IO, Annotated, BinaryIO, Literal
 
 from fastapi import Depends, FastAPI, Header, HTTPException, Request, status
 from pydantic import BaseModel
 
 from src.kakeibo.config import settings
+from src.kakeibo.hashing import HASH_BUFFER_BYTES
+from src.kakeibo.metrics import REJECTION_REASONS, ServiceMetrics, install_metrics
 from src.kakeibo.statement_types import (
     InvalidStatementSuffix,
+    StatementTypeSpec,
     UnknownStatementType,
     statement_spec,
 )
@@ -23,12 +32,32 @@ app = FastAPI(
     redoc_url=None,
     openapi_url=None,
 )
+metrics = ServiceMetrics()
+install_metrics(app, metrics)
 
 
 class ProcessResponse(BaseModel):
     message: str
     processed_files: int
     statement_type: str
+    input_sha256: str
+
+
+class BatchPartOutcome(BaseModel):
+    index: int
+    status: Literal["processed", "rejected", "failed"]
+    detail: str
+    statement_type: str | None = None
+    input_sha256: str | None = None
+
+
+class BatchProcessResponse(BaseModel):
+    message: str
+    processed_files: int
+    rejected_files: int
+    failed_files: int
+    input_sha256: str
+    parts: list[BatchPartOutcome]
 
 
 def require_api_key(
@@ -48,28 +77,74 @@ def require_api_key(
         )
 
 
-async def _save_request_limited(request: Request, destination: Path) -> None:
+@dataclass(frozen=True)
+class ReceivedUpload:
+    sha256: str
+    size: int
+    content: bytes | None
+
+
+@dataclass(frozen=True)
+class BatchPart:
+    """One tar member, copied to an anonymous private file when accepted."""
+
+    index: int
+    statement_type: str | None
+    path: Path | None
+    sha256: str | None
+    # The error /process would return for the same body, metrics included.
+    rejection: HTTPException | None
+
+
+async def _receive_upload(
+    request: Request,
+    destination: Path,
+    *,
+    limit: int | None = None,
+) -> ReceivedUpload:
+    """Hash the body while streaming and spill to disk only past the spool limit.
+
+    ``content`` holds the body when it stayed in memory; otherwise the body was
+    written once to ``destination``.
+    """
+    max_bytes = settings.max_upload_bytes if limit is None else limit
+    digest = hashlib.sha256()
+    spool = bytearray()
     total = 0
-    try:
-        with destination.open("xb") as buffer:
+    with ExitStack() as stack:
+        buffer: BinaryIO | None = None
+        try:
             async for chunk in request.stream():
                 total += len(chunk)
-                if total > settings.max_upload_bytes:
+                if total > max_bytes:
                     raise HTTPException(
                         status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
                         detail="Upload exceeds the configured size limit",
                     )
-                buffer.write(chunk)
-    except Exception:
-        destination.unlink(missing_ok=True)
-        raise
+                digest.update(chunk)
+                if buffer is None and total > settings.upload_spool_bytes:
+                    buffer = stack.enter_context(destination.open("xb"))
+                    buffer.write(spool)
+                    spool.clear()
+                if buffer is None:
+                    spool.extend(chunk)
+                else:
+                    buffer.write(chunk)
+        except Exception:
+            stack.close()
+            destination.unlink(missing_ok=True)
+            raise
 
     if total == 0:
-        destination.unlink(missing_ok=True)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Request body is empty",
         )
+    return ReceivedUpload(
+        sha256=digest.hexdigest(),
+        size=total,
+        content=bytes(spool) if buffer is None else None,
+    )
 
 
 @app.get("/")
@@ -77,15 +152,9 @@ def read_root() -> dict[str, str]:
     return {"status": "ok"}
 
 
-@app.post("/process", response_model=ProcessResponse)
-async def process_file(
-    request: Request,
-    x_file_suffix: Annotated[str | None, Header(alias="X-File-Suffix")],
-    x_statement_type: Annotated[str | None, Header(alias="X-Statement-Type")],
-    _: Annotated[None, Depends(require_api_key)],
-) -> ProcessResponse:
+def _resolve_spec(statement_type: str | None, suffix: str | None) -> StatementTypeSpec:
     try:
-        spec = statement_spec(x_statement_type, x_file_suffix)
+        return statement_spec(statement_type, suffix)
     except UnknownStatementType as exc:
         raise HTTPException(
             status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
@@ -97,7 +166,16 @@ async def process_file(
             detail="Statement type and suffix are incompatible",
         ) from exc
 
-    use_case = ProcessFileUseCase()
+
+@app.post("/process", response_model=ProcessResponse)
+async def process_file(
+    request: Request,
+    x_file_suffix: Annotated[str | None, Header(alias="X-File-Suffix")],
+    x_statement_type: Annotated[str | None, Header(alias="X-Statement-Type")],
+    _: Annotated[None, Depends(require_api_key)],
+) -> ProcessResponse:
+    spec = _resolve_spec(x_statement_type, x_file_suffix)
+    use_case = ProcessFileUseCase(recorder=metrics)
 
     with tempfile.TemporaryDirectory(prefix="kakeibo-private-") as temp_dir:
         temp_path = Path(temp_dir)
@@ -106,11 +184,12 @@ async def process_file(
         input_dir.mkdir(mode=0o700)
 
         destination = input_dir / f"upload{spec.allowed_suffixes[0]}"
-        await _save_request_limited(request, destination)
+        upload = await _receive_upload(request, destination)
         success = use_case.execute(
             destination,
             output_dir,
             source_type=spec.name,
+            content=upload.content,
         )
         if not success:
             raise HTTPException(
@@ -122,4 +201,170 @@ async def process_file(
             message="Processing complete",
             processed_files=1,
             statement_type=spec.name,
+            input_sha256=upload.sha256,
         )
+
+
+def _unsupported_member() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Unsupported archive member",
+    )
+
+
+def _copy_member(source: IO[bytes], destination: Path) -> str:
+    digest = hashlib.sha256()
+    with destination.open("xb") as handle:
+        while chunk := source.read(HASH_BUFFER_BYTES):
+            digest.update(chunk)
+            handle.write(chunk)
+    return digest.hexdigest()
+
+
+def _read_batch_parts(archive_source: Path | bytes, input_dir: Path) -> list[BatchPart]:
+    """Copy tar members one at a time into ``input_dir`` under anonymous names.
+
+    Only one copy buffer is held in memory whatever the archive size; member
+    names are never used or returned.
+    """
+    parts: list[BatchPart] = []
+    fileobj = io.BytesIO(archive_source) if isinstance(archive_source, bytes) else None
+    try:
+        with tarfile.open(
+            name=archive_source if isinstance(archive_source, Path) else None,
+            fileobj=fileobj,
+            mode="r|",
+        ) as archive:
+            for member in archive:
+                if member.isdir():
+                    continue
+                index = len(parts) + 1
+                if index > settings.max_batch_files:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Batch exceeds the configured file limit",
+                    )
+                spec: StatementTypeSpec | None = None
+                rejection = None
+                if not member.isfile():
+                    rejection = _unsupported_member()
+                elif member.size > settings.max_upload_bytes:
+                    rejection = HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Upload exceeds the configured size limit",
+                    )
+                elif member.size == 0:
+                    rejection = HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Request body is empty",
+                    )
+                else:
+                    try:
+                        spec = _resolve_spec(
+                            member.pax_headers.get("X-Statement-Type"),
+                            member.pax_headers.get("X-File-Suffix"),
+                        )
+                    except HTTPException as exc:
+                        rejection = exc
+
+                extracted = archive.extractfile(member) if spec is not None else None
+                if spec is None or extracted is None:
+                    rejection = rejection or _unsupported_member()
+                    parts.append(BatchPart(index, None, None, None, rejection))
+                    continue
+                path = input_dir / f"part-{index:03d}{spec.allowed_suffixes[0]}"
+                sha256 = _copy_member(extracted, path)
+                parts.append(BatchPart(index, spec.name, path, sha256, None))
+    except tarfile.TarError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Batch body is not a valid tar archive",
+        ) from exc
+    return parts
+
+
+async def _process_batch_part(
+    part: BatchPart,
+    use_case: ProcessFileUseCase,
+    output_dir: Path,
+    limiter: asyncio.Semaphore,
+) -> BatchPartOutcome:
+    if part.path is None or part.statement_type is None:
+        rejection = part.rejection or _unsupported_member()
+        metrics.reject(REJECTION_REASONS[rejection.status_code])
+        return BatchPartOutcome(
+            index=part.index, status="rejected", detail=rejection.detail
+        )
+
+    outcome = BatchPartOutcome(
+        index=part.index,
+        status="rejected",
+        detail="",
+        statement_type=part.statement_type,
+        input_sha256=part.sha256,
+    )
+    async with limiter:
+        success = await asyncio.to_thread(
+            use_case.execute,
+            part.path,
+            output_dir,
+            source_type=part.statement_type,
+        )
+    if not success:
+        metrics.reject(REJECTION_REASONS[status.HTTP_422_UNPROCESSABLE_ENTITY])
+        return outcome.model_copy(
+            update={"status": "failed", "detail": "Statement processing failed"}
+        )
+    return outcome.model_copy(
+        update={"status": "processed", "detail": "Processing complete"}
+    )
+
+
+@app.post("/process-batch", response_model=BatchProcessResponse)
+async def process_batch(
+    request: Request,
+    _: Annotated[None, Depends(require_api_key)],
+) -> BatchProcessResponse:
+    """Process a tar body whose members carry PAX statement-type/suffix headers."""
+    use_case = ProcessFileUseCase(recorder=metrics)
+
+    with tempfile.TemporaryDirectory(prefix="kakeibo-private-") as temp_dir:
+        temp_path = Path(temp_dir)
+        input_dir = temp_path / "input"
+        output_dir = temp_path / "output"
+        input_dir.mkdir(mode=0o700)
+
+        destination = input_dir / "batch.tar"
+        upload = await _receive_upload(
+            request,
+            destination,
+            limit=settings.max_batch_bytes,
+        )
+        # The tar walk and member copies are blocking file I/O.
+        parts = await asyncio.to_thread(
+            _read_batch_parts,
+            destination if upload.content is None else upload.content,
+            input_dir,
+        )
+        if not parts:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Batch contains no statements",
+            )
+
+        limiter = asyncio.Semaphore(settings.batch_workers)
+        outcomes = await asyncio.gather(
+            *(
+                _process_batch_part(part, use_case, output_dir, limiter)
+                for part in parts
+            )
+        )
+
+    return BatchProcessResponse(
+        message="Batch processing complete",
+        processed_files=sum(outcome.status == "processed" for outcome in outcomes),
+        rejected_files=sum(outcome.status == "rejected" for outcome in outcomes),
+        failed_files=sum(outcome.status == "failed" for outcome in outcomes),
+        input_sha256=upload.sha256,
+        parts=list(outcomes),
+    )
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from uuid import uuid4
+
+import polars as pl
+
+_VERSION = "rules_version"
+_KEY = "__description_key"
+_RULES = "rules"
+_USED = "last_used"
+_RULE = "__rule"
+
+_CACHE_SCHEMA: dict[str, pl.DataType] = {
+    _VERSION: pl.Utf8(),
+    _KEY: pl.Utf8(),
+    _RULES: pl.List(pl.UInt32()),
+    _USED: pl.Int64(),
+}
+
+
+def _conform(frame: pl.DataFrame) -> pl.DataFrame:
+    return frame.select(
+        pl.col(name).cast(dtype) for name, dtype in _CACHE_SCHEMA.items()
+    )
+
+
+class CategoryCache:
+    """Size-bounded LRU of text-rule matches per normalized description.
+
+    Entries are keyed by the rules version hash and the normalized description
+    and hold the indices of the rules whose keyword and regex conditions
+    matched. Amount conditions depend on each row, so they are still applied
+    after the lookup. The cache contains descriptions and must stay under the
+    private data directory.
+    """
+
+    def __init__(self, path: Path | None, max_entries: int) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = pl.DataFrame(schema=_CACHE_SCHEMA)
+        if path is not None and path.is_file():
+            try:
+                self._entries = _conform(pl.read_parquet(path))
+            except (OSError, pl.exceptions.PolarsError):
+                # A damaged cache only costs a recomputation.
+                self._entries = pl.DataFrame(schema=_CACHE_SCHEMA)
+        self._clock: int = self._entries.select(pl.col(_USED).max().fill_null(0)).item()
+
+    @property
+    def hit_rate(self) -> float | None:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+    def __len__(self) -> int:
+        return self._entries.height
+
+    def lookup(self, version: str, keys: pl.Series) -> tuple[pl.DataFrame, pl.Series]:
+        """Return cached (key, rule) matches and the keys that were not cached."""
+        self._clock += 1
+        requested = pl.DataFrame({_KEY: keys}, schema={_KEY: pl.Utf8})
+        current = self._entries.filter(pl.col(_VERSION) == version)
+        found = requested.join(current.select(_KEY, _RULES), on=_KEY, how="inner")
+        missing = requested.join(found, on=_KEY, how="anti").get_column(_KEY)
+        self.hits += found.height
+        self.misses += missing.len()
+
+        self._entries = self._entries.with_columns(
+            pl.when(
+                (pl.col(_VERSION) == version)
+                & pl.col(_KEY).is_in(found.get_column(_KEY).implode())
+            )
+            .then(self._clock)
+            .otherwise(pl.col(_USED))
+            .alias(_USED)
+        )
+        matches = (
+            found.explode(_RULES)
+            .drop_nulls(_RULES)
+            .select(_KEY, pl.col(_RULES).alias(_RULE))
+        )
+        return matches, missing
+
+    def store(self, version: str, keys: pl.Series, matches: pl.DataFrame) -> None:
+        """Cache the matches computed for ``keys`` and evict the oldest entries."""
+        if keys.is_empty():
+            return
+        grouped = matches.group_by(_KEY).agg(pl.col(_RULE).sort().alias(_RULES))
+        added = (
+            pl.DataFrame({_KEY: keys}, schema={_KEY: pl.Utf8})
+            .join(grouped, on=_KEY, how="left")
+            .select(
+                pl.lit(version).alias(_VERSION),
+                _KEY,
+                pl.col(_RULES).fill_null(pl.lit([], dtype=pl.List(pl.UInt32))),
+                pl.lit(self._clock, dtype=pl.Int64).alias(_USED),
+            )
+        )
+        entries = pl.concat([self._entries, _conform(added)])
+        if entries.height > self.max_entries:
+            entries = entries.sort(_USED, maintain_order=True).tail(self.max_entries)
+        self._entries = entries
+
+    def save(self) -> None:
+        """Atomically persist the cache with owner-only permissions."""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        temporary = self.path.with_name(f".{self.path.name}.{uuid4().hex}")
+        self._entries.write_parquet(temporary)
+        temporary.chmod(0o600)
+        os.replace(temporary, self.path)
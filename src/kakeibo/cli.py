@@ -3,16 +3,17 @@ from __future__ import annotations
 from pathlib import Path
 
 import typer
-import uvicorn
 from loguru import logger
 from rich.console import Console
 
-from src.kakeibo.config import settings
-from src.kakeibo.monthly_snapshot import SnapshotError, build_monthly_snapshot
-from src.kakeibo.statement_types import StatementTypeError
-from src.kakeibo.use_cases.process_file import ProcessFileUseCase
+# Commands import their dependencies lazily so lightweight commands such as
+# ``config`` do not pay for Polars, FastAPI or uvicorn at startup.
 
 app = typer.Typer()
+ledger_app = typer.Typer(help="Partitioned Parquet ledger of normalized rows.")
+app.add_typer(ledger_app, name="ledger")
+commerce_app = typer.Typer(help="Rendered commerce-history evidence bundles.")
+app.add_typer(commerce_app, name="commerce")
 console = Console()
 
 
@@ -20,9 +21,38 @@ console = Console()
 def process(
     input_path: Path = typer.Argument(..., help="Input file or directory"),
     output_dir: Path | None = typer.Option(None, help="Private output directory"),
+    metrics: bool = typer.Option(
+        False, help="Append per-stage timings to the private log directory"
+    ),
+    trace_memory: bool = typer.Option(
+        False, help="Also record tracemalloc peaks (slower)"
+    ),
+    batch_rows: int | None = typer.Option(
+        None, min=1, help="Parse, clean and write large statements in row chunks"
+    ),
+    ledger: bool = typer.Option(False, help="Also append outputs to the ledger"),
 ) -> None:
     """Process bank statement files without printing paths or filenames."""
-    use_case = ProcessFileUseCase()
+    import tracemalloc
+
+    from src.kakeibo.config import settings
+    from src.kakeibo.instrumentation import (
+        STAGE_METRICS_FILENAME,
+        JsonlStageRecorder,
+    )
+    from src.kakeibo.ledger import Ledger
+    from src.kakeibo.statement_types import StatementTypeError
+    from src.kakeibo.use_cases.process_file import ProcessFileUseCase
+
+    recorder = None
+    if metrics:
+        recorder = JsonlStageRecorder(settings.log_dir / STAGE_METRICS_FILENAME)
+    if trace_memory:
+        tracemalloc.start()
+    use_case = ProcessFileUseCase(
+        recorder=recorder,
+        ledger=Ledger(settings.ledger_dir) if ledger else None,
+    )
 
     if input_path.is_file():
         files = [input_path]
@@ -34,7 +64,7 @@ def process(
 
     success_count = 0
     for file in files:
-        source_type = use_case.infer_source_type(file.name)
+        source_type = use_case.detect_source_type(file)
         if source_type is None:
             logger.warning("Unsupported financial file")
             continue
@@ -44,6 +74,7 @@ def process(
                     file,
                     output_dir,
                     source_type=source_type,
+                    batch_rows=batch_rows,
                 )
             )
         except StatementTypeError:
@@ -54,6 +85,105 @@ def process(
     )
 
 
+@app.command()
+def sync(
+    input_path: Path = typer.Argument(..., help="Input file or directory"),
+    batch_rows: int = typer.Option(5_000, min=1, help="Rows per upload batch"),
+    parse_workers: int = typer.Option(
+        2, min=1, max=32, help="Statements parsed concurrently"
+    ),
+    queue_batches: int = typer.Option(
+        4, min=1, max=64, help="Parsed batches buffered ahead of the uploader"
+    ),
+) -> None:
+    """Parse statements and upload them to Supabase with overlapping stages."""
+    from src.kakeibo.adapters.supabase_repo import SupabaseRepository
+    from src.kakeibo.use_cases.process_file import ProcessFileUseCase
+    from src.kakeibo.use_cases.sync_repository import SyncRepositoryUseCase
+
+    if input_path.is_file():
+        candidates = [input_path]
+    elif input_path.is_dir():
+        candidates = [file for file in input_path.iterdir() if file.is_file()]
+    else:
+        logger.error("Invalid input path")
+        raise typer.Exit(code=1)
+
+    repository = SupabaseRepository()
+    if repository.client is None:
+        logger.error("Supabase integration is not configured")
+        raise typer.Exit(code=1)
+
+    use_case = ProcessFileUseCase()
+    files = []
+    for file in candidates:
+        source_type = use_case.detect_source_type(file)
+        if source_type is None:
+            logger.warning("Unsupported financial file")
+            continue
+        files.append((file, source_type))
+
+    result = SyncRepositoryUseCase(
+        repository,
+        use_case,
+        batch_rows=batch_rows,
+        parse_workers=parse_workers,
+        queue_batches=queue_batches,
+    ).run(files)
+    console.print(
+        f"[bold green]Synced {result.saved_rows}/{result.parsed_rows} rows from "
+        f"{result.files - result.failed_files}/{len(candidates)} files.[/bold green]"
+    )
+    if result.partial_files:
+        console.print(
+            f"[bold yellow]{result.partial_files} file(s) failed after some "
+            "batches were uploaded; fix and sync them again.[/bold yellow]"
+        )
+
+
+@app.command()
+def watch(
+    settle_seconds: float = typer.Option(
+        2.0, min=0.0, help="Wait until a file is unchanged for this long"
+    ),
+    poll_interval: float = typer.Option(
+        1.0, min=0.1, help="Rescan interval when no events arrive"
+    ),
+    ledger: bool = typer.Option(True, help="Append new outputs to the ledger"),
+    polling: bool = typer.Option(False, help="Poll instead of using inotify"),
+) -> None:
+    """Process statements as they arrive in the private input directory."""
+    from src.kakeibo.config import settings
+    from src.kakeibo.ledger import Ledger
+    from src.kakeibo.use_cases.process_file import ProcessFileUseCase
+    from src.kakeibo.watch import (
+        PollingBackend,
+        ProcessedSet,
+        StatementWatcher,
+        change_backend,
+    )
+
+    if not settings.input_dir.is_dir():
+        logger.error("Invalid input path")
+        raise typer.Exit(code=1)
+
+    use_case = ProcessFileUseCase(
+        ledger=Ledger(settings.ledger_dir) if ledger else None
+    )
+    watcher = StatementWatcher(
+        settings.input_dir,
+        use_case,
+        ProcessedSet(settings.watch_state_path),
+        settle_seconds=settle_seconds,
+    )
+    backend = PollingBackend() if polling else change_backend(settings.input_dir)
+    console.print("Watching the private input directory. Press Ctrl+C to stop.")
+    try:
+        watcher.run(backend, poll_interval=poll_interval)
+    except KeyboardInterrupt:
+        console.print("Stopped.")
+
+
 @app.command("snapshot-month")
 def snapshot_month(
     month: str = typer.Option(..., help="Target month in YYYY-MM"),
@@ -66,8 +196,19 @@ def snapshot_month(
         help="Repeatable PAIR=RATE evidence, for example USDJPY=147.25",
     ),
     artifact_root: Path = typer.Option(Path("artifacts"), help="Private artifact root"),
+    cache: bool = typer.Option(True, help="Reuse cached per-input monthly totals"),
+    workers: int = typer.Option(
+        4, min=1, max=32, help="Read and hash uncached inputs concurrently"
+    ),
 ) -> None:
     """Freeze hashes, FX provenance, and deterministic monthly totals."""
+    from src.kakeibo.config import settings
+    from src.kakeibo.monthly_snapshot import (
+        SnapshotError,
+        SnapshotInputCache,
+        build_monthly_snapshot,
+    )
+
     rates: dict[str, str] = {}
     for item in fx_rate or []:
         pair, separator, rate = item.partition("=")
@@ -84,6 +225,8 @@ def snapshot_month(
             fx_source=fx_source,
             fx_retrieved_at=fx_retrieved_at,
             fx_rates=rates,
+            cache=SnapshotInputCache(settings.snapshot_cache_path) if cache else None,
+            workers=workers,
         )
     except (OSError, SnapshotError):
         logger.error("Monthly snapshot failed")
@@ -91,9 +234,315 @@ def snapshot_month(
     console.print(f"snapshot_sha256={result['metadata_sha256']}")
 
 
+@app.command()
+def dedup(
+    input_paths: list[Path] = typer.Argument(
+        ..., help="Normalized private CSV files, highest priority first"
+    ),
+    output_dir: Path | None = typer.Option(None, help="Private output directory"),
+) -> None:
+    """Merge overlapping normalized statements and drop duplicated rows."""
+    from src.kakeibo.adapters.normalized_csv import read_normalized_csv
+    from src.kakeibo.config import settings
+    from src.kakeibo.domain.deduplication import deduplicate_overlaps
+    from src.kakeibo.security import private_output_name
+
+    try:
+        frames = [read_normalized_csv(path) for path in input_paths]
+    except OSError:
+        logger.error("Normalized input could not be read")
+        raise typer.Exit(code=1) from None
+
+    deduplicated, reports = deduplicate_overlaps(frames)
+    if output_dir is None:
+        output_dir = settings.output_dir
+    output_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
+    deduplicated.write_csv(output_dir / private_output_name())
+
+    for report in reports:
+        console.print(
+            f"{report.source}: kept={report.kept_rows} removed={report.removed_rows}"
+        )
+
+
+@app.command()
+def reconcile(
+    card_paths: list[Path] = typer.Argument(..., help="Normalized private CSV files"),
+    orders: list[Path] = typer.Option(
+        ..., "--orders", help="Repeatable Rakuten rendered-evidence bundle JSON"
+    ),
+    tolerance_days: int = typer.Option(3, min=0, max=31, help="Date window in days"),
+    output_dir: Path | None = typer.Option(None, help="Private output directory"),
+) -> None:
+    """Link card purchases to commerce orders and write a private link table."""
+    import json
+
+    import polars as pl
+
+    from src.kakeibo.adapters.normalized_csv import read_normalized_csv
+    from src.kakeibo.commerce_history.parsers import parse_rakuten_bundle
+    from src.kakeibo.commerce_history.reconciliation import (
+        orders_frame,
+        reconcile_card_orders,
+        summarize_links,
+    )
+    from src.kakeibo.config import settings
+    from src.kakeibo.security import private_output_name
+
+    try:
+        card = pl.concat(
+            [read_normalized_csv(path) for path in card_paths],
+            how="diagonal_relaxed",
+        )
+        records = [
+            record
+            for path in orders
+            for record in parse_rakuten_bundle(
+                json.loads(path.read_text(encoding="utf-8"))
+            )
+        ]
+    except (OSError, ValueError, pl.exceptions.PolarsError):
+        logger.error("Reconciliation input could not be read")
+        raise typer.Exit(code=1) from None
+
+    order_frame = orders_frame(records)
+    links = reconcile_card_orders(card, order_frame, tolerance_days=tolerance_days)
+    if output_dir is None:
+        output_dir = settings.output_dir
+    output_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
+    links.write_csv(output_dir / private_output_name("reconciliation"))
+
+    summary = summarize_links(card, order_frame, links)
+    console.print(
+        f"linked={summary.linked} "
+        f"unmatched_card_rows={summary.unmatched_card_rows} "
+        f"unmatched_orders={summary.unmatched_orders}"
+    )
+
+
+@commerce_app.command("manifest")
+def commerce_manifest(
+    bundle_path: Path = typer.Argument(..., help="Rakuten rendered-evidence bundle"),
+    manifest_path: Path | None = typer.Option(
+        None, "--manifest", help="Manifest JSON (default: next to the bundle)"
+    ),
+    account_scope: str = typer.Option("primary", help="Account scope of the orders"),
+) -> None:
+    """Record row counts and SHA-256 values for later replay verification."""
+    import json
+
+    from src.kakeibo.commerce_history.replay import (
+        build_replay_manifest,
+        default_manifest_path,
+    )
+
+    try:
+        bundle = json.loads(bundle_path.read_text(encoding="utf-8"))
+        manifest = build_replay_manifest(bundle, account_scope=account_scope)
+    except (OSError, ValueError):
+        logger.error("Commerce bundle could not be read")
+        raise typer.Exit(code=1) from None
+
+    target = manifest_path or default_manifest_path(bundle_path)
+    target.write_text(manifest.model_dump_json(indent=2) + "\n", encoding="utf-8")
+    console.print(
+        f"parser_version={manifest.parser_version} "
+        f"order_rows={manifest.order_rows} item_rows={manifest.item_rows}"
+    )
+
+
+@commerce_app.command("verify")
+def commerce_verify(
+    bundle_path: Path = typer.Argument(..., help="Rakuten rendered-evidence bundle"),
+    manifest_path: Path | None = typer.Option(
+        None, "--manifest", help="Manifest JSON (default: next to the bundle)"
+    ),
+    workers: int | None = typer.Option(
+        None, min=1, help="Parse processes (default: CPU count)"
+    ),
+    chunk_records: int = typer.Option(
+        200, min=1, help="Records parsed per task; smaller chunks stop sooner"
+    ),
+) -> None:
+    """Re-parse a bundle and compare it with its manifest, stopping early."""
+    import json
+
+    from src.kakeibo.commerce_history.replay import (
+        ReplayManifest,
+        default_manifest_path,
+        verify_replay,
+    )
+
+    manifest_path = manifest_path or default_manifest_path(bundle_path)
+    try:
+        manifest = ReplayManifest.model_validate_json(
+            manifest_path.read_text(encoding="utf-8")
+        )
+        bundle = json.loads(bundle_path.read_text(encoding="utf-8"))
+        result = verify_replay(
+            bundle, manifest, workers=workers, chunk_records=chunk_records
+        )
+    except (OSError, ValueError):
+        logger.error("Replay input could not be read")
+        raise typer.Exit(code=1) from None
+
+    if result.mismatch is not None:
+        position = result.mismatch.record_position
+        console.print(
+            f"status=MISMATCH check={result.mismatch.check}"
+            + (f" record_position={position}" if position is not None else "")
+        )
+        raise typer.Exit(code=1)
+    console.print(
+        f"status=PASS records={result.records} "
+        f"order_rows={result.order_rows} item_rows={result.item_rows}"
+    )
+
+
+@ledger_app.command("append")
+def ledger_append(
+    input_paths: list[Path] | None = typer.Argument(
+        None, help="Normalized private CSV files (default: the output directory)"
+    ),
+) -> None:
+    """Append normalized CSVs into the ledger, skipping inputs already added."""
+    from src.kakeibo.config import settings
+    from src.kakeibo.ledger import Ledger, LedgerError
+
+    if not input_paths:
+        input_paths = sorted(settings.output_dir.glob("*.csv"))
+    try:
+        result = Ledger(settings.ledger_dir).append_csv(input_paths)
+    except (OSError, LedgerError):
+        logger.error("Ledger append failed")
+        raise typer.Exit(code=1) from None
+    console.print(
+        f"appended_rows={result.appended_rows} partitions={result.partitions} "
+        f"skipped_inputs={result.skipped_inputs}"
+    )
+
+
+@ledger_app.command("compact")
+def ledger_compact(
+    min_files: int = typer.Option(
+        2, min=2, help="Merge partitions with this many files"
+    ),
+) -> None:
+    """Merge small Parquet files within each ledger partition."""
+    from src.kakeibo.config import settings
+    from src.kakeibo.ledger import Ledger, LedgerError
+
+    try:
+        compacted = Ledger(settings.ledger_dir).compact(min_files=min_files)
+    except (OSError, LedgerError):
+        logger.error("Ledger compaction failed")
+        raise typer.Exit(code=1) from None
+    console.print(f"compacted_partitions={compacted}")
+
+
+@ledger_app.command("migrate")
+def ledger_migrate() -> None:
+    """Upgrade a ledger written before category columns existed."""
+    from src.kakeibo.config import settings
+    from src.kakeibo.ledger import Ledger, LedgerError
+
+    try:
+        migrated = Ledger(settings.ledger_dir).migrate()
+    except (OSError, LedgerError):
+        logger.error("Ledger migration failed")
+        raise typer.Exit(code=1) from None
+    console.print(f"migrated_partitions={migrated}")
+
+
+@app.command()
+def query(
+    month_from: str | None = typer.Option(None, help="First month in YYYY-MM"),
+    month_to: str | None = typer.Option(None, help="Last month in YYYY-MM"),
+    source: list[str] | None = typer.Option(None, help="Repeatable statement type"),
+    min_amount: int | None = typer.Option(None, help="Minimum signed amount"),
+    max_amount: int | None = typer.Option(None, help="Maximum signed amount"),
+    description_contains: str | None = typer.Option(
+        None, help="Literal substring of the description"
+    ),
+    group_by: list[str] | None = typer.Option(
+        None, help="Repeatable grouping key: year, month, source or category"
+    ),
+    from_csv: bool = typer.Option(
+        False, help="Scan normalized CSVs in the output directory, not the ledger"
+    ),
+) -> None:
+    """Aggregate normalized transactions without printing individual rows."""
+    import polars as pl
+    from rich.table import Table
+
+    from src.kakeibo.adapters.normalized_csv import scan_normalized_csv
+    from src.kakeibo.config import settings
+    from src.kakeibo.ledger import Ledger
+    from src.kakeibo.query import QueryFilter, aggregate
+
+    try:
+        filters = QueryFilter(
+            month_from=month_from,
+            month_to=month_to,
+            sources=tuple(source or ()),
+            min_amount=min_amount,
+            max_amount=max_amount,
+            description_contains=description_contains,
+        )
+        if from_csv:
+            frame = scan_normalized_csv(sorted(settings.output_dir.glob("*.csv")))
+        else:
+            frame = Ledger(settings.ledger_dir).scan(
+                month_from=month_from, month_to=month_to, sources=source or None
+            )
+        result = aggregate(frame, filters, group_by or ())
+    except (OSError, ValueError, pl.exceptions.PolarsError):
+        logger.error("Query failed")
+        raise typer.Exit(code=1) from None
+
+    table = Table(*result.columns)
+    for row in result.iter_rows():
+        table.add_row(*(str(value) for value in row))
+    console.print(table)
+
+
+@app.command()
+def stats() -> None:
+    """Aggregate recorded per-stage metrics by statement type and stage."""
+    from rich.table import Table
+
+    from src.kakeibo.config import settings
+    from src.kakeibo.instrumentation import (
+        STAGE_METRICS_FILENAME,
+        summarize_stage_metrics,
+    )
+
+    metrics_path = settings.log_dir / STAGE_METRICS_FILENAME
+    if not metrics_path.is_file():
+        logger.error("No stage metrics recorded")
+        raise typer.Exit(code=1)
+
+    columns = {
+        "source_type": "type",
+        "stage": "stage",
+        "runs": "runs",
+        "rows_out": "rows_out",
+        "wall_p50": "p50 s",
+        "wall_p95": "p95 s",
+        "wall_max": "max s",
+        "rows_per_second": "rows/s",
+    }
+    table = Table(*columns.values())
+    for entry in summarize_stage_metrics(metrics_path):
+        table.add_row(*(str(entry[key]) for key in columns))
+    console.print(table)
+
+
 @app.command()
 def review(port: int = typer.Option(8765, min=1024, max=65535)) -> None:
     """Run the local-only Import Review UI on the loopback interface."""
+    import uvicorn
+
     console.print(f"Import Review: http://127.0.0.1:{port}")
     uvicorn.run(
         "src.kakeibo.import_review:app",
@@ -106,6 +555,8 @@ def review(port: int = typer.Option(8765, min=1024, max=65535)) -> None:
 @app.command()
 def config() -> None:
     """Show only the non-sensitive configuration snapshot."""
+    from src.kakeibo.config import settings
+
     console.print(settings.public_snapshot())
 
 
@@ -16,6 +16,14 @@ from .parsers import (
     parse_rakuten_bundle,
     parse_rakuten_record,
 )
+from .replay import (
+    REPLAY_MANIFEST_FORMAT,
+    ReplayManifest,
+    ReplayMismatch,
+    ReplayResult,
+    build_replay_manifest,
+    verify_replay,
+)
 
 __all__ = [
     "CanonicalItem",
@@ -25,10 +33,16 @@ __all__ = [
     "ParseAudit",
     "Provenance",
     "RAKUTEN_PARSER_VERSION",
+    "REPLAY_MANIFEST_FORMAT",
     "RakutenParsedRecord",
     "RenderedEvidence",
+    "ReplayManifest",
+    "ReplayMismatch",
+    "ReplayResult",
+    "build_replay_manifest",
     "parse_rakuten_bundle",
     "parse_rakuten_record",
     "raw_record_sha256",
     "semantic_sha256",
+    "verify_replay",
 ]
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import hashlib
 import json
-from collections.abc import Mapping, Sequence
+from collections.abc import Iterable, Mapping, Sequence
 from typing import Any
 
 from pydantic import BaseModel
@@ -39,3 +39,32 @@ def raw_record_sha256(*, rendered_html: str, rendered_text: str) -> str:
 def semantic_sha256(rows: Sequence[Any]) -> str:
     """Hash normalized rows deterministically for replay verification."""
     return hashlib.sha256(_canonical_json_bytes(rows)).hexdigest()
+
+
+def canonical_row_bytes(row: Any) -> bytes:
+    """Encode one row exactly as it appears inside ``semantic_sha256`` input."""
+    return _canonical_json_bytes(row)
+
+
+class SemanticHasher:
+    """Incremental ``semantic_sha256`` over rows from ``canonical_row_bytes``.
+
+    Rows must be fed in order; the digest equals ``semantic_sha256`` of the
+    same rows, so chunks encoded elsewhere can be hashed without a full list.
+    """
+
+    def __init__(self) -> None:
+        self._digest = hashlib.sha256(b"[")
+        self.rows = 0
+
+    def update(self, encoded_rows: Iterable[bytes]) -> None:
+        for encoded in encoded_rows:
+            if self.rows:
+                self._digest.update(b",")
+            self._digest.update(encoded)
+            self.rows += 1
+
+    def hexdigest(self) -> str:
+        digest = self._digest.copy()
+        digest.update(b"]")
+        return digest.hexdigest()
@@ -3,6 +3,7 @@ from .rakuten_jp import (
     RakutenParsedRecord,
     parse_rakuten_bundle,
     parse_rakuten_record,
+    rakuten_bundle_records,
 )
 
 __all__ = [
@@ -10,4 +11,5 @@ __all__ = [
     "RakutenParsedRecord",
     "parse_rakuten_bundle",
     "parse_rakuten_record",
+    "rakuten_bundle_records",
 ]
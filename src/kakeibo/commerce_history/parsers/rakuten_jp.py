@@ -5,6 +5,7 @@ from collections.abc import Mapping
 from dataclasses import dataclass, field
 from datetime import date, datetime
 from decimal import Decimal
+from html import unescape
 from html.parser import HTMLParser
 from typing import Any
 from urllib.parse import parse_qs, urlparse, urlunparse
@@ -17,6 +18,7 @@ from ..models import CanonicalItem, CanonicalOrder, Provenance
 RAKUTEN_PARSER_VERSION = "rakuten_v02"
 _SOURCE = "rakuten.co.jp"
 _ITEM_ROW_CLASSES = {"flex-row-start--1GHo9", "padding-all-xlarge--1DSZs"}
+_AMOUNT_CLASS = "value--21p0x"
 _DATE_RE = re.compile(r"注文日：?\s*(\d{4})/(\d{2})/(\d{2})")
 _ORDER_RE = re.compile(r"注文番号：?\s*([0-9-]+)")
 _NUMERIC_RE = re.compile(r"[0-9][0-9,]*")
@@ -45,9 +47,14 @@ class _ItemBuffer:
     amount_texts: list[str] = field(default_factory=list)
 
 
-class _RakutenOrderHTMLParser(HTMLParser):
+class _OrderEvidence:
+    """Item rows and shop name collected from start/end tags and text runs.
+
+    Only ``div`` and ``a`` tags change the state, so tokenizers may skip the
+    attributes of every other tag.
+    """
+
     def __init__(self) -> None:
-        super().__init__(convert_charrefs=True)
         self.item: _ItemBuffer | None = None
         self.item_div_depth = 0
         self.items: list[_ItemBuffer] = []
@@ -57,35 +64,32 @@ class _RakutenOrderHTMLParser(HTMLParser):
         self.capture_shop = False
         self.shop_texts: list[str] = []
 
-    def handle_starttag(
-        self,
-        tag: str,
-        attrs: list[tuple[str, str | None]],
-    ) -> None:
-        attributes = dict(attrs)
-        classes = set((attributes.get("class") or "").split())
-        href = attributes.get("href")
-
-        if tag == "div" and self.item is None and _ITEM_ROW_CLASSES <= classes:
-            self.item = _ItemBuffer()
-            self.item_div_depth = 1
-        elif tag == "div" and self.item is not None:
-            self.item_div_depth += 1
-
-        if self.item is not None and tag == "a":
-            anchor = _AnchorBuffer(href=href)
-            self.item.anchors.append(anchor)
-            self.active_anchor = anchor
-
-        if self.item is not None and tag == "div" and "value--21p0x" in classes:
-            self.capture_amount = True
-            self.amount_div_depth = self.item_div_depth
-
-        if tag == "a" and href and "l-id=ph_pc_shopname" in href:
-            self.capture_shop = True
-            self.shop_texts = []
-
-    def handle_data(self, data: str) -> None:
+    @property
+    def wants_text(self) -> bool:
+        return self.item is not None or self.capture_shop
+
+    def start(self, tag: str, class_attr: str | None, href: str | None) -> None:
+        if tag == "div":
+            classes = set((class_attr or "").split())
+            if self.item is None and _ITEM_ROW_CLASSES <= classes:
+                self.item = _ItemBuffer()
+                self.item_div_depth = 1
+            elif self.item is not None:
+                self.item_div_depth += 1
+
+            if self.item is not None and _AMOUNT_CLASS in classes:
+                self.capture_amount = True
+                self.amount_div_depth = self.item_div_depth
+        elif tag == "a":
+            if self.item is not None:
+                anchor = _AnchorBuffer(href=href)
+                self.item.anchors.append(anchor)
+                self.active_anchor = anchor
+            if href and "l-id=ph_pc_shopname" in href:
+                self.capture_shop = True
+                self.shop_texts = []
+
+    def text(self, data: str) -> None:
         text = " ".join(data.split())
         if not text:
             return
@@ -98,7 +102,7 @@ class _RakutenOrderHTMLParser(HTMLParser):
         if self.capture_shop:
             self.shop_texts.append(text)
 
-    def handle_endtag(self, tag: str) -> None:
+    def end(self, tag: str) -> None:
         if tag == "a":
             self.active_anchor = None
             self.capture_shop = False
@@ -116,6 +120,204 @@ class _RakutenOrderHTMLParser(HTMLParser):
             self.item = None
 
 
+class _RakutenOrderHTMLParser(HTMLParser):
+    """Reference engine on the stdlib parser; materializes every attribute."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.evidence = _OrderEvidence()
+
+    def handle_starttag(
+        self,
+        tag: str,
+        attrs: list[tuple[str, str | None]],
+    ) -> None:
+        attributes = dict(attrs)
+        self.evidence.start(tag, attributes.get("class"), attributes.get("href"))
+
+    def handle_data(self, data: str) -> None:
+        self.evidence.text(data)
+
+    def handle_endtag(self, tag: str) -> None:
+        self.evidence.end(tag)
+
+
+# Selective tokenizer for rendered order HTML. Tags split text runs exactly
+# where HTMLParser splits them, but attributes are parsed only for div and a
+# tags and text is unescaped only inside item rows and the shop-name anchor.
+# The attribute and tag-name patterns are the ones html.parser uses.
+_MARKUP_RE = re.compile(
+    r"""<(?:
+        (?P<comment>!--.*?--\s*>) |
+        /(?P<end>[a-zA-Z][^\t\n\r\f\x20/>\x00]*)[^>]*> |
+        /[^>]*> |
+        [!?][^>]*> |
+        (?P<start>[a-zA-Z][^\t\n\r\f\x20/>\x00]*)(?:[^>"']|"[^"]*"|'[^']*')*>
+    )""",
+    re.DOTALL | re.VERBOSE,
+)
+# Outside the state regions text, end tags and start tags other than div, a,
+# script and style change nothing; this skips them inside the regex engine.
+_IDLE_SKIP_RE = re.compile(
+    r"""(?:
+        [^<]++ |
+        <(?:
+            !--.*?--\s*> |
+            /[^>]*+> |
+            (?!!--)[!?][^>]*+> |
+            (?!(?i:div|a|script|style)[\t\n\r\f\x20/>])
+            [a-zA-Z][^\t\n\r\f\x20/>\x00]*+(?:[^>"']++|"[^"]*+"|'[^']*+')*+> |
+            (?![a-zA-Z/!?])
+        )
+    )*+""",
+    re.DOTALL | re.VERBOSE,
+)
+_TAG_GAP_RE = re.compile(r"(?:\s|/(?!>))*")
+_ATTR_RE = re.compile(
+    r"((?<=['\"\s/])[^\s/>][^\s/=>]*)(\s*=+\s*"
+    r"('[^']*'|\"[^\"]*\"|(?!['\"])[^>\s]*))?(?:\s|/(?!>))*"
+)
+# A "<" followed by one of these may still open markup once more input
+# arrives, so HTMLParser holds it back at the end of its input.
+_MARKUP_OPEN_RE = re.compile(r"[a-zA-Z/!?]")
+# HTMLParser treats a trailing "&" that is not followed by these characters
+# within its last 34 characters as a possibly truncated character reference.
+_CHARREF_END_RE = re.compile(r"[\s;]")
+_CHARREF_LOOKBACK = 34
+_STATE_TAGS = {"div", "a"}
+_IDLE_MARKERS = {"div": tuple(_ITEM_ROW_CLASSES), "a": ("l-id=ph_pc_shopname",)}
+_RAW_TEXT_TAGS = {"script", "style"}
+
+
+def _start_tag(
+    markup: str, name_end: int, tag_end: int
+) -> tuple[dict[str, str | None], str]:
+    """Parse attributes like HTMLParser; also return the unparsed tag tail."""
+    attributes: dict[str, str | None] = {}
+    gap = _TAG_GAP_RE.match(markup, name_end, tag_end)
+    position = gap.end() if gap is not None else name_end
+    while position < tag_end:
+        match = _ATTR_RE.match(markup, position, tag_end)
+        if match is None:
+            break
+        name, rest, value = match.group(1, 2, 3)
+        if not rest:
+            value = None
+        elif value[:1] == value[-1:] and value[:1] in {"'", '"'}:
+            value = value[1:-1]
+        attributes[name.lower()] = unescape(value) if value else value
+        position = match.end()
+    return attributes, markup[position:tag_end].strip()
+
+
+def _emit_text(evidence: _OrderEvidence, text: str) -> None:
+    # HTMLParser reports a stray "<" as a text run of its own.
+    for index, chunk in enumerate(text.split("<")):
+        if index:
+            evidence.text("<")
+        evidence.text(unescape(chunk))
+
+
+def _reported_end(markup: str, start: int, end: int) -> int:
+    """Return how far HTMLParser, fed without close(), reports text.
+
+    ``markup[start:end]`` holds no complete markup and is followed by the end
+    of input or an unclosed comment. HTMLParser keeps back a "<" that may
+    still open markup and, at the end of input, a text run that may end in a
+    truncated character reference.
+    """
+    length = len(markup)
+    position = start
+    while (opening := markup.find("<", position, end)) >= 0:
+        if opening + 1 == length or _MARKUP_OPEN_RE.match(markup, opening + 1):
+            return opening
+        position = opening + 1
+    if end < length:
+        return end
+    ampersand = markup.rfind("&", max(position, length - _CHARREF_LOOKBACK))
+    if ampersand >= 0 and not _CHARREF_END_RE.search(markup, ampersand):
+        return position
+    return end
+
+
+def _scan_order_html(markup: str) -> _OrderEvidence:
+    evidence = _OrderEvidence()
+    search = _MARKUP_RE.search
+    position = 0
+    length = len(markup)
+    while position < length:
+        if (
+            evidence.item is None
+            and not evidence.capture_shop
+            and evidence.active_anchor is None
+        ):
+            skipped = _IDLE_SKIP_RE.match(markup, position)
+            if skipped is not None:
+                position = skipped.end()
+        match = search(markup, position)
+        stop = match.start() if match is not None else length
+        # HTMLParser reports nothing past an unclosed comment.
+        unterminated = match is None or (
+            match.group("comment") is None and markup.startswith("<!--", stop)
+        )
+        wants_text = evidence.item is not None or evidence.capture_shop
+        if unterminated and wants_text:
+            stop = _reported_end(markup, position, stop)
+        if stop > position and wants_text:
+            _emit_text(evidence, markup[position:stop])
+        if match is None or unterminated:
+            break
+        position = match.end()
+        # Outside item rows and the shop anchor, only a div carrying the item
+        # classes or an anchor carrying the shop marker can change the state.
+        idle = not wants_text and evidence.active_anchor is None
+
+        end_tag, tag = match.group("end", "start")
+        if end_tag is not None:
+            if not idle:
+                evidence.end(end_tag.lower())
+            continue
+        if tag is None:
+            continue
+        tag = tag.lower()
+        if tag in _STATE_TAGS:
+            raw = markup[match.start() : position]
+            if idle and "&" not in raw:
+                if not all(marker in raw for marker in _IDLE_MARKERS[tag]):
+                    continue
+            elif (
+                tag == "div"
+                and evidence.item is not None
+                and not any(char in raw for char in "&/")
+                and _AMOUNT_CLASS not in raw
+            ):
+                # Inside an item row a plain div only deepens the nesting.
+                evidence.start(tag, None, None)
+                continue
+        elif tag not in _RAW_TEXT_TAGS:
+            continue
+
+        attributes, tail = _start_tag(markup, match.end("start"), position)
+        if tail not in (">", "/>"):
+            if wants_text:
+                evidence.text(markup[match.start() : position])
+            continue
+        evidence.start(tag, attributes.get("class"), attributes.get("href"))
+        if tail == "/>":
+            evidence.end(tag)
+        elif tag in _RAW_TEXT_TAGS:
+            closing = re.compile(rf"</\s*{tag}\s*>", re.IGNORECASE).search(
+                markup, position
+            )
+            if closing is None:
+                break
+            if evidence.wants_text:
+                evidence.text(markup[position : closing.start()])
+            position = closing.end()
+            evidence.end(tag)
+    return evidence
+
+
 @dataclass(frozen=True)
 class RakutenParsedRecord:
     order: CanonicalOrder
@@ -227,17 +429,16 @@ def parse_rakuten_record(
         raise ValueError("Rakuten rendered evidence SHA-256 mismatch")
 
     order_id = _parse_order_id(record, rendered_text)
-    parser = _RakutenOrderHTMLParser()
-    parser.feed(rendered_html)
-    shop_name = " ".join(parser.shop_texts).strip()
+    evidence = _scan_order_html(rendered_html)
+    shop_name = " ".join(evidence.shop_texts).strip()
     if not shop_name:
         raise ValueError("Rakuten shop-name evidence is missing")
-    if not parser.items:
+    if not evidence.items:
         raise ValueError("Rakuten order has no captured item rows")
 
     items = tuple(
         _parse_item(buffer, order_id=order_id, item_no=index)
-        for index, buffer in enumerate(parser.items, start=1)
+        for index, buffer in enumerate(evidence.items, start=1)
     )
     order = CanonicalOrder(
         source=_SOURCE,
@@ -272,11 +473,8 @@ def parse_rakuten_record(
     )
 
 
-def parse_rakuten_bundle(
-    bundle: Mapping[str, Any],
-    *,
-    account_scope: str = "primary",
-) -> tuple[RakutenParsedRecord, ...]:
+def rakuten_bundle_records(bundle: Mapping[str, Any]) -> list[Mapping[str, Any]]:
+    """Check the bundle envelope and return its records without parsing them."""
     if bundle.get("source") not in (None, _SOURCE):
         raise ValueError("bundle source is not rakuten.co.jp")
     if bundle.get("capture_status") != "PASS":
@@ -287,16 +485,24 @@ def parse_rakuten_bundle(
     raw_records = bundle.get("records")
     if not isinstance(raw_records, list):
         raise ValueError("Rakuten bundle records must be a list")
-
-    parsed: list[RakutenParsedRecord] = []
-    for raw_record in raw_records:
-        if not isinstance(raw_record, Mapping):
-            raise ValueError("Rakuten bundle contains a non-object record")
-        parsed.append(parse_rakuten_record(raw_record, account_scope=account_scope))
+    if not all(isinstance(raw_record, Mapping) for raw_record in raw_records):
+        raise ValueError("Rakuten bundle contains a non-object record")
 
     reported = bundle.get("reported_records")
-    if reported is not None and len(parsed) != int(reported):
+    if reported is not None and len(raw_records) != int(reported):
         raise ValueError("Rakuten parsed order count does not match reported_records")
+    return raw_records
+
+
+def parse_rakuten_bundle(
+    bundle: Mapping[str, Any],
+    *,
+    account_scope: str = "primary",
+) -> tuple[RakutenParsedRecord, ...]:
+    parsed = [
+        parse_rakuten_record(raw_record, account_scope=account_scope)
+        for raw_record in rakuten_bundle_records(bundle)
+    ]
 
     order_ids = [record.order.order_id for record in parsed]
     if len(order_ids) != len(set(order_ids)):
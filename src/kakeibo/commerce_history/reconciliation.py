@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import timedelta
+
+import polars as pl
+from loguru import logger
+
+from .parsers import RakutenParsedRecord
+
+# Matching rule: within each amount, card rows in date order (then row
+# order) each take the earliest unlinked order, by date then order_id, dated
+# at most ``tolerance_days`` before or after them. Taking the earliest order
+# that is still in reach links as many card rows as any one-to-one matching.
+RECONCILIATION_VERSION = "reconcile_v03"
+DEFAULT_TOLERANCE_DAYS = 3
+DEFAULT_CARD_SOURCES = ("enavi",)
+# Amounts where many card rows compete for few orders need a pass per row
+# that finds its window used up; the cap bounds that worst case.
+MAX_RECONCILIATION_PASSES = 64
+
+LINK_SCHEMA: dict[str, pl.DataType] = {
+    "card_row": pl.UInt32(),
+    "order_id": pl.Utf8(),
+    "transaction_date": pl.Date(),
+    "order_date": pl.Date(),
+    "amount": pl.Int64(),
+    "day_gap": pl.Int64(),
+    "confidence": pl.Float64(),
+}
+
+
+@dataclass(frozen=True)
+class ReconciliationSummary:
+    linked: int
+    unmatched_card_rows: int
+    unmatched_orders: int
+
+
+def orders_frame(records: Sequence[RakutenParsedRecord]) -> pl.DataFrame:
+    """Project parsed orders to the columns used for matching.
+
+    The visible item price sum is the only amount proven by the purchase
+    history view, so orders whose sum has a fractional part are skipped.
+    """
+    rows = [
+        (
+            record.order.order_id,
+            record.order.order_date,
+            int(record.visible_item_price_sum),
+        )
+        for record in records
+        if record.visible_item_price_sum == int(record.visible_item_price_sum)
+    ]
+    return pl.DataFrame(
+        rows,
+        schema={"order_id": pl.Utf8, "order_date": pl.Date, "amount": pl.Int64},
+        orient="row",
+    )
+
+
+def _confidence(tolerance_days: int) -> pl.Expr:
+    # Same-day matches are certain evidence; confidence falls linearly with
+    # the date gap and stays above zero at the edge of the window.
+    return (1.0 - pl.col("day_gap").abs() / (tolerance_days + 1)).alias("confidence")
+
+
+def _orders_through(orders: pl.DataFrame) -> pl.DataFrame:
+    """Count the orders of each amount dated on or before each order date."""
+    return (
+        orders.group_by("amount", "date")
+        .agg(pl.len().alias("through"))
+        .sort("amount", "date")
+        .with_columns(pl.col("through").cum_sum().over("amount"))
+        .sort("date")
+    )
+
+
+def _rank_pairs(
+    card: pl.DataFrame, orders: pl.DataFrame, tolerance_days: int
+) -> pl.DataFrame:
+    """Assign each card row the rank of the order the greedy rule gives it.
+
+    ``first`` counts the orders dated before the window and ``last`` those
+    dated up to its end, both via an as-of join by amount. Ignoring rows that
+    find their window used up, card ``i`` of an amount takes order
+    ``i + cummax(first - i)``: the earliest order in its window that the
+    earlier card rows left over. ``starved`` marks rows where that order
+    lies past the window.
+    """
+    through = _orders_through(orders)
+    window = timedelta(days=tolerance_days)
+    bounds = []
+    for name, offset in (("first", -window - timedelta(days=1)), ("last", window)):
+        bounds.append(
+            card.select("card_row", "amount", (pl.col("date") + offset).alias("key"))
+            .sort("key")
+            .join_asof(
+                through,
+                left_on="key",
+                right_on="date",
+                by="amount",
+                strategy="backward",
+                # Sorted by date across all amounts, hence within each group.
+                check_sortedness=False,
+            )
+            .select("card_row", pl.col("through").fill_null(0).alias(name))
+        )
+    return (
+        card.join(bounds[0], on="card_row")
+        .join(bounds[1], on="card_row")
+        .filter(pl.col("first") < pl.col("last"))
+        .sort("amount", "date", "card_row")
+        .with_columns(pl.int_range(pl.len(), dtype=pl.Int64).over("amount").alias("i"))
+        .with_columns(
+            (
+                pl.col("i")
+                + (pl.col("first").cast(pl.Int64) - pl.col("i"))
+                .cum_max()
+                .over("amount")
+            ).alias("rank")
+        )
+        .with_columns((pl.col("rank") >= pl.col("last")).alias("starved"))
+    )
+
+
+def reconcile_card_orders(
+    card: pl.DataFrame,
+    orders: pl.DataFrame,
+    *,
+    tolerance_days: int = DEFAULT_TOLERANCE_DAYS,
+    card_sources: Sequence[str] = DEFAULT_CARD_SOURCES,
+    max_passes: int = MAX_RECONCILIATION_PASSES,
+) -> pl.DataFrame:
+    """Link card purchases to commerce orders of the same amount.
+
+    Implements the ``RECONCILIATION_VERSION`` rule with as-of joins and a
+    cumulative maximum per amount instead of pairwise comparisons. One pass
+    settles every amount whose card rows all find an order; an amount where
+    a row finds its window used up is settled up to that row, and the rest
+    is retried against the remaining orders. Rows still open after
+    ``max_passes`` passes are left unlinked and reported in the log.
+
+    Args:
+        card: Normalized transactions; ``card_row`` in the result is the row
+            index in this frame.
+        orders: Output of :func:`orders_frame`.
+
+    Returns:
+        One row per link with the ``LINK_SCHEMA`` columns, ordered by card_row.
+    """
+    if tolerance_days < 0:
+        raise ValueError("tolerance_days must not be negative")
+    if max_passes < 1:
+        raise ValueError("max_passes must be >= 1")
+
+    remaining_card = (
+        card.with_row_index("card_row")
+        .filter(pl.col("source").is_in(list(card_sources)) & (pl.col("amount") < 0))
+        .select(
+            "card_row",
+            (-pl.col("amount")).cast(pl.Int64).alias("amount"),
+            pl.col("transaction_date").alias("date"),
+        )
+    )
+    remaining_orders = orders.select(
+        "order_id",
+        pl.col("amount").cast(pl.Int64),
+        pl.col("order_date").alias("date"),
+    )
+    links = [pl.DataFrame(schema=LINK_SCHEMA)]
+
+    for _ in range(max_passes):
+        ranked_orders = remaining_orders.sort(
+            "amount", "date", "order_id"
+        ).with_columns(
+            pl.int_range(pl.len(), dtype=pl.Int64).over("amount").alias("rank")
+        )
+        paired = _rank_pairs(remaining_card, ranked_orders, tolerance_days)
+        # Rows after the first starved row of an amount took orders one too
+        # late for every starved row before them; they wait for the next pass.
+        paired = paired.with_columns(
+            (pl.col("starved").cum_sum().over("amount") - pl.col("starved")).alias(
+                "blocked"
+            )
+        )
+        settled = paired.filter((pl.col("blocked") == 0) & ~pl.col("starved"))
+        linked = settled.join(ranked_orders, on=["amount", "rank"], suffix="_order")
+        links.append(
+            linked.select(
+                "card_row",
+                "order_id",
+                pl.col("date").alias("transaction_date"),
+                pl.col("date_order").alias("order_date"),
+                "amount",
+                (pl.col("date") - pl.col("date_order"))
+                .dt.total_days()
+                .alias("day_gap"),
+            ).with_columns(_confidence(tolerance_days))
+        )
+        remaining_card = paired.filter(pl.col("blocked") > 0).select(
+            "card_row", "amount", "date"
+        )
+        if remaining_card.is_empty():
+            break
+        remaining_orders = ranked_orders.join(
+            settled.select("amount", "rank"), on=["amount", "rank"], how="anti"
+        ).drop("rank")
+    else:
+        logger.warning(
+            "Reconciliation left {} card rows unresolved after {} passes",
+            remaining_card.height,
+            max_passes,
+        )
+
+    columns = [pl.col(name).cast(dtype) for name, dtype in LINK_SCHEMA.items()]
+    return pl.concat([frame.select(columns) for frame in links]).sort("card_row")
+
+
+def summarize_links(
+    card: pl.DataFrame,
+    orders: pl.DataFrame,
+    links: pl.DataFrame,
+    *,
+    card_sources: Sequence[str] = DEFAULT_CARD_SOURCES,
+) -> ReconciliationSummary:
+    card_rows = card.filter(
+        pl.col("source").is_in(list(card_sources)) & (pl.col("amount") < 0)
+    ).height
+    return ReconciliationSummary(
+        linked=links.height,
+        unmatched_card_rows=card_rows - links.height,
+        unmatched_orders=orders.height - links.height,
+    )
@@ -0,0 +1,263 @@
+"""Replay verification of rendered-evidence bundles against a stored manifest.
+
+The reproducibility contract says the same RAW plus parser version must give
+the same canonical row counts and orders/items semantic SHA-256. A manifest
+records those values together with every record's raw SHA-256; verification
+re-parses the bundle in chunks on a process pool and stops at the first
+mismatch.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from collections.abc import Generator, Mapping, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import closing
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Annotated, Any, Literal
+
+from pydantic import Field, model_validator
+
+from .hashing import (
+    SemanticHasher,
+    canonical_row_bytes,
+    raw_record_sha256,
+    semantic_sha256,
+)
+from .models import StrictModel
+from .parsers.rakuten_jp import (
+    RAKUTEN_PARSER_VERSION,
+    parse_rakuten_bundle,
+    parse_rakuten_record,
+    rakuten_bundle_records,
+)
+
+REPLAY_MANIFEST_FORMAT = "commerce-history-replay-v01"
+DEFAULT_REPLAY_CHUNK_RECORDS = 200
+_SOURCE = "rakuten.co.jp"
+_SHA256_PATTERN = r"^[0-9a-f]{64}$"
+Sha256 = Annotated[str, Field(pattern=_SHA256_PATTERN)]
+
+
+class ReplayManifest(StrictModel):
+    format: Literal["commerce-history-replay-v01"] = "commerce-history-replay-v01"
+    source: str = Field(min_length=1)
+    parser_version: str = Field(min_length=1)
+    account_scope: str = Field(min_length=1)
+    order_rows: int = Field(ge=0)
+    item_rows: int = Field(ge=0)
+    orders_semantic_sha256: Sha256
+    items_semantic_sha256: Sha256
+    raw_record_sha256: tuple[Sha256, ...]
+
+    @model_validator(mode="after")
+    def validate_records(self) -> ReplayManifest:
+        if len(self.raw_record_sha256) != self.order_rows:
+            raise ValueError("manifest needs one raw_record_sha256 per order row")
+        return self
+
+
+@dataclass(frozen=True)
+class ReplayMismatch:
+    """First failed check; ``record_position`` is the 1-based bundle index."""
+
+    check: str
+    record_position: int | None = None
+
+
+@dataclass(frozen=True)
+class ReplayResult:
+    records: int
+    order_rows: int
+    item_rows: int
+    mismatch: ReplayMismatch | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.mismatch is None
+
+
+@dataclass
+class _ChunkReplay:
+    order_rows: list[bytes] = field(default_factory=list)
+    item_rows: list[bytes] = field(default_factory=list)
+    failure: ReplayMismatch | None = None
+
+
+def default_manifest_path(bundle_path: Path) -> Path:
+    """Keep the manifest next to its private bundle."""
+    return bundle_path.with_name(f"{bundle_path.stem}.manifest.json")
+
+
+def build_replay_manifest(
+    bundle: Mapping[str, Any],
+    *,
+    account_scope: str = "primary",
+) -> ReplayManifest:
+    parsed = parse_rakuten_bundle(bundle, account_scope=account_scope)
+    items = [item for record in parsed for item in record.items]
+    return ReplayManifest(
+        source=_SOURCE,
+        parser_version=RAKUTEN_PARSER_VERSION,
+        account_scope=account_scope,
+        order_rows=len(parsed),
+        item_rows=len(items),
+        orders_semantic_sha256=semantic_sha256([record.order for record in parsed]),
+        items_semantic_sha256=semantic_sha256(items),
+        raw_record_sha256=tuple(
+            record.provenance.raw_record_sha256 for record in parsed
+        ),
+    )
+
+
+def _replay_chunk(
+    first_position: int,
+    records: Sequence[Mapping[str, Any]],
+    expected_raw: Sequence[str],
+    account_scope: str,
+) -> _ChunkReplay:
+    chunk = _ChunkReplay()
+    for offset, (record, expected) in enumerate(
+        zip(records, expected_raw, strict=True)
+    ):
+        position = first_position + offset
+        try:
+            recomputed = raw_record_sha256(
+                rendered_html=str(record["rendered_html"]),
+                rendered_text=str(record["rendered_text"]),
+            )
+        except KeyError:
+            recomputed = None
+        if recomputed != expected or record.get("raw_record_sha256") != expected:
+            chunk.failure = ReplayMismatch("raw_record_sha256", position)
+            return chunk
+        try:
+            parsed = parse_rakuten_record(record, account_scope=account_scope)
+        except (KeyError, TypeError, ValueError):
+            chunk.failure = ReplayMismatch("parse", position)
+            return chunk
+        chunk.order_rows.append(canonical_row_bytes(parsed.order))
+        chunk.item_rows.extend(canonical_row_bytes(item) for item in parsed.items)
+    return chunk
+
+
+def _chunk_arguments(
+    records: Sequence[Mapping[str, Any]],
+    manifest: ReplayManifest,
+    chunk_records: int,
+) -> list[tuple[int, Sequence[Mapping[str, Any]], Sequence[str], str]]:
+    return [
+        (
+            start + 1,
+            records[start : start + chunk_records],
+            manifest.raw_record_sha256[start : start + chunk_records],
+            manifest.account_scope,
+        )
+        for start in range(0, len(records), chunk_records)
+    ]
+
+
+def _replay_in_order(
+    arguments: list[tuple[int, Sequence[Mapping[str, Any]], Sequence[str], str]],
+    workers: int,
+) -> Generator[_ChunkReplay, None, None]:
+    """Yield chunk results in bundle order, stopping after the first failure.
+
+    A failed chunk cancels the chunks after it, but earlier chunks still run
+    so that the failure reported is the first one in bundle order.
+    """
+    if workers <= 1 or len(arguments) <= 1:
+        for argument in arguments:
+            chunk = _replay_chunk(*argument)
+            yield chunk
+            if chunk.failure is not None:
+                return
+        return
+
+    # Spawned workers do not inherit the caller's threads or open handles.
+    context = multiprocessing.get_context("spawn")
+    pool = ProcessPoolExecutor(
+        max_workers=min(workers, len(arguments)), mp_context=context
+    )
+    try:
+        pending: dict[Future[_ChunkReplay], int] = {
+            pool.submit(_replay_chunk, *argument): index
+            for index, argument in enumerate(arguments)
+        }
+        completed: dict[int, _ChunkReplay] = {}
+        next_index = 0
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                completed[index] = future.result()
+                if completed[index].failure is None:
+                    continue
+                for later, later_index in list(pending.items()):
+                    if later_index > index and later.cancel():
+                        del pending[later]
+            while next_index in completed:
+                chunk = completed.pop(next_index)
+                yield chunk
+                if chunk.failure is not None:
+                    return
+                next_index += 1
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def verify_replay(
+    bundle: Mapping[str, Any],
+    manifest: ReplayManifest,
+    *,
+    workers: int | None = None,
+    chunk_records: int = DEFAULT_REPLAY_CHUNK_RECORDS,
+) -> ReplayResult:
+    """Re-parse ``bundle`` and compare it with ``manifest``, failing fast.
+
+    Chunks are parsed concurrently on ``workers`` processes (default: CPU
+    count) and hashed in bundle order as they complete. A mismatching record,
+    or a parse failure, cancels the chunks after it; the one reported is the
+    first in bundle order regardless of which worker finishes first.
+    """
+    if chunk_records < 1:
+        raise ValueError("chunk_records must be >= 1")
+    records = rakuten_bundle_records(bundle)
+    orders = SemanticHasher()
+    items = SemanticHasher()
+
+    def mismatch(check: str, position: int | None = None) -> ReplayResult:
+        return ReplayResult(
+            records=orders.rows,
+            order_rows=orders.rows,
+            item_rows=items.rows,
+            mismatch=ReplayMismatch(check, position),
+        )
+
+    if manifest.source != _SOURCE:
+        return mismatch("source")
+    if manifest.parser_version != RAKUTEN_PARSER_VERSION:
+        return mismatch("parser_version")
+    if len(records) != manifest.order_rows:
+        return mismatch("order_rows")
+
+    arguments = _chunk_arguments(records, manifest, chunk_records)
+    replayed = _replay_in_order(arguments, workers or os.cpu_count() or 1)
+    with closing(replayed) as chunks:
+        for chunk in chunks:
+            if chunk.failure is not None:
+                return mismatch(chunk.failure.check, chunk.failure.record_position)
+            orders.update(chunk.order_rows)
+            items.update(chunk.item_rows)
+
+    if items.rows != manifest.item_rows:
+        return mismatch("item_rows")
+    if orders.hexdigest() != manifest.orders_semantic_sha256:
+        return mismatch("orders_semantic_sha256")
+    if items.hexdigest() != manifest.items_semantic_sha256:
+        return mismatch("items_semantic_sha256")
+    return ReplayResult(
+        records=len(records), order_rows=orders.rows, item_rows=items.rows
+    )
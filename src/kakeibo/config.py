@@ -22,6 +22,16 @@ class Settings(BaseSettings):
     input_dir: Path = Path("private/input")
     output_dir: Path = Path("private/output")
     log_dir: Path = Path("private/logs")
+    ledger_dir: Path = Path("private/ledger")
+    # Opaque keys of statements that `kakeibo watch` already handled.
+    watch_state_path: Path = Path("private/state/watch-processed.json")
+    # Categorization runs only when this private rules file exists.
+    category_rules_path: Path = Path("private/category-rules.json")
+    # Rule matches per distinct description, reused until the rules change.
+    category_cache_path: Path = Path("private/cache/category-matches.parquet")
+    category_cache_entries: int = Field(default=200_000, ge=0, le=10_000_000)
+    # Per-input monthly totals reused by snapshot-month.
+    snapshot_cache_path: Path = Path("private/cache/snapshot-inputs.json")
 
     api_enabled: bool = False
     api_token: SecretStr | None = None
@@ -30,7 +40,23 @@ class Settings(BaseSettings):
         ge=1,
         le=50 * 1024 * 1024,
     )
+    # Uploads up to this size are parsed from memory and never written to disk.
+    upload_spool_bytes: int = Field(
+        default=1024 * 1024,
+        ge=0,
+        le=50 * 1024 * 1024,
+    )
     allowed_upload_suffixes: tuple[str, ...] = (".csv", ".txt")
+    # Batch uploads reuse max_upload_bytes per statement and add archive limits.
+    max_batch_bytes: int = Field(
+        default=50 * 1024 * 1024,
+        ge=1,
+        le=500 * 1024 * 1024,
+    )
+    max_batch_files: int = Field(default=64, ge=1, le=1024)
+    batch_workers: int = Field(default=4, ge=1, le=32)
+    # /metrics on the API and review servers, answered only to loopback clients.
+    metrics_enabled: bool = True
 
     # Compatibility snapshots derived from the canonical registry. Processing
     # code does not use these dictionaries for dispatch.
@@ -70,10 +96,18 @@ class Settings(BaseSettings):
             "input_dir": self.input_dir.name,
             "output_dir": self.output_dir.name,
             "log_dir": self.log_dir.name,
+            "ledger_dir": self.ledger_dir.name,
+            "category_rules_configured": self.category_rules_path.is_file(),
+            "category_cache_entries": self.category_cache_entries,
             "api_enabled": self.api_enabled,
             "api_ready": self.api_ready,
             "max_upload_bytes": self.max_upload_bytes,
+            "upload_spool_bytes": self.upload_spool_bytes,
             "allowed_upload_suffixes": self.allowed_upload_suffixes,
+            "max_batch_bytes": self.max_batch_bytes,
+            "max_batch_files": self.max_batch_files,
+            "batch_workers": self.batch_workers,
+            "metrics_enabled": self.metrics_enabled,
             "statement_contracts": statement_contracts,
         }
 
@@ -0,0 +1,302 @@
+import hashlib
+import json
+import unicodedata
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Protocol
+
+import polars as pl
+
+from src.kakeibo.domain.cleaning import NORMALIZED_SCHEMA
+
+CATEGORY_COLUMNS = ("category", "sub_category")
+
+# カテゴリ付与後の出力カラム。ルールが無い場合もカテゴリ列はnullで出力する。
+CATEGORIZED_SCHEMA: dict[str, pl.DataType] = {
+    **NORMALIZED_SCHEMA,
+    "category": pl.Utf8(),
+    "sub_category": pl.Utf8(),
+}
+
+_KEY = "__description_key"
+_ROW = "__row"
+_RULE = "__rule"
+
+
+class CategoryRuleError(ValueError):
+    """カテゴリルールファイルが不正な場合の例外"""
+
+
+@dataclass(frozen=True)
+class CategoryRule:
+    """
+    カテゴリ付与ルール。条件はすべてAND、ルールは先頭から優先する。
+
+    keywords と pattern は正規化 (NFKC・前後空白除去・小文字化) した摘要に対して
+    照合する。keywords は部分一致 (いずれか1つ)、pattern は正規表現、
+    min_amount / max_amount は符号付き金額の範囲 (両端を含む)。
+    """
+
+    category: str
+    sub_category: str | None = None
+    keywords: tuple[str, ...] = ()
+    pattern: str | None = None
+    min_amount: int | None = None
+    max_amount: int | None = None
+
+    @property
+    def has_text_condition(self) -> bool:
+        return bool(self.keywords) or self.pattern is not None
+
+
+def normalize_description_text(text: str) -> str:
+    """ルールのキーワードを摘要と同じ規則で正規化する。"""
+    return unicodedata.normalize("NFKC", text).strip().lower()
+
+
+def normalized_description() -> pl.Expr:
+    """摘要の全角・半角を揃え、前後の空白を除き、小文字にした照合キー"""
+    return (
+        pl.col("description")
+        .fill_null("")
+        .str.normalize("NFKC")
+        .str.strip_chars()
+        .str.to_lowercase()
+    )
+
+
+def load_category_rules(path: Path) -> list[CategoryRule]:
+    """
+    privateなJSONルールファイルを読み込む。
+
+    形式は {"rules": [{"category": ..., "keywords": [...], ...}, ...]}。
+    """
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        entries = payload["rules"]
+        rules = [
+            CategoryRule(
+                category=str(entry["category"]),
+                sub_category=entry.get("sub_category"),
+                keywords=tuple(
+                    normalize_description_text(keyword)
+                    for keyword in entry.get("keywords", ())
+                ),
+                pattern=entry.get("pattern"),
+                min_amount=entry.get("min_amount"),
+                max_amount=entry.get("max_amount"),
+            )
+            for entry in entries
+        ]
+    except (KeyError, TypeError, json.JSONDecodeError) as exc:
+        raise CategoryRuleError("category rules file is invalid") from exc
+    for rule in rules:
+        for bound in (rule.min_amount, rule.max_amount):
+            if bound is not None and (
+                isinstance(bound, bool) or not isinstance(bound, int)
+            ):
+                raise CategoryRuleError("category rule amount bounds must be integers")
+    if any("" in rule.keywords for rule in rules):
+        raise CategoryRuleError("category rule keywords must not be empty")
+    for rule in rules:
+        if rule.pattern is None:
+            continue
+        try:
+            pl.Series([""]).str.contains(rule.pattern)
+        except pl.exceptions.ComputeError as exc:
+            raise CategoryRuleError("category rule pattern is invalid") from exc
+    return rules
+
+
+def rules_version(rules: Sequence[CategoryRule]) -> str:
+    """ルール内容から決まるバージョンハッシュ"""
+    canonical = json.dumps(
+        [asdict(rule) for rule in rules], ensure_ascii=False, sort_keys=True
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class DescriptionMatchCache(Protocol):
+    """摘要ごとの文字列条件の照合結果を、ルールのバージョン単位で保持する。"""
+
+    def lookup(
+        self, version: str, keys: pl.Series
+    ) -> tuple[pl.DataFrame, pl.Series]: ...
+
+    def store(self, version: str, keys: pl.Series, matches: pl.DataFrame) -> None: ...
+
+
+class Categorizer:
+    """
+    CleaningPipeline の出力に category / sub_category を付与する。
+
+    キーワードは全ルール分を1つのAho-Corasickオートマトン (str.extract_many) で
+    照合し、正規表現はルールごとに1回の列演算で照合する。どちらも重複を除いた
+    摘要に対してだけ評価し、金額条件とルールの優先順位は結合と集約で解決する。
+    行ごとのPythonループは使わない。
+
+    cache を渡すと、照合済みの摘要はルールを評価せずに結果を再利用する。
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[CategoryRule],
+        cache: DescriptionMatchCache | None = None,
+    ) -> None:
+        self.rules = list(rules)
+        self.cache = cache
+        self.version = rules_version(self.rules)
+        self._keywords = sorted(
+            {keyword for rule in self.rules for keyword in rule.keywords}
+        )
+        self._keyword_rules = pl.DataFrame(
+            [
+                (keyword, index)
+                for index, rule in enumerate(self.rules)
+                for keyword in rule.keywords
+            ],
+            schema={"__keyword": pl.Utf8, _RULE: pl.UInt32},
+            orient="row",
+        )
+        self._rule_table = pl.DataFrame(
+            {
+                _RULE: list(range(len(self.rules))),
+                "__min": [rule.min_amount for rule in self.rules],
+                "__max": [rule.max_amount for rule in self.rules],
+                "category": [rule.category for rule in self.rules],
+                "sub_category": [rule.sub_category for rule in self.rules],
+            },
+            schema={
+                _RULE: pl.UInt32,
+                "__min": pl.Int64,
+                "__max": pl.Int64,
+                "category": pl.Utf8,
+                "sub_category": pl.Utf8,
+            },
+        )
+        self._text_conditions = pl.DataFrame(
+            {
+                _RULE: list(range(len(self.rules))),
+                "__needs_keyword": [bool(rule.keywords) for rule in self.rules],
+                "__needs_pattern": [rule.pattern is not None for rule in self.rules],
+            },
+            schema={
+                _RULE: pl.UInt32,
+                "__needs_keyword": pl.Boolean,
+                "__needs_pattern": pl.Boolean,
+            },
+        )
+        self._amount_only = [
+            index
+            for index, rule in enumerate(self.rules)
+            if not rule.has_text_condition
+        ]
+
+    def match_descriptions(self, keys: pl.Series) -> pl.DataFrame:
+        """
+        正規化済みの摘要ごとに、文字列条件を満たすルール番号を返す。
+
+        Returns:
+            __description_key と __rule の組 (1つの摘要に複数行あり得る)
+        """
+        keys_frame = pl.DataFrame({_KEY: keys}, schema={_KEY: pl.Utf8})
+        pair_schema = {_KEY: pl.Utf8, _RULE: pl.UInt32}
+
+        keyword_hits = pl.DataFrame(schema=pair_schema)
+        if self._keywords:
+            keyword_hits = (
+                keys_frame.with_columns(
+                    pl.col(_KEY)
+                    .str.extract_many(self._keywords, overlapping=True)
+                    .alias("__keyword")
+                )
+                .explode("__keyword")
+                .join(self._keyword_rules, on="__keyword")
+                .select(_KEY, _RULE)
+                .unique()
+            )
+
+        regex_hits = pl.concat(
+            [
+                pl.DataFrame(schema=pair_schema),
+                *(
+                    keys_frame.filter(pl.col(_KEY).str.contains(rule.pattern)).select(
+                        _KEY, pl.lit(index, dtype=pl.UInt32).alias(_RULE)
+                    )
+                    for index, rule in enumerate(self.rules)
+                    if rule.pattern is not None
+                ),
+            ]
+        )
+
+        # キーワードと正規表現の両方を持つルールは、両方に一致した摘要だけ残す
+        return (
+            keyword_hits.with_columns(pl.lit(True).alias("__keyword_hit"))
+            .join(
+                regex_hits.with_columns(pl.lit(True).alias("__pattern_hit")),
+                on=[_KEY, _RULE],
+                how="full",
+                coalesce=True,
+            )
+            .join(self._text_conditions, on=_RULE)
+            .filter(
+                (~pl.col("__needs_keyword") | pl.col("__keyword_hit").fill_null(False))
+                & (
+                    ~pl.col("__needs_pattern")
+                    | pl.col("__pattern_hit").fill_null(False)
+                )
+            )
+            .select(_KEY, _RULE)
+        )
+
+    def categorize(self, df: pl.DataFrame) -> pl.DataFrame:
+        """最初に一致したルールのカテゴリを付与し、CATEGORIZED_SCHEMA で返す。"""
+        keyed = df.with_columns(normalized_description().alias(_KEY)).with_row_index(
+            _ROW
+        )
+        keys = keyed.get_column(_KEY).unique()
+        if self.cache is None:
+            return self._resolve(keyed, self.match_descriptions(keys))
+
+        cached, missing = self.cache.lookup(self.version, keys)
+        computed = self.match_descriptions(missing)
+        self.cache.store(self.version, missing, computed)
+        return self._resolve(keyed, pl.concat([cached, computed]))
+
+    def _resolve(self, keyed: pl.DataFrame, text_matches: pl.DataFrame) -> pl.DataFrame:
+        rows = keyed.select(_ROW, _KEY, "amount")
+        candidates = [rows.join(text_matches, on=_KEY).select(_ROW, "amount", _RULE)]
+        if self._amount_only:
+            candidates.append(
+                rows.select(_ROW, "amount").join(
+                    pl.DataFrame({_RULE: self._amount_only}, schema={_RULE: pl.UInt32}),
+                    how="cross",
+                )
+            )
+
+        amount = pl.col("amount")
+        chosen = (
+            pl.concat(candidates)
+            .join(self._rule_table, on=_RULE)
+            .filter(
+                (pl.col("__min").is_null() | (amount >= pl.col("__min")))
+                & (pl.col("__max").is_null() | (amount <= pl.col("__max")))
+            )
+            .group_by(_ROW)
+            .agg(pl.col(_RULE).min())
+            .join(self._rule_table.select(_RULE, *CATEGORY_COLUMNS), on=_RULE)
+            .drop(_RULE)
+        )
+        return (
+            keyed.drop(CATEGORY_COLUMNS, strict=False)
+            .join(chosen, on=_ROW, how="left", maintain_order="left")
+            .select(list(CATEGORIZED_SCHEMA))
+        )
+
+
+def with_empty_categories(df: pl.DataFrame) -> pl.DataFrame:
+    """ルールが無い場合に、カテゴリ列をnullで追加する。"""
+    return df.with_columns(
+        pl.lit(None, dtype=pl.Utf8).alias(column) for column in CATEGORY_COLUMNS
+    ).select(list(CATEGORIZED_SCHEMA))
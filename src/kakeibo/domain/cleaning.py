@@ -1,5 +1,19 @@
 import polars as pl
 
+# 明細ごとに推定する日付形式。標本の値を最も多く解釈できたものを採用する。
+DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%Y年%m月%d日")
+DATE_SAMPLE_SIZE = 32
+
+# CleaningPipelineが出力する正規化済みカラムとその型
+NORMALIZED_SCHEMA: dict[str, pl.DataType] = {
+    "transaction_date": pl.Date(),
+    "amount": pl.Int64(),
+    "description": pl.Utf8(),
+    "balance": pl.Int64(),
+    "memo": pl.Utf8(),
+    "source": pl.Utf8(),
+}
+
 
 class CleaningPipeline:
     """データクリーニングパイプライン"""
@@ -27,14 +41,7 @@ class CleaningPipeline:
         df = df.filter(pl.col("transaction_date").is_not_null())
         df = df.with_columns(pl.lit(source).alias("source"))
 
-        final_columns = [
-            "transaction_date",
-            "amount",
-            "description",
-            "balance",
-            "memo",
-            "source",
-        ]
+        final_columns = list(NORMALIZED_SCHEMA)
         for column in final_columns:
             if column not in df.columns:
                 df = df.with_columns(pl.lit(None).alias(column))
@@ -75,19 +82,46 @@ class CleaningPipeline:
             df = df.with_columns(pl.lit(None).alias("memo"))
         return df
 
+    def _infer_date_format(self, raw_dates: pl.Series) -> str | None:
+        """先頭の非null値を標本にして、最も多く解釈できる日付形式を選ぶ。"""
+        sample = raw_dates.drop_nulls().head(DATE_SAMPLE_SIZE)
+        if sample.is_empty():
+            return None
+        scores = {
+            date_format: sample.str.to_date(date_format, strict=False).count()
+            for date_format in DATE_FORMATS
+        }
+        best = max(scores, key=lambda date_format: scores[date_format])
+        return best if scores[best] else None
+
     def _parse_dates(self, df: pl.DataFrame) -> pl.DataFrame:
+        """推定した1形式で日付列を一度だけパースし、失敗した行だけ従来の方法で再解析する。"""
+        raw_dates = df.get_column("raw_date").cast(pl.Utf8)
+        date_format = self._infer_date_format(raw_dates)
+        if date_format is None:
+            parsed = pl.Series(values=[None] * len(raw_dates), dtype=pl.Date)
+        else:
+            parsed = raw_dates.str.to_date(date_format, strict=False)
+
+        failed = (parsed.is_null() & raw_dates.is_not_null()).arg_true()
+        if len(failed):
+            fallback = self._parse_dates_fallback(raw_dates.gather(failed))
+            parsed = parsed.scatter(failed, fallback)
+
+        return df.with_columns(parsed.alias("transaction_date"))
+
+    def _parse_dates_fallback(self, raw_dates: pl.Series) -> pl.Series:
         """日付文字列を複数の既知形式からパースする。"""
-        date_column = pl.col("raw_date")
-        normalized_date = date_column.str.replace(
+        normalized_date = raw_dates.str.replace(
             r"(\d{4})年(\d{1,2})月(\d{1,2})日",
             "$1-$2-$3",
         ).str.replace_all("/", "-")
 
-        return df.with_columns(
+        return pl.select(
             pl.coalesce(
                 [
                     normalized_date.str.to_date("%Y-%m-%d", strict=False),
                     normalized_date.str.to_date("%Y/%m/%d", strict=False),
                 ]
-            ).alias("transaction_date")
-        )
+            )
+        ).to_series()
@@ -0,0 +1,79 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import polars as pl
+
+# 重複判定に使う正準fingerprint。残高やメモは明細ごとに揺れ得るため含めない。
+FINGERPRINT_COLUMNS = ("transaction_date", "amount", "description", "source")
+
+_INPUT_INDEX = "__input_index"
+_OCCURRENCE = "__occurrence"
+
+
+@dataclass(frozen=True)
+class OverlapReport:
+    """データソースごとの重複除去件数"""
+
+    source: str | None
+    input_rows: int
+    kept_rows: int
+    removed_rows: int
+
+
+def deduplicate_overlaps(
+    frames: Sequence[pl.DataFrame],
+) -> tuple[pl.DataFrame, list[OverlapReport]]:
+    """
+    期間が重なる複数の正規化済み明細を結合し、重複行を除去する。
+
+    各明細内でfingerprintごとに出現番号を振り、(fingerprint, 出現番号) を
+    キーに最初の明細の行だけを残す。同じ日に同じ店で同額の取引が2回ある場合も、
+    どちらかの明細に2回現れていれば2件とも残る。ハッシュによる集約なので
+    全体の行数に対してほぼ線形時間で動く。
+
+    Args:
+        frames: CleaningPipeline出力と同じカラムを持つDataFrame (優先順)
+
+    Returns:
+        重複を除いたDataFrameと、データソースごとの除去件数
+    """
+    if not frames:
+        raise ValueError("at least one normalized frame is required")
+
+    key = [*FINGERPRINT_COLUMNS, _OCCURRENCE]
+    combined = pl.concat(
+        [
+            frame.with_columns(pl.lit(index, dtype=pl.UInt32).alias(_INPUT_INDEX))
+            for index, frame in enumerate(frames)
+        ],
+        how="diagonal_relaxed",
+    ).with_columns(
+        pl.int_range(pl.len(), dtype=pl.UInt32)
+        .over([_INPUT_INDEX, *FINGERPRINT_COLUMNS])
+        .alias(_OCCURRENCE)
+    )
+    kept = pl.struct(key).is_first_distinct().alias("__kept")
+    marked = combined.with_columns(kept)
+
+    report_frame = (
+        marked.group_by("source", maintain_order=True)
+        .agg(
+            pl.len().alias("input_rows"),
+            pl.col("__kept").sum().alias("kept_rows"),
+        )
+        .sort("source", nulls_last=True)
+    )
+    reports = [
+        OverlapReport(
+            source=row["source"],
+            input_rows=row["input_rows"],
+            kept_rows=row["kept_rows"],
+            removed_rows=row["input_rows"] - row["kept_rows"],
+        )
+        for row in report_frame.iter_rows(named=True)
+    ]
+
+    deduplicated = marked.filter(pl.col("__kept")).drop(
+        _INPUT_INDEX, _OCCURRENCE, "__kept"
+    )
+    return deduplicated, reports
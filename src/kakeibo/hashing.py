@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import hashlib
+import io
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Buffer
+
+# Large reads keep per-call overhead low; hashlib releases the GIL while it
+# digests each buffer.
+HASH_BUFFER_BYTES = 1024 * 1024
+
+
+def file_sha256(path: Path) -> str:
+    """Hash a file without holding its content in memory."""
+    with path.open("rb", buffering=0) as handle:
+        return hashlib.file_digest(handle, "sha256").hexdigest()
+
+
+class HashingReader(io.RawIOBase):
+    """Raw binary reader that hashes every byte passed through it.
+
+    Wrap it in ``io.TextIOWrapper`` to decode and hash a file in one
+    streaming pass.
+    """
+
+    def __init__(self, raw: io.RawIOBase) -> None:
+        super().__init__()
+        self._raw = raw
+        self._digest = hashlib.sha256()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        read = self._raw.readinto(view)
+        if read:
+            self._digest.update(view[:read])
+        return read or 0
+
+    def close(self) -> None:
+        if not self.closed:
+            self._raw.close()
+        super().close()
+
+    def hexdigest(self) -> str:
+        """Consume any unread bytes and return the SHA-256 of the whole stream."""
+        while chunk := self._raw.read(HASH_BUFFER_BYTES):
+            self._digest.update(chunk)
+        return self._digest.hexdigest()
+
+
+def open_text_hashed(
+    path: Path, encoding: str
+) -> tuple[io.TextIOWrapper, HashingReader]:
+    """Open ``path`` for streaming text reads while hashing the raw bytes."""
+    reader = HashingReader(path.open("rb", buffering=0))
+    text = io.TextIOWrapper(
+        io.BufferedReader(reader, HASH_BUFFER_BYTES), encoding=encoding, newline=""
+    )
+    return text, reader
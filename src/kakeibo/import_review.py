@@ -16,14 +16,21 @@ from fastapi.responses import HTMLResponse, Response
 from pydantic import BaseModel
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 
+from src.kakeibo.category_cache import CategoryCache
 from src.kakeibo.config import Settings, settings
+from src.kakeibo.domain.categorization import with_empty_categories
 from src.kakeibo.domain.cleaning import CleaningPipeline
+from src.kakeibo.hashing import file_sha256
+from src.kakeibo.instrumentation import NullStageRecorder, StageRecorder, measure_stage
+from src.kakeibo.metrics import ServiceMetrics, install_metrics
+from src.kakeibo.ports.parser import StatementSource
 from src.kakeibo.security import private_output_name
 from src.kakeibo.statement_types import (
     STATEMENT_TYPES,
     StatementTypeError,
     statement_spec,
 )
+from src.kakeibo.use_cases.process_file import default_categorizer
 
 
 class ReviewRejected(ValueError):
@@ -64,14 +71,6 @@ class CancelRequest(BaseModel):
     review_token: str
 
 
-def _sha256(path: Path) -> str:
-    digest = hashlib.sha256()
-    with path.open("rb") as handle:
-        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
-            digest.update(chunk)
-    return digest.hexdigest()
-
-
 def _iso_date(value: object) -> str | None:
     if value is None:
         return None
@@ -112,11 +111,15 @@ def _write_private(path: Path, data: bytes) -> None:
 
 
 class LocalImportService:
-    def __init__(self, app_settings: Settings) -> None:
+    def __init__(
+        self, app_settings: Settings, recorder: StageRecorder | None = None
+    ) -> None:
         self.settings = app_settings
+        self.recorder = recorder or NullStageRecorder()
         self.cleaner = CleaningPipeline()
         self.sessions: dict[str, ReviewSession] = {}
         self.lock = Lock()
+        self.categorize_lock = Lock()
 
     @property
     def staging_dir(self) -> Path:
@@ -127,14 +130,49 @@ class LocalImportService:
         self.settings.output_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
 
     def _parse(
-        self, session_path: Path, statement_type: str, suffix: str
+        self, source: StatementSource, statement_type: str, suffix: str
     ) -> tuple[object, pl.DataFrame, pl.DataFrame]:
         spec = statement_spec(statement_type, suffix)
         parser = spec.parser_factory()
-        raw = parser.parse(session_path, spec.encoding)
-        cleaned = self.cleaner.process(raw, statement_type)
+        # Review sessions have no file id of their own; stages are aggregated.
+        with measure_stage(
+            self.recorder, file_id="review", source_type=spec.name, stage="parse"
+        ) as parse_stage:
+            raw = parser.parse(source, spec.encoding)
+            parse_stage.rows_out = raw.height
+        with measure_stage(
+            self.recorder,
+            file_id="review",
+            source_type=spec.name,
+            stage="clean",
+            rows_in=raw.height,
+        ) as clean_stage:
+            cleaned = self.cleaner.process(raw, statement_type)
+            clean_stage.rows_out = cleaned.height
         return parser, raw, cleaned
 
+    def _categorize(self, cleaned: pl.DataFrame, statement_type: str) -> pl.DataFrame:
+        # Rules are read per commit so edits apply without a restart; the match
+        # cache is shared on disk, so commits categorize in turn.
+        with self.categorize_lock:
+            categorizer = default_categorizer(self.settings)
+            with measure_stage(
+                self.recorder,
+                file_id="review",
+                source_type=statement_type,
+                stage="categorize",
+                rows_in=cleaned.height,
+            ) as categorize_stage:
+                if categorizer is None:
+                    categorized = with_empty_categories(cleaned)
+                else:
+                    categorized = categorizer.categorize(cleaned)
+                categorize_stage.rows_out = categorized.height
+            cache = categorizer.cache if categorizer is not None else None
+            if isinstance(cache, CategoryCache):
+                cache.save()
+        return categorized
+
     def review(
         self, body: bytes, statement_type: str | None, suffix: str | None
     ) -> dict[str, object]:
@@ -153,15 +191,13 @@ class LocalImportService:
         _write_private(staged_path, body)
 
         try:
-            parser, raw, cleaned = self._parse(
-                staged_path, spec.name, normalized_suffix
-            )
+            parser, raw, cleaned = self._parse(body, spec.name, normalized_suffix)
             aggregate = _aggregate(raw, cleaned)
             destination = (self.settings.output_dir / private_output_name()).resolve()
             session = ReviewSession(
                 token=token,
                 staged_path=staged_path,
-                input_sha256=_sha256(staged_path),
+                input_sha256=hashlib.sha256(body).hexdigest(),
                 statement_type=spec.name,
                 suffix=normalized_suffix,
                 parser_name=type(parser).__name__,
@@ -205,7 +241,7 @@ class LocalImportService:
             raise ReviewRejected("review session is missing or expired")
         if destination != str(session.destination):
             raise ReviewRejected("destination confirmation does not match")
-        if _sha256(session.staged_path) != session.input_sha256:
+        if file_sha256(session.staged_path) != session.input_sha256:
             raise ReviewRejected("staged input hash changed")
 
         try:
@@ -221,8 +257,9 @@ class LocalImportService:
             temporary = session.destination.with_name(
                 f".{session.destination.name}.tmp"
             )
+            categorized = self._categorize(cleaned, session.statement_type)
             temporary.unlink(missing_ok=True)
-            cleaned.write_csv(temporary)
+            categorized.write_csv(temporary)
             temporary.chmod(0o600)
             written = pl.read_csv(temporary)
             written_total_value = (
@@ -236,7 +273,7 @@ class LocalImportService:
                 temporary.unlink(missing_ok=True)
                 raise ReviewRejected("post-write reconciliation failed")
             temporary.replace(session.destination)
-            output_sha256 = _sha256(session.destination)
+            output_sha256 = file_sha256(session.destination)
         except ReviewRejected:
             raise
         except Exception:
@@ -292,8 +329,17 @@ byId('cancel').addEventListener('click',async()=>{if(reviewData)await fetch('/ca
 </script></body></html>"""
 
 
-def create_app(service: LocalImportService | None = None) -> FastAPI:
-    import_service = service or LocalImportService(settings)
+def create_app(
+    service: LocalImportService | None = None,
+    metrics: ServiceMetrics | None = None,
+) -> FastAPI:
+    metrics = metrics or ServiceMetrics()
+    import_service = service or LocalImportService(settings, recorder=metrics)
+    metrics.registry.gauge(
+        "kakeibo_review_active_sessions",
+        "Staged review sessions waiting for commit or cancel.",
+        lambda: len(import_service.sessions),
+    )
     application = FastAPI(
         title="kakeibo Local Import Review",
         docs_url=None,
@@ -359,6 +405,7 @@ def create_app(service: LocalImportService | None = None) -> FastAPI:
     def cancel(payload: CancelRequest) -> dict[str, object]:
         return import_service.cancel(payload.review_token)
 
+    install_metrics(application, metrics)
     return application
 
 
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from threading import Lock
+from typing import Any, Protocol
+
+STAGE_METRICS_FILENAME = "stage-metrics.jsonl"
+
+
+@dataclass(frozen=True)
+class StageMetrics:
+    """One pipeline stage measurement; carries no paths or statement content."""
+
+    file_id: str
+    source_type: str
+    stage: str
+    wall_seconds: float
+    rows_in: int | None
+    rows_out: int | None
+    rss_delta_bytes: int | None
+    tracemalloc_peak_bytes: int | None
+    recorded_at: str
+
+
+class StageRecorder(Protocol):
+    def record(self, metrics: StageMetrics) -> None:
+        """Persist or forward one stage measurement."""
+        ...
+
+
+class NullStageRecorder:
+    def record(self, metrics: StageMetrics) -> None:
+        del metrics
+
+
+class JsonlStageRecorder:
+    """Append stage metrics as JSON lines, safe to share between threads."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.lock = Lock()
+
+    def record(self, metrics: StageMetrics) -> None:
+        line = json.dumps(asdict(metrics), sort_keys=True, separators=(",", ":"))
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+            descriptor = os.open(
+                self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600
+            )
+            with os.fdopen(descriptor, "a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+
+
+@dataclass
+class StageMeasurement:
+    rows_in: int | None = None
+    rows_out: int | None = None
+
+
+def _current_rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as handle:
+            resident_pages = int(handle.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+@contextmanager
+def measure_stage(
+    recorder: StageRecorder,
+    *,
+    file_id: str,
+    source_type: str,
+    stage: str,
+    rows_in: int | None = None,
+) -> Iterator[StageMeasurement]:
+    """Time a stage and record it once the block completes successfully.
+
+    The tracemalloc peak is only captured when the caller enabled tracing,
+    because tracing slows every allocation down.
+    """
+    measurement = StageMeasurement(rows_in=rows_in)
+    tracing = tracemalloc.is_tracing()
+    traced_before = 0
+    if tracing:
+        traced_before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    rss_before = _current_rss_bytes()
+    started = time.perf_counter()
+
+    yield measurement
+
+    wall_seconds = time.perf_counter() - started
+    rss_after = _current_rss_bytes()
+    recorder.record(
+        StageMetrics(
+            file_id=file_id,
+            source_type=source_type,
+            stage=stage,
+            wall_seconds=round(wall_seconds, 6),
+            rows_in=measurement.rows_in,
+            rows_out=measurement.rows_out,
+            rss_delta_bytes=(
+                rss_after - rss_before
+                if rss_before is not None and rss_after is not None
+                else None
+            ),
+            tracemalloc_peak_bytes=(
+                tracemalloc.get_traced_memory()[1] - traced_before if tracing else None
+            ),
+            recorded_at=datetime.now(UTC).isoformat(timespec="seconds"),
+        )
+    )
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[
+        round(fraction * 100) - 1
+    ]
+
+
+def summarize_stage_metrics(path: Path) -> list[dict[str, object]]:
+    """Aggregate a stage-metrics JSONL file per (source_type, stage)."""
+    groups: dict[tuple[str, str], list[dict[str, Any]]] = {}
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            key = (str(entry["source_type"]), str(entry["stage"]))
+            groups.setdefault(key, []).append(entry)
+
+    summary: list[dict[str, object]] = []
+    for (source_type, stage), entries in sorted(groups.items()):
+        walls = sorted(float(entry["wall_seconds"]) for entry in entries)
+        rows = sum(int(entry["rows_out"] or 0) for entry in entries)
+        total_wall = sum(walls)
+        summary.append(
+            {
+                "source_type": source_type,
+                "stage": stage,
+                "runs": len(entries),
+                "rows_out": rows,
+                "wall_p50": round(_percentile(walls, 0.5), 6),
+                "wall_p95": round(_percentile(walls, 0.95), 6),
+                "wall_max": round(walls[-1], 6),
+                "rows_per_second": round(rows / total_wall, 1) if total_wall else None,
+            }
+        )
+    return summary
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+import polars as pl
+
+from src.kakeibo.domain.categorization import CATEGORIZED_SCHEMA
+from src.kakeibo.domain.cleaning import NORMALIZED_SCHEMA
+from src.kakeibo.hashing import file_sha256
+
+MANIFEST_NAME = "manifest.json"
+# Version 2 added the category columns; version 1 parts lack them.
+MANIFEST_VERSION = 2
+LEDGER_SCHEMA = CATEGORIZED_SCHEMA
+_UNCATEGORIZED_MANIFEST_VERSION = 1
+
+_SOURCE_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+_MONTH_PATTERN = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+
+
+class LedgerError(ValueError):
+    """Raised when the ledger dataset or its manifest cannot be used safely."""
+
+
+@dataclass(frozen=True)
+class AppendResult:
+    appended_rows: int
+    partitions: int
+    skipped_inputs: int
+
+
+def _partition_key(month: str, source: str) -> str:
+    return f"month={month}/source={source}"
+
+
+def _validate_month(month: str | None) -> None:
+    if month is not None and not _MONTH_PATTERN.fullmatch(month):
+        raise LedgerError("month must use YYYY-MM")
+
+
+def _to_ledger_schema(frame: pl.DataFrame) -> pl.DataFrame:
+    # Outputs written before categorization existed have no category columns
+    return frame.select(
+        (pl.col(name) if name in frame.columns else pl.lit(None))
+        .cast(dtype)
+        .alias(name)
+        for name, dtype in LEDGER_SCHEMA.items()
+    )
+
+
+class Ledger:
+    """Month/source-partitioned Parquet dataset of normalized transactions.
+
+    The manifest lists every data file per partition, so readers select files
+    without walking the directory tree and an interrupted write never exposes
+    a half-written file: data files are renamed into place before the manifest
+    that references them is replaced.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.manifest_path = root / MANIFEST_NAME
+
+    def _read_manifest(self) -> dict[str, Any]:
+        if not self.manifest_path.is_file():
+            return {"version": MANIFEST_VERSION, "inputs": [], "partitions": {}}
+        manifest: dict[str, Any] = json.loads(
+            self.manifest_path.read_text(encoding="utf-8")
+        )
+        return manifest
+
+    def _load_manifest(self) -> dict[str, Any]:
+        manifest = self._read_manifest()
+        version = manifest.get("version")
+        if version == _UNCATEGORIZED_MANIFEST_VERSION:
+            raise LedgerError(
+                "ledger manifest version 1 has no category columns; "
+                "run `kakeibo ledger migrate` first"
+            )
+        if version != MANIFEST_VERSION:
+            raise LedgerError("unsupported ledger manifest version")
+        return manifest
+
+    def _save_manifest(self, manifest: dict[str, Any]) -> None:
+        temporary = self.manifest_path.with_name(f".{MANIFEST_NAME}.{uuid4().hex}")
+        temporary.write_text(
+            json.dumps(manifest, ensure_ascii=False, sort_keys=True, indent=2) + "\n",
+            encoding="utf-8",
+        )
+        os.replace(temporary, self.manifest_path)
+
+    def _write_part(self, key: str, frame: pl.DataFrame) -> dict[str, Any]:
+        directory = self.root / key
+        directory.mkdir(parents=True, exist_ok=True, mode=0o700)
+        name = f"part-{uuid4().hex[:16]}.parquet"
+        temporary = directory / f".{name}"
+        frame.write_parquet(temporary, statistics=True)
+        os.replace(temporary, directory / name)
+        return {"name": name, "rows": frame.height}
+
+    def append(
+        self, frame: pl.DataFrame, *, input_sha256: str | None = None
+    ) -> AppendResult:
+        """Append normalized rows, splitting them into month/source partitions.
+
+        When ``input_sha256`` is given, an input that was already appended is
+        skipped so re-running ``ledger append`` never duplicates rows.
+        """
+        missing = set(NORMALIZED_SCHEMA) - set(frame.columns)
+        if missing:
+            raise LedgerError("normalized frame is missing ledger columns")
+
+        self.root.mkdir(parents=True, exist_ok=True, mode=0o700)
+        manifest = self._load_manifest()
+        if input_sha256 is not None and input_sha256 in manifest["inputs"]:
+            return AppendResult(appended_rows=0, partitions=0, skipped_inputs=1)
+
+        frame = _to_ledger_schema(frame).with_columns(
+            pl.col("transaction_date").dt.strftime("%Y-%m").alias("_month")
+        )
+        parts = frame.partition_by(
+            ["_month", "source"], as_dict=True, maintain_order=True
+        )
+        for _month, source in parts:
+            if not isinstance(source, str) or not _SOURCE_PATTERN.fullmatch(source):
+                raise LedgerError("source must be a statement type identifier")
+
+        for (month, source), part in parts.items():
+            key = _partition_key(str(month), str(source))
+            entry = self._write_part(key, part.drop("_month"))
+            manifest["partitions"].setdefault(key, []).append(entry)
+
+        if input_sha256 is not None:
+            manifest["inputs"].append(input_sha256)
+        self._save_manifest(manifest)
+        return AppendResult(
+            appended_rows=frame.height, partitions=len(parts), skipped_inputs=0
+        )
+
+    def append_csv(self, paths: Iterable[Path]) -> AppendResult:
+        """Append normalized CSV outputs, skipping inputs already in the ledger."""
+        from src.kakeibo.adapters.normalized_csv import read_normalized_csv
+
+        rows = partitions = skipped = 0
+        for path in paths:
+            result = self.append(
+                read_normalized_csv(path), input_sha256=file_sha256(path)
+            )
+            rows += result.appended_rows
+            partitions += result.partitions
+            skipped += result.skipped_inputs
+        return AppendResult(
+            appended_rows=rows, partitions=partitions, skipped_inputs=skipped
+        )
+
+    def compact(self, *, min_files: int = 2) -> int:
+        """Merge each partition holding at least ``min_files`` files into one.
+
+        Returns the number of partitions that were rewritten.
+        """
+        manifest = self._load_manifest()
+        compacted = 0
+        obsolete: list[Path] = []
+        for key, entries in sorted(manifest["partitions"].items()):
+            if len(entries) < min_files:
+                continue
+            paths = [self.root / key / entry["name"] for entry in entries]
+            merged = pl.concat([pl.read_parquet(path) for path in paths])
+            manifest["partitions"][key] = [self._write_part(key, merged)]
+            obsolete.extend(paths)
+            compacted += 1
+        if compacted:
+            self._save_manifest(manifest)
+            for path in obsolete:
+                path.unlink(missing_ok=True)
+        return compacted
+
+    def migrate(self) -> int:
+        """Rewrite a version 1 ledger with empty category columns.
+
+        New parts are written before the manifest is replaced, so an
+        interrupted migration leaves the version 1 ledger intact. Returns the
+        number of rewritten partitions; a current ledger is left unchanged.
+        """
+        manifest = self._read_manifest()
+        version = manifest.get("version")
+        if version == MANIFEST_VERSION:
+            return 0
+        if version != _UNCATEGORIZED_MANIFEST_VERSION:
+            raise LedgerError("unsupported ledger manifest version")
+
+        obsolete: list[Path] = []
+        for key, entries in sorted(manifest["partitions"].items()):
+            paths = [self.root / key / entry["name"] for entry in entries]
+            manifest["partitions"][key] = [
+                self._write_part(key, _to_ledger_schema(pl.read_parquet(path)))
+                for path in paths
+            ]
+            obsolete.extend(paths)
+        manifest["version"] = MANIFEST_VERSION
+        self._save_manifest(manifest)
+        for path in obsolete:
+            path.unlink(missing_ok=True)
+        return len(manifest["partitions"])
+
+    def files(
+        self,
+        *,
+        month_from: str | None = None,
+        month_to: str | None = None,
+        sources: Sequence[str] | None = None,
+    ) -> list[Path]:
+        """Return data files whose partition can contain matching rows."""
+        _validate_month(month_from)
+        _validate_month(month_to)
+        selected: list[Path] = []
+        for key, entries in sorted(self._load_manifest()["partitions"].items()):
+            month_part, source_part = key.split("/")
+            month = month_part.removeprefix("month=")
+            source = source_part.removeprefix("source=")
+            if month_from is not None and month < month_from:
+                continue
+            if month_to is not None and month > month_to:
+                continue
+            if sources is not None and source not in sources:
+                continue
+            selected.extend(self.root / key / entry["name"] for entry in entries)
+        return selected
+
+    def scan(
+        self,
+        *,
+        month_from: str | None = None,
+        month_to: str | None = None,
+        sources: Sequence[str] | None = None,
+    ) -> pl.LazyFrame:
+        """Lazily scan only the partitions that match the month and source range.
+
+        Further filters on the returned frame are pushed down into the Parquet
+        reader and use row-group statistics.
+        """
+        paths = self.files(month_from=month_from, month_to=month_to, sources=sources)
+        if not paths:
+            return pl.LazyFrame(schema=LEDGER_SCHEMA)
+        return pl.scan_parquet(paths)
@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+import math
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Sequence
+from threading import Lock
+from typing import TypeVar
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.kakeibo.config import settings
+from src.kakeibo.instrumentation import StageMetrics
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LOOPBACK_CLIENTS = frozenset({"127.0.0.1", "::1"})
+
+# Rejections are labelled with a fixed reason code, never with request data.
+REJECTION_REASONS = {
+    400: "bad_request",
+    401: "unauthorized",
+    403: "forbidden",
+    404: "not_found",
+    409: "conflict",
+    413: "too_large",
+    415: "unsupported_statement",
+    422: "unprocessable",
+    503: "disabled",
+}
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str]) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._lock = Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def header(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+    @abstractmethod
+    def samples(self) -> list[str]: ...
+
+
+_M = TypeVar("_M", bound=_Metric)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str]) -> None:
+        super().__init__(name, help_text, labels)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("counters only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_number(value)}"
+            for key, value in values
+        ]
+
+
+class Gauge(_Metric):
+    """Unlabelled gauge whose value is read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, read: Callable[[], float]) -> None:
+        super().__init__(name, help_text, ())
+        self._read = read
+
+    def samples(self) -> list[str]:
+        return [f"{self.name} {_format_number(self._read())}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str],
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: counts per bucket (non-cumulative), sum, count.
+        self._series: dict[LabelValues, tuple[list[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._series.get(
+                key, ([0] * len(self.buckets), 0.0, 0)
+            )
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._series[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+        return series[2] if series is not None else 0
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            series = sorted(
+                (key, (list(counts), total, count))
+                for key, (counts, total, count) in self._series.items()
+            )
+        lines: list[str] = []
+        bucket_labels = (*self.labels, "le")
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts, strict=True):
+                cumulative += bucket_count
+                labels = _format_labels(bucket_labels, (*key, _format_number(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(bucket_labels, (*key, "+Inf"))
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Minimal in-process registry rendered in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _M) -> _M:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]) -> Gauge:
+        return self._register(Gauge(name, help_text, read))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+class ServiceMetrics:
+    """Operational metrics shared by the API and the import review server.
+
+    Labels are limited to route templates, HTTP methods and statuses,
+    registry statement types, pipeline stage names and fixed rejection
+    reasons, so no filename, path or statement content can reach a scrape.
+    It is also a ``StageRecorder`` for ``ProcessFileUseCase``.
+    """
+
+    def __init__(self) -> None:
+        self.registry = MetricsRegistry()
+        self.request_seconds = self.registry.histogram(
+            "kakeibo_http_request_duration_seconds",
+            "HTTP request latency by route template.",
+            ("method", "route", "status"),
+        )
+        self.received_bytes = self.registry.counter(
+            "kakeibo_http_received_bytes_total",
+            "Request body bytes received by route template.",
+            ("route",),
+        )
+        self.stage_seconds = self.registry.histogram(
+            "kakeibo_stage_duration_seconds",
+            "Pipeline stage latency by statement type.",
+            ("source_type", "stage"),
+        )
+        self.rows = self.registry.counter(
+            "kakeibo_rows_processed_total",
+            "Rows produced by each pipeline stage.",
+            ("source_type", "stage"),
+        )
+        self.rejections = self.registry.counter(
+            "kakeibo_rejections_total",
+            "Rejected requests and batch members by reason code.",
+            ("reason",),
+        )
+
+    def record(self, metrics: StageMetrics) -> None:
+        self.stage_seconds.observe(
+            metrics.wall_seconds, source_type=metrics.source_type, stage=metrics.stage
+        )
+        if metrics.rows_out is not None:
+            self.rows.inc(
+                metrics.rows_out, source_type=metrics.source_type, stage=metrics.stage
+            )
+
+    def reject(self, reason: str) -> None:
+        self.rejections.inc(reason=reason)
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing requests and counting received body bytes."""
+
+    def __init__(self, app: ASGIApp, metrics: ServiceMetrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        received = 0
+        status_code = 500
+
+        async def counting_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+            return message
+
+        async def capturing_send(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = int(message["status"])
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, counting_receive, capturing_send)
+        finally:
+            # The matched template, never the concrete path, labels the series.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            self.metrics.request_seconds.observe(
+                time.perf_counter() - started,
+                method=str(scope["method"]),
+                route=route,
+                status=str(status_code),
+            )
+            if received:
+                self.metrics.received_bytes.inc(received, route=route)
+            if status_code in REJECTION_REASONS:
+                self.metrics.reject(REJECTION_REASONS[status_code])
+
+
+def _is_local_scrape(request: Request) -> bool:
+    client_host = request.client.host if request.client is not None else ""
+    # A forwarded request came through a proxy and is not local, whatever
+    # address the proxy connects from.
+    forwarded = any(
+        name in request.headers for name in ("forwarded", "x-forwarded-for")
+    )
+    return client_host in LOOPBACK_CLIENTS and not forwarded
+
+
+def install_metrics(application: FastAPI, metrics: ServiceMetrics) -> None:
+    """Add request metrics and a loopback-only ``/metrics`` endpoint."""
+    application.add_middleware(MetricsMiddleware, metrics=metrics)
+
+    @application.get("/metrics", include_in_schema=False)
+    def read_metrics(request: Request) -> Response:
+        if not settings.metrics_enabled or not _is_local_scrape(request):
+            return Response(status_code=404)
+        return PlainTextResponse(metrics.registry.render(), media_type=CONTENT_TYPE)
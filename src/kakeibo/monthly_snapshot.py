@@ -3,10 +3,15 @@ from __future__ import annotations
 import csv
 import hashlib
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Any
+from uuid import uuid4
+
+from src.kakeibo.hashing import open_text_hashed
 
 
 class SnapshotError(ValueError):
@@ -49,43 +54,201 @@ def _validate_month(month: str) -> None:
         raise SnapshotError("month must use YYYY-MM")
 
 
-def _read_input(path: Path, month: str) -> tuple[str, int, MonthlyTotals]:
-    raw = path.read_bytes()
-    digest = _sha256(raw)
-    try:
-        text = raw.decode("utf-8-sig")
-    except UnicodeDecodeError as exc:
-        raise SnapshotError("normalized CSV must be UTF-8") from exc
-
-    reader = csv.DictReader(text.splitlines())
-    required = {"transaction_date", "amount"}
-    if reader.fieldnames is None or not required.issubset(reader.fieldnames):
-        raise SnapshotError("normalized CSV requires transaction_date and amount")
-
-    rows = 0
-    count = 0
-    inflow = 0
-    outflow = 0
-    for row in reader:
-        rows += 1
-        date_text = (row.get("transaction_date") or "").strip()
-        amount_text = (row.get("amount") or "").strip()
+def _add(totals: MonthlyTotals, other: MonthlyTotals) -> MonthlyTotals:
+    return MonthlyTotals(
+        totals.transaction_count + other.transaction_count,
+        totals.inflow + other.inflow,
+        totals.outflow + other.outflow,
+        totals.net + other.net,
+    )
+
+
+@dataclass(frozen=True)
+class InputAggregate:
+    """Hash, row count and totals for every month present in one input."""
+
+    sha256: str
+    row_count: int
+    months: dict[str, MonthlyTotals]
+
+    def totals_for(self, month: str) -> MonthlyTotals:
+        return self.months.get(month, MonthlyTotals(0, 0, 0, 0))
+
+
+def _aggregate_input(path: Path) -> InputAggregate:
+    # Decode, parse and hash in one streaming pass so peak memory does not
+    # grow with the file size.
+    text, hashing = open_text_hashed(path, "utf-8-sig")
+    with text:
         try:
-            transaction_date = datetime.strptime(date_text, "%Y-%m-%d")
-            amount = int(amount_text)
-        except ValueError as exc:
-            raise SnapshotError(
-                "normalized CSV contains an invalid date or amount"
-            ) from exc
-        if transaction_date.strftime("%Y-%m") != month:
+            reader = csv.DictReader(text)
+            required = {"transaction_date", "amount"}
+            if reader.fieldnames is None or not required.issubset(reader.fieldnames):
+                raise SnapshotError(
+                    "normalized CSV requires transaction_date and amount"
+                )
+
+            rows = 0
+            months: dict[str, list[int]] = {}
+            for row in reader:
+                rows += 1
+                date_text = (row.get("transaction_date") or "").strip()
+                amount_text = (row.get("amount") or "").strip()
+                try:
+                    transaction_date = datetime.strptime(date_text, "%Y-%m-%d")
+                    amount = int(amount_text)
+                except ValueError as exc:
+                    raise SnapshotError(
+                        "normalized CSV contains an invalid date or amount"
+                    ) from exc
+                counts = months.setdefault(
+                    transaction_date.strftime("%Y-%m"), [0, 0, 0]
+                )
+                counts[0] += 1
+                if amount >= 0:
+                    counts[1] += amount
+                else:
+                    counts[2] += -amount
+        except UnicodeDecodeError as exc:
+            raise SnapshotError("normalized CSV must be UTF-8") from exc
+        digest = hashing.hexdigest()
+
+    return InputAggregate(
+        sha256=digest,
+        row_count=rows,
+        months={
+            key: MonthlyTotals(count, inflow, outflow, inflow - outflow)
+            for key, (count, inflow, outflow) in sorted(months.items())
+        },
+    )
+
+
+def _stat_key(path: Path) -> str:
+    # Keyed by a digest of path and file identity, so the cache never stores a
+    # filename. Any rewrite changes size or mtime_ns and forces a re-read.
+    stat = path.stat()
+    identity = (
+        f"{path.resolve()}\0{stat.st_dev}\0{stat.st_ino}"
+        f"\0{stat.st_size}\0{stat.st_mtime_ns}"
+    )
+    return hashlib.sha256(identity.encode("utf-8", errors="replace")).hexdigest()
+
+
+class SnapshotInputCache:
+    """Private cache of per-input monthly totals, keyed by input SHA-256.
+
+    A stat index maps unchanged files to their SHA-256 so cached inputs are
+    not read again. Cached totals are the same integers a fresh read yields,
+    so snapshot artifacts stay byte-identical with or without the cache.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._inputs: dict[str, Any] = {}
+        self._stat_index: dict[str, str] = {}
+        self._dirty = False
+        if path.is_file():
+            try:
+                payload = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                payload = {}
+            if not isinstance(payload, dict):
+                payload = {}
+            inputs = payload.get("inputs", {})
+            stat_index = payload.get("stat_index", {})
+            if (
+                payload.get("version") == self.VERSION
+                and isinstance(inputs, dict)
+                and isinstance(stat_index, dict)
+            ):
+                self._inputs = inputs
+                self._stat_index = stat_index
+
+    def lookup(self, path: Path) -> tuple[str, InputAggregate | None]:
+        """Return the stat key for ``path`` and its cached aggregate, if any."""
+        key = _stat_key(path)
+        digest = self._stat_index.get(key)
+        entry = self._inputs.get(digest) if digest is not None else None
+        if digest is None or entry is None:
+            self.misses += 1
+            return key, None
+        self.hits += 1
+        return key, InputAggregate(
+            sha256=digest,
+            row_count=int(entry["row_count"]),
+            months={
+                month: MonthlyTotals(**totals)
+                for month, totals in entry["months"].items()
+            },
+        )
+
+    def store(self, key: str, aggregate: InputAggregate) -> None:
+        self._inputs[aggregate.sha256] = {
+            "row_count": aggregate.row_count,
+            "months": {
+                month: totals.as_dict() for month, totals in aggregate.months.items()
+            },
+        }
+        self._stat_index[key] = aggregate.sha256
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        temporary = self.path.with_name(f".{self.path.name}.{uuid4().hex}")
+        temporary.write_bytes(
+            _canonical_json(
+                {
+                    "version": self.VERSION,
+                    "inputs": self._inputs,
+                    "stat_index": self._stat_index,
+                }
+            )
+        )
+        temporary.chmod(0o600)
+        os.replace(temporary, self.path)
+        self._dirty = False
+
+
+def _aggregate_inputs(
+    input_paths: list[Path],
+    cache: SnapshotInputCache | None,
+    workers: int,
+) -> list[InputAggregate]:
+    """Aggregate inputs in input order, reading uncached files on a pool.
+
+    Reading and hashing release the GIL, so threads overlap I/O and SHA-256
+    of independent files. Cache bookkeeping stays on the calling thread.
+    """
+    results: list[InputAggregate | None] = [None] * len(input_paths)
+    pending: list[tuple[int, str | None]] = []
+    for index, path in enumerate(input_paths):
+        if cache is None:
+            pending.append((index, None))
             continue
-        count += 1
-        if amount >= 0:
-            inflow += amount
+        key, cached = cache.lookup(path)
+        if cached is None:
+            pending.append((index, key))
         else:
-            outflow += -amount
+            results[index] = cached
+
+    pending_paths = [input_paths[index] for index, _ in pending]
+    if workers > 1 and len(pending_paths) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(pending_paths))) as pool:
+            computed = list(pool.map(_aggregate_input, pending_paths))
+    else:
+        computed = [_aggregate_input(path) for path in pending_paths]
 
-    return digest, rows, MonthlyTotals(count, inflow, outflow, inflow - outflow)
+    for (index, stat_key), aggregate in zip(pending, computed, strict=True):
+        results[index] = aggregate
+        if cache is not None and stat_key is not None:
+            cache.store(stat_key, aggregate)
+    return [aggregate for aggregate in results if aggregate is not None]
 
 
 def build_monthly_snapshot(
@@ -96,11 +259,20 @@ def build_monthly_snapshot(
     fx_source: str,
     fx_retrieved_at: str,
     fx_rates: dict[str, str] | None = None,
+    cache: SnapshotInputCache | None = None,
+    workers: int = 1,
 ) -> dict[str, Any]:
-    """Create a deterministic monthly audit snapshot from normalized CSV files."""
+    """Create a deterministic monthly audit snapshot from normalized CSV files.
+
+    With ``cache``, inputs whose totals are already cached are not read again.
+    ``workers`` > 1 reads uncached inputs concurrently; the artifacts do not
+    depend on it because inputs are sorted and totals are plain sums.
+    """
     _validate_month(month)
     if not input_paths:
         raise SnapshotError("at least one normalized CSV is required")
+    if workers < 1:
+        raise SnapshotError("workers must be at least 1")
     if not fx_source.strip() or not fx_retrieved_at.strip():
         raise SnapshotError("FX source and retrieved_at are required")
     try:
@@ -110,15 +282,11 @@ def build_monthly_snapshot(
 
     inputs: list[dict[str, str | int]] = []
     totals = MonthlyTotals(0, 0, 0, 0)
-    for path in input_paths:
-        digest, rows, monthly_totals = _read_input(path, month)
-        inputs.append({"sha256": digest, "row_count": rows})
-        totals = MonthlyTotals(
-            totals.transaction_count + monthly_totals.transaction_count,
-            totals.inflow + monthly_totals.inflow,
-            totals.outflow + monthly_totals.outflow,
-            totals.net + monthly_totals.net,
-        )
+    for aggregate in _aggregate_inputs(input_paths, cache, workers):
+        inputs.append({"sha256": aggregate.sha256, "row_count": aggregate.row_count})
+        totals = _add(totals, aggregate.totals_for(month))
+    if cache is not None:
+        cache.save()
 
     inputs.sort(
         key=lambda input_evidence: (
@@ -1,16 +1,32 @@
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 from pathlib import Path
+from typing import BinaryIO
 
 import polars as pl
 
+# ファイルパス、メモリ上の明細本文、またはアーカイブ要素などのバイナリストリーム
+StatementSource = Path | bytes | BinaryIO
+
+# すべてのparserが返す未加工カラムとその型
+RAW_SCHEMA: dict[str, pl.DataType] = {
+    "raw_date": pl.Utf8(),
+    "raw_deposit": pl.Utf8(),
+    "raw_withdrawal": pl.Utf8(),
+    "raw_description": pl.Utf8(),
+    "raw_balance": pl.Utf8(),
+    "raw_memo": pl.Utf8(),
+}
+
 
 class ParserPort(ABC):
     """ファイルパーサーのインターフェース"""
 
     @abstractmethod
-    def parse(self, file_path: Path, encoding: str) -> pl.DataFrame:
+    def parse(self, source: StatementSource, encoding: str) -> pl.DataFrame:
         """
-        ファイルを読み込み、未加工のDataFrameを返す。
+        ファイル、メモリ上の本文、またはバイナリストリームを読み込み、
+        未加工のDataFrameを返す。ストリームは閉じずに呼び出し元へ返す。
 
         期待される出力カラム:
         - raw_date: str
@@ -21,3 +37,14 @@ class ParserPort(ABC):
         - raw_memo: str (nullable)
         """
         pass
+
+    def iter_batches(
+        self, source: StatementSource, encoding: str, batch_rows: int
+    ) -> Iterator[pl.DataFrame]:
+        """
+        最大 batch_rows 行ずつ未加工のDataFrameを返す。
+
+        既定では全体をパースしてから分割する。巨大な入力を扱うparserは
+        メモリ使用量がbatchの大きさで抑えられるように上書きする。
+        """
+        yield from self.parse(source, encoding).iter_slices(batch_rows)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date
+
+import polars as pl
+
+_MONTH_PATTERN = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+
+# Grouping keys are limited to columns that cannot reveal a transaction row.
+GROUP_KEYS: dict[str, pl.Expr] = {
+    "year": pl.col("transaction_date").dt.strftime("%Y").alias("year"),
+    "month": pl.col("transaction_date").dt.strftime("%Y-%m").alias("month"),
+    "source": pl.col("source"),
+    "category": pl.col("category"),
+}
+
+
+@dataclass(frozen=True)
+class QueryFilter:
+    month_from: str | None = None
+    month_to: str | None = None
+    sources: tuple[str, ...] = ()
+    min_amount: int | None = None
+    max_amount: int | None = None
+    description_contains: str | None = None
+
+    def __post_init__(self) -> None:
+        for month in (self.month_from, self.month_to):
+            if month is not None and not _MONTH_PATTERN.fullmatch(month):
+                raise ValueError("month must use YYYY-MM")
+
+
+def _month_start(month: str) -> date:
+    year, month_number = month.split("-")
+    return date(int(year), int(month_number), 1)
+
+
+def _month_after(month: str) -> date:
+    start = _month_start(month)
+    if start.month == 12:
+        return date(start.year + 1, 1, 1)
+    return date(start.year, start.month + 1, 1)
+
+
+def build_predicate(query: QueryFilter) -> pl.Expr:
+    """Translate a filter into one expression Polars can push into the scan."""
+    predicate = pl.lit(True)
+    if query.month_from is not None:
+        predicate &= pl.col("transaction_date") >= _month_start(query.month_from)
+    if query.month_to is not None:
+        predicate &= pl.col("transaction_date") < _month_after(query.month_to)
+    if query.sources:
+        predicate &= pl.col("source").is_in(list(query.sources))
+    if query.min_amount is not None:
+        predicate &= pl.col("amount") >= query.min_amount
+    if query.max_amount is not None:
+        predicate &= pl.col("amount") <= query.max_amount
+    if query.description_contains:
+        predicate &= pl.col("description").str.contains(
+            query.description_contains, literal=True
+        )
+    return predicate
+
+
+def aggregate(
+    frame: pl.LazyFrame, query: QueryFilter, group_by: Sequence[str] = ()
+) -> pl.DataFrame:
+    """Return counts and inflow/outflow/net totals for the filtered rows.
+
+    Only the grouping keys and aggregates leave this function, so descriptions
+    used in the filter are never part of the result.
+    """
+    unknown = set(group_by) - set(GROUP_KEYS)
+    if unknown:
+        raise ValueError("unsupported group-by key")
+
+    amount = pl.col("amount")
+    totals = [
+        pl.len().alias("transaction_count"),
+        amount.filter(amount > 0).sum().alias("inflow"),
+        (-amount.filter(amount < 0)).sum().alias("outflow"),
+        amount.sum().alias("net"),
+    ]
+    filtered = frame.filter(build_predicate(query))
+    if not group_by:
+        return filtered.select(totals).collect()
+    keys = [GROUP_KEYS[key] for key in group_by]
+    return filtered.group_by(keys).agg(totals).sort(list(group_by)).collect()
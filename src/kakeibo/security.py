@@ -43,6 +43,6 @@ def opaque_file_id(file_path: Path) -> str:
     ]
 
 
-def private_output_name() -> str:
+def private_output_name(prefix: str = "transactions") -> str:
     """Generate an output name that cannot reveal the input filename."""
-    return f"transactions-{uuid4().hex[:16]}.csv"
+    return f"{prefix}-{uuid4().hex[:16]}.csv"
@@ -1,18 +1,33 @@
 from __future__ import annotations
 
+import codecs
+import csv
 import re
-from collections.abc import Callable
+from collections.abc import Callable, Iterator, Mapping
 from dataclasses import dataclass
+from importlib import import_module
 from pathlib import Path
-
-from src.kakeibo.adapters.parsers.generic_csv import GenericCsvParser
-from src.kakeibo.adapters.parsers.profiled_csv import (
-    AplusCsvParser,
-    EnaviCsvParser,
-    TransactionHistoryCsvParser,
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.kakeibo.ports.parser import ParserPort
+
+_PARSERS = "src.kakeibo.adapters.parsers"
+_CARD_HEADER = (
+    "利用日",
+    "利用店名・商品名",
+    "利用者",
+    "支払方法",
+    "利用金額",
+    "支払手数料",
 )
-from src.kakeibo.adapters.parsers.sony import SonyBankParser
-from src.kakeibo.ports.parser import ParserPort
+
+# Content detection reads at most this many leading bytes of a statement.
+DETECTION_BYTES = 1024
+MIN_DETECTION_CONFIDENCE = 0.5
+# A content match at least this confident overrides the filename pattern.
+CONTENT_OVER_FILENAME_CONFIDENCE = 0.8
+_UTF8_BOM = b"\xef\xbb\xbf"
 
 
 class StatementTypeError(ValueError):
@@ -33,7 +48,19 @@ class StatementTypeSpec:
     allowed_suffixes: tuple[str, ...]
     encoding: str
     filename_pattern: re.Pattern[str] | None
-    parser_factory: Callable[[], ParserPort]
+    parser_path: str
+    # Content signatures used by detect_statement_type.
+    header_tokens: tuple[str, ...] = ()
+    line_pattern: re.Pattern[str] | None = None
+
+    @property
+    def parser_factory(self) -> Callable[[], ParserPort]:
+        """Import the parser class on first use so the registry stays cheap."""
+        module_name, _, class_name = self.parser_path.partition(":")
+        factory: Callable[[], ParserPort] = getattr(
+            import_module(module_name), class_name
+        )
+        return factory
 
 
 STATEMENT_TYPES: dict[str, StatementTypeSpec] = {
@@ -42,35 +69,39 @@ STATEMENT_TYPES: dict[str, StatementTypeSpec] = {
         allowed_suffixes=(".txt",),
         encoding="utf-8-sig",
         filename_pattern=re.compile(r"sony_.*\.txt$", re.IGNORECASE),
-        parser_factory=SonyBankParser,
+        parser_path=f"{_PARSERS}.sony:SonyBankParser",
+        line_pattern=re.compile(r"^\d{4}年\d{1,2}月\d{1,2}日\s"),
     ),
     "enavi": StatementTypeSpec(
         name="enavi",
         allowed_suffixes=(".csv",),
         encoding="utf-8-sig",
         filename_pattern=re.compile(r"enavi\d{6}\(\d+\)\.csv$", re.IGNORECASE),
-        parser_factory=EnaviCsvParser,
+        parser_path=f"{_PARSERS}.profiled_csv:EnaviCsvParser",
+        header_tokens=(*_CARD_HEADER, "支払総額"),
     ),
     "aplus": StatementTypeSpec(
         name="aplus",
         allowed_suffixes=(".csv",),
         encoding="utf-8-sig",
         filename_pattern=re.compile(r"aplus_meisai_\d+_\d{6}\.csv$", re.IGNORECASE),
-        parser_factory=AplusCsvParser,
+        parser_path=f"{_PARSERS}.profiled_csv:AplusCsvParser",
+        header_tokens=(*_CARD_HEADER, "支払金額"),
     ),
     "transaction": StatementTypeSpec(
         name="transaction",
         allowed_suffixes=(".csv",),
         encoding="utf-8",
         filename_pattern=re.compile(r"transaction-history\.csv$", re.IGNORECASE),
-        parser_factory=TransactionHistoryCsvParser,
+        parser_path=f"{_PARSERS}.profiled_csv:TransactionHistoryCsvParser",
+        header_tokens=("Date", "Description", "Amount"),
     ),
     "generic": StatementTypeSpec(
         name="generic",
         allowed_suffixes=(".csv",),
         encoding="shift_jis",
         filename_pattern=re.compile(r"\d{6}\.csv$", re.IGNORECASE),
-        parser_factory=GenericCsvParser,
+        parser_path=f"{_PARSERS}.generic_csv:GenericCsvParser",
     ),
 }
 
@@ -112,5 +143,113 @@ def infer_statement_type(filename: str) -> str | None:
     return None
 
 
-def build_parser_registry() -> dict[str, ParserPort]:
-    return {name: spec.parser_factory() for name, spec in STATEMENT_TYPES.items()}
+@dataclass(frozen=True)
+class StatementDetection:
+    statement_type: str | None
+    confidence: float
+    scores: dict[str, float]
+
+
+def _decode_head(head: bytes, encoding: str) -> str | None:
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        # final=False tolerates a multi-byte character cut at the boundary.
+        return decoder.decode(head, final=False)
+    except UnicodeDecodeError:
+        return None
+
+
+def _content_score(spec: StatementTypeSpec, head: bytes, truncated: bool) -> float:
+    text = _decode_head(head, spec.encoding)
+    if text is None:
+        return 0.0
+    lines = text.splitlines()
+    if truncated and lines:
+        lines = lines[:-1]
+    lines = [line.strip() for line in lines if line.strip()]
+    if not lines:
+        return 0.0
+
+    if spec.line_pattern is not None:
+        score = sum(bool(spec.line_pattern.match(line)) for line in lines) / len(lines)
+    elif spec.header_tokens:
+        # Coverage of the profile's columns: extra or a few renamed columns in
+        # a real export lower the score only by the share of missing ones.
+        cells = {cell.strip() for cell in next(csv.reader([lines[0]]))}
+        tokens = set(spec.header_tokens)
+        score = len(cells & tokens) / len(tokens)
+    else:
+        # Catch-all CSV profile: any multi-column text is a weak candidate,
+        # and a legacy-encoded head that is not UTF-8 is strong evidence.
+        score = 0.5 if len(next(csv.reader([lines[0]]))) > 1 else 0.0
+        if score and _decode_head(head, "utf-8") is None:
+            score = 0.9
+
+    if head.startswith(_UTF8_BOM) and spec.encoding == "utf-8-sig":
+        score = min(1.0, score + 0.1)
+    return score
+
+
+def detect_statement_type(head: bytes, suffix: str) -> StatementDetection:
+    """Score every registered type allowing ``suffix`` against leading bytes.
+
+    Only the first ``DETECTION_BYTES`` are considered: the BOM, the decoded
+    header row checked for each profile's header tokens, and the share of
+    lines shaped like Sony's ``YYYY年M月D日`` records. The best score is the
+    confidence; below ``MIN_DETECTION_CONFIDENCE`` no type is returned.
+    """
+    normalized_suffix = suffix.strip().lower()
+    truncated = len(head) > DETECTION_BYTES
+    head = head[:DETECTION_BYTES]
+    scores = {
+        name: round(_content_score(spec, head, truncated), 3)
+        for name, spec in STATEMENT_TYPES.items()
+        if normalized_suffix in spec.allowed_suffixes
+    }
+    best = max(scores, key=lambda name: scores[name], default=None)
+    if best is None:
+        return StatementDetection(None, 0.0, scores)
+    if scores[best] < MIN_DETECTION_CONFIDENCE:
+        return StatementDetection(None, scores[best], scores)
+    return StatementDetection(best, scores[best], scores)
+
+
+def sniff_statement_type(path: Path) -> str | None:
+    """Choose a type from content, falling back to the filename when unsure.
+
+    A confident content match wins over the filename so renamed exports are
+    parsed with the right profile. Reads only the first few hundred bytes.
+    """
+    with path.open("rb") as handle:
+        head = handle.read(DETECTION_BYTES + 1)
+    detection = detect_statement_type(head, path.suffix)
+    by_name = infer_statement_type(path.name)
+    if detection.statement_type is not None and (
+        detection.confidence >= CONTENT_OVER_FILENAME_CONFIDENCE or by_name is None
+    ):
+        return detection.statement_type
+    return by_name
+
+
+class ParserRegistry(Mapping[str, "ParserPort"]):
+    """Parser instances created from STATEMENT_TYPES on first lookup."""
+
+    def __init__(self) -> None:
+        self._parsers: dict[str, ParserPort] = {}
+
+    def __getitem__(self, name: str) -> ParserPort:
+        parser = self._parsers.get(name)
+        if parser is None:
+            parser = STATEMENT_TYPES[name].parser_factory()
+            self._parsers[name] = parser
+        return parser
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(STATEMENT_TYPES)
+
+    def __len__(self) -> int:
+        return len(STATEMENT_TYPES)
+
+
+def build_parser_registry() -> ParserRegistry:
+    return ParserRegistry()
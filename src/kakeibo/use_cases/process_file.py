@@ -1,18 +1,36 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
+from threading import Lock
+from typing import BinaryIO
 
+import polars as pl
 from loguru import logger
 
-from src.kakeibo.config import settings
+from src.kakeibo.category_cache import CategoryCache
+from src.kakeibo.config import Settings, settings
+from src.kakeibo.domain.categorization import (
+    Categorizer,
+    load_category_rules,
+    with_empty_categories,
+)
 from src.kakeibo.domain.cleaning import CleaningPipeline
-from src.kakeibo.ports.parser import ParserPort
+from src.kakeibo.instrumentation import (
+    NullStageRecorder,
+    StageRecorder,
+    measure_stage,
+)
+from src.kakeibo.ledger import Ledger
+from src.kakeibo.ports.parser import RAW_SCHEMA, ParserPort, StatementSource
 from src.kakeibo.security import opaque_file_id, private_output_name
 from src.kakeibo.statement_types import (
     StatementTypeError,
     build_parser_registry,
     infer_statement_type,
+    sniff_statement_type,
     statement_spec,
 )
 
@@ -25,10 +43,34 @@ class ProcessingPlan:
     parser: ParserPort
 
 
+def default_categorizer(app_settings: Settings | None = None) -> Categorizer | None:
+    """Load the private category rules when the configured file exists."""
+    app_settings = app_settings or settings
+    if not app_settings.category_rules_path.is_file():
+        return None
+    cache = None
+    if app_settings.category_cache_entries > 0:
+        cache = CategoryCache(
+            app_settings.category_cache_path, app_settings.category_cache_entries
+        )
+    return Categorizer(
+        load_category_rules(app_settings.category_rules_path), cache=cache
+    )
+
+
 class ProcessFileUseCase:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        recorder: StageRecorder | None = None,
+        categorizer: Categorizer | None = None,
+        ledger: Ledger | None = None,
+    ) -> None:
         self.cleaning_pipeline = CleaningPipeline()
         self.parsers = build_parser_registry()
+        self.recorder = recorder or NullStageRecorder()
+        self.categorizer = categorizer or default_categorizer()
+        self.ledger = ledger
+        self._categorize_lock = Lock()
 
     def processing_plan(self, source_type: str, suffix: str) -> ProcessingPlan:
         spec = statement_spec(source_type, suffix)
@@ -42,16 +84,89 @@ class ProcessFileUseCase:
             parser=parser,
         )
 
+    def categorize(self, clean_df: pl.DataFrame) -> pl.DataFrame:
+        if self.categorizer is None:
+            return with_empty_categories(clean_df)
+        # The match cache is shared state; batch workers categorize in turn.
+        with self._categorize_lock:
+            return self.categorizer.categorize(clean_df)
+
+    def save_category_cache(self) -> None:
+        cache = self.categorizer.cache if self.categorizer is not None else None
+        if not isinstance(cache, CategoryCache):
+            return
+        cache.save()
+        logger.info(
+            "Category cache hits={} misses={} entries={}",
+            cache.hits,
+            cache.misses,
+            len(cache),
+        )
+
+    def iter_clean_batches(
+        self, plan: ProcessingPlan, source: StatementSource, batch_rows: int
+    ) -> Iterator[tuple[int, pl.DataFrame]]:
+        """Yield (raw row count, cleaned and categorized batch) per parsed chunk."""
+        for raw_batch in plan.parser.iter_batches(source, plan.encoding, batch_rows):
+            if raw_batch.height == 0:
+                continue
+            clean_batch = self.categorize(
+                self.cleaning_pipeline.process(raw_batch, source=plan.source_type)
+            )
+            yield raw_batch.height, clean_batch
+
+    def _process_batches(
+        self,
+        plan: ProcessingPlan,
+        source: StatementSource,
+        output_path: Path,
+        batch_rows: int,
+    ) -> tuple[int, int]:
+        rows_in = 0
+        rows_out = 0
+        try:
+            with output_path.open("xb") as output:
+                for raw_rows, clean_batch in self.iter_clean_batches(
+                    plan, source, batch_rows
+                ):
+                    clean_batch.write_csv(output, include_header=rows_in == 0)
+                    rows_in += raw_rows
+                    rows_out += clean_batch.height
+                if rows_in == 0:
+                    empty = pl.DataFrame(schema=RAW_SCHEMA)
+                    self.categorize(
+                        self.cleaning_pipeline.process(empty, source=plan.source_type)
+                    ).write_csv(output)
+        except Exception:
+            output_path.unlink(missing_ok=True)
+            raise
+        return rows_in, rows_out
+
     def infer_source_type(self, filename: str) -> str | None:
         return infer_statement_type(filename)
 
+    def detect_source_type(self, file_path: Path) -> str | None:
+        """Infer the type from the leading bytes, then from the filename."""
+        return sniff_statement_type(file_path)
+
     def execute(
         self,
         file_path: Path,
         output_dir: Path | None = None,
         *,
         source_type: str | None = None,
+        content: bytes | BinaryIO | None = None,
+        batch_rows: int | None = None,
     ) -> bool:
+        """Process one statement into a private normalized CSV.
+
+        When ``content`` is given the parser reads the in-memory body or stream
+        and ``file_path`` only supplies the anonymous name and suffix. With
+        ``batch_rows`` the statement is parsed, cleaned and appended in chunks
+        so that peak memory is bounded by the chunk size. When the use case
+        has a ledger, the written output is appended to it as a last stage;
+        the output is removed again when that or any earlier stage fails.
+        """
         if output_dir is None:
             output_dir = settings.output_dir
 
@@ -68,17 +183,53 @@ class ProcessFileUseCase:
             plan.source_type,
         )
 
-        try:
-            raw_df = plan.parser.parse(file_path, encoding=plan.encoding)
-            clean_df = self.cleaning_pipeline.process(
-                raw_df,
-                source=plan.source_type,
-            )
+        measure = partial(
+            measure_stage,
+            self.recorder,
+            file_id=file_id,
+            source_type=plan.source_type,
+        )
 
+        source = file_path if content is None else content
+        output_path: Path | None = None
+        try:
             output_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
             output_path = output_dir / private_output_name()
-            clean_df.write_csv(output_path)
+            if batch_rows is None:
+                with measure(stage="parse") as parse_stage:
+                    raw_df = plan.parser.parse(source, encoding=plan.encoding)
+                    parse_stage.rows_out = raw_df.height
+
+                with measure(stage="clean", rows_in=raw_df.height) as clean_stage:
+                    clean_df = self.cleaning_pipeline.process(
+                        raw_df,
+                        source=plan.source_type,
+                    )
+                    clean_stage.rows_out = clean_df.height
+
+                with measure(
+                    stage="categorize", rows_in=clean_df.height
+                ) as categorize_stage:
+                    clean_df = self.categorize(clean_df)
+                    categorize_stage.rows_out = clean_df.height
+
+                with measure(stage="write", rows_in=clean_df.height) as write_stage:
+                    clean_df.write_csv(output_path)
+                    write_stage.rows_out = clean_df.height
+            else:
+                with measure(stage="batched") as batched_stage:
+                    rows_in, rows_out = self._process_batches(
+                        plan, source, output_path, batch_rows
+                    )
+                    batched_stage.rows_in = rows_in
+                    batched_stage.rows_out = rows_out
+
+            if self.ledger is not None:
+                with measure(stage="ledger") as ledger_stage:
+                    appended = self.ledger.append_csv([output_path])
+                    ledger_stage.rows_out = appended.appended_rows
 
+            self.save_category_cache()
             logger.success(
                 "Processed financial file id={} source_type={}",
                 file_id,
@@ -88,6 +239,9 @@ class ProcessFileUseCase:
         except StatementTypeError:
             raise
         except Exception as exc:
+            # A retry writes a new output; keeping this one would duplicate rows.
+            if output_path is not None:
+                output_path.unlink(missing_ok=True)
             logger.error(
                 "Financial file processing failed id={} source_type={} error_type={}",
                 file_id,
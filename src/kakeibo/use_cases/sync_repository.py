@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+
+import polars as pl
+from loguru import logger
+
+from src.kakeibo.domain.models import Transaction
+from src.kakeibo.ports.repository import TransactionRepositoryPort
+from src.kakeibo.security import opaque_file_id
+from src.kakeibo.use_cases.process_file import ProcessFileUseCase
+
+DEFAULT_SYNC_BATCH_ROWS = 5_000
+DEFAULT_PARSE_WORKERS = 2
+DEFAULT_QUEUE_BATCHES = 4
+
+# StatementTypeError, UnicodeDecodeError and ValidationError are ValueErrors.
+_PARSE_ERRORS = (OSError, ValueError, pl.exceptions.PolarsError)
+
+FileSyncStatus = Literal["synced", "partial", "failed", "stopped"]
+
+
+class _UploadStopped(Exception):
+    """Raised inside a parse worker after the uploader has failed."""
+
+
+@dataclass(frozen=True)
+class SyncResult:
+    """``partial_files`` failed after some of their batches were queued.
+
+    Those batches are uploaded; the repository deduplicates rows, so syncing
+    the corrected statement again completes it.
+    """
+
+    files: int
+    failed_files: int
+    parsed_rows: int
+    saved_rows: int
+    partial_files: int = 0
+
+
+@dataclass
+class _FileSync:
+    rows: int = 0
+    status: FileSyncStatus = "synced"
+
+
+def _transactions(frame: pl.DataFrame) -> list[Transaction]:
+    return [Transaction.model_validate(row) for row in frame.iter_rows(named=True)]
+
+
+class SyncRepositoryUseCase:
+    """Parse statements and upload them with the two stages overlapping.
+
+    Parse workers run in threads and put cleaned, categorized batches on a
+    bounded queue; one async uploader drains it into the repository. A full
+    queue blocks the parse workers, so memory stays bounded by roughly
+    ``queue_batches + parse_workers`` batches, and the total time approaches
+    the slower of parsing and uploading rather than their sum.
+    """
+
+    def __init__(
+        self,
+        repository: TransactionRepositoryPort,
+        use_case: ProcessFileUseCase | None = None,
+        *,
+        batch_rows: int = DEFAULT_SYNC_BATCH_ROWS,
+        parse_workers: int = DEFAULT_PARSE_WORKERS,
+        queue_batches: int = DEFAULT_QUEUE_BATCHES,
+    ) -> None:
+        if batch_rows < 1 or parse_workers < 1 or queue_batches < 1:
+            raise ValueError("batch_rows, parse_workers and queue_batches must be >= 1")
+        self.repository = repository
+        self.use_case = use_case or ProcessFileUseCase()
+        self.batch_rows = batch_rows
+        self.parse_workers = parse_workers
+        self.queue_batches = queue_batches
+
+    def run(self, files: Sequence[tuple[Path, str]]) -> SyncResult:
+        """Synchronously sync ``(path, statement type)`` pairs."""
+        return asyncio.run(self.sync(files))
+
+    async def sync(self, files: Sequence[tuple[Path, str]]) -> SyncResult:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue[list[Transaction] | None] = asyncio.Queue(
+            self.queue_batches
+        )
+        limiter = asyncio.Semaphore(self.parse_workers)
+        upload_failed = threading.Event()
+
+        def produce(path: Path, source_type: str, progress: _FileSync) -> None:
+            plan = self.use_case.processing_plan(source_type, path.suffix)
+            for _, batch in self.use_case.iter_clean_batches(
+                plan, path, self.batch_rows
+            ):
+                if upload_failed.is_set():
+                    raise _UploadStopped
+                transactions = _transactions(batch)
+                # Blocks this worker while the queue is full (backpressure).
+                asyncio.run_coroutine_threadsafe(queue.put(transactions), loop).result()
+                progress.rows += len(transactions)
+
+        async def parse(path: Path, source_type: str) -> _FileSync:
+            progress = _FileSync()
+            async with limiter:
+                if upload_failed.is_set():
+                    progress.status = "stopped"
+                    return progress
+                try:
+                    await asyncio.to_thread(produce, path, source_type, progress)
+                except _UploadStopped:
+                    progress.status = "stopped"
+                except _PARSE_ERRORS:
+                    # A later batch can fail after earlier ones were queued.
+                    file_id = opaque_file_id(path)
+                    if progress.rows:
+                        progress.status = "partial"
+                        logger.warning(
+                            "Sync partially queued id={} rows={}",
+                            file_id,
+                            progress.rows,
+                        )
+                    else:
+                        progress.status = "failed"
+                        logger.warning("Sync parse failed id={}", file_id)
+                return progress
+
+        async def upload() -> int:
+            saved = 0
+            failure: Exception | None = None
+            while (batch := await queue.get()) is not None:
+                if failure is not None:
+                    # Keep draining so that no parse worker blocks forever.
+                    continue
+                try:
+                    saved += await asyncio.to_thread(self.repository.save_bulk, batch)
+                except Exception as exc:
+                    failure = exc
+                    upload_failed.set()
+            if failure is not None:
+                raise failure
+            return saved
+
+        uploader = asyncio.create_task(upload())
+        try:
+            parsed = await asyncio.gather(
+                *(parse(path, source_type) for path, source_type in files)
+            )
+        finally:
+            await queue.put(None)
+        saved = await uploader
+        # Categories resolved during this sync are reused by later runs.
+        await asyncio.to_thread(self.use_case.save_category_cache)
+
+        return SyncResult(
+            files=len(files),
+            failed_files=sum(file.status in ("failed", "stopped") for file in parsed),
+            parsed_rows=sum(file.rows for file in parsed),
+            saved_rows=saved,
+            partial_files=sum(file.status == "partial" for file in parsed),
+        )
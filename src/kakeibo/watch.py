@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import math
+import os
+import select
+import sys
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal, Protocol
+from uuid import uuid4
+
+from loguru import logger
+
+from src.kakeibo.security import opaque_file_id
+from src.kakeibo.statement_types import StatementTypeError
+from src.kakeibo.use_cases.process_file import ProcessFileUseCase
+
+STATE_VERSION = 1
+# A statement that keeps failing is retried with doubling delays, then left
+# alone until it changes on disk or the watcher restarts.
+MAX_WATCH_ATTEMPTS = 5
+
+WatchOutcome = Literal["processed", "unsupported", "failed"]
+
+# inotify(7) constants; only completed writes and renames into the directory
+# are interesting, partially written files are caught by the settle check.
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+
+class ChangeBackend(Protocol):
+    def wait(self, timeout: float) -> bool:
+        """Block until the directory may have changed or ``timeout`` passes."""
+        ...
+
+    def close(self) -> None: ...
+
+
+class PollingBackend:
+    """Portable fallback that simply wakes up every interval."""
+
+    def wait(self, timeout: float) -> bool:
+        time.sleep(timeout)
+        return True
+
+    def close(self) -> None:
+        return None
+
+
+class InotifyBackend:
+    """Linux inotify watch on one directory, bound through libc with ctypes."""
+
+    def __init__(self, directory: Path) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        watch = libc.inotify_add_watch(
+            fd, os.fsencode(directory), _IN_CLOSE_WRITE | _IN_MOVED_TO
+        )
+        if watch < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, "inotify_add_watch failed")
+        self._fd = fd
+
+    def wait(self, timeout: float) -> bool:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+        # The events only trigger a rescan, so their payload is discarded.
+        while True:
+            try:
+                if not os.read(self._fd, 64 * 1024):
+                    break
+            except BlockingIOError:
+                break
+        return True
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def change_backend(directory: Path) -> ChangeBackend:
+    """Use inotify when available and fall back to polling otherwise."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyBackend(directory)
+        except (OSError, AttributeError):
+            logger.warning("inotify unavailable; polling the input directory")
+    return PollingBackend()
+
+
+def _statement_key(path: Path, stat: os.stat_result) -> str:
+    # Opaque key: a replaced or rewritten file gets a new key, and the state
+    # file never contains filenames.
+    identity = f"{path.name}\0{stat.st_size}\0{stat.st_mtime_ns}"
+    return hashlib.sha256(identity.encode("utf-8", errors="replace")).hexdigest()
+
+
+@dataclass
+class _Pending:
+    size: int
+    mtime_ns: int
+    stable_since: float
+    failures: int = 0
+    retry_at: float = 0.0
+
+
+class ProcessedSet:
+    """Persistent set of statement keys that were already handled."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._keys: set[str] = set()
+        if not path.is_file():
+            return
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError):
+            payload = None
+        if not isinstance(payload, dict) or not isinstance(
+            payload.get("processed", []), list
+        ):
+            logger.warning("Watch state is unreadable; starting with an empty set")
+            return
+        if payload.get("version") == STATE_VERSION:
+            self._keys = {str(key) for key in payload.get("processed", [])}
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: str) -> None:
+        self._keys.add(key)
+        self.path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        temporary = self.path.with_name(f".{self.path.name}.{uuid4().hex}")
+        temporary.write_text(
+            json.dumps({"version": STATE_VERSION, "processed": sorted(self._keys)}),
+            encoding="utf-8",
+        )
+        temporary.chmod(0o600)
+        os.replace(temporary, self.path)
+
+
+class StatementWatcher:
+    """Process statements that arrive in a directory, once each.
+
+    A file is processed after its size and mtime have not changed for
+    ``settle_seconds``, so statements that are still being copied are left
+    alone. Processed and unsupported files are recorded in the processed
+    set; after a restart they are skipped from a directory listing alone,
+    without reading or hashing their content. A failed file stays pending
+    and is retried after one settle window, then after doubling delays; after
+    ``max_attempts`` failures it is skipped until it changes on disk.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        use_case: ProcessFileUseCase,
+        processed: ProcessedSet,
+        *,
+        settle_seconds: float = 2.0,
+        max_attempts: int = MAX_WATCH_ATTEMPTS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.directory = directory
+        self.use_case = use_case
+        self.processed = processed
+        self.settle_seconds = settle_seconds
+        self.max_attempts = max_attempts
+        self.clock = clock
+        self._pending: dict[str, _Pending] = {}
+
+    def scan_once(self) -> int:
+        """Process every settled new statement and return how many succeeded."""
+        now = self.clock()
+        seen: set[str] = set()
+        processed = 0
+        for entry in os.scandir(self.directory):
+            if not entry.is_file(follow_symlinks=False) or entry.name.startswith("."):
+                continue
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except OSError:
+                # Removed between the listing and the stat call.
+                continue
+            key = _statement_key(Path(entry.path), stat)
+            if key in self.processed:
+                continue
+            seen.add(entry.path)
+
+            pending = self._pending.get(entry.path)
+            if (
+                pending is None
+                or pending.size != stat.st_size
+                or pending.mtime_ns != stat.st_mtime_ns
+            ):
+                self._pending[entry.path] = _Pending(
+                    stat.st_size, stat.st_mtime_ns, now
+                )
+                continue
+            if now - pending.stable_since < self.settle_seconds:
+                continue
+            if now < pending.retry_at:
+                continue
+
+            outcome = self._process(Path(entry.path))
+            if outcome == "failed":
+                pending.failures += 1
+                if pending.failures >= self.max_attempts:
+                    pending.retry_at = math.inf
+                    logger.warning(
+                        "Watched file keeps failing id={} attempts={}",
+                        opaque_file_id(Path(entry.path)),
+                        pending.failures,
+                    )
+                else:
+                    pending.retry_at = now + self.settle_seconds * 2 ** (
+                        pending.failures - 1
+                    )
+                continue
+            processed += int(outcome == "processed")
+            self.processed.add(key)
+            del self._pending[entry.path]
+
+        for path in set(self._pending) - seen:
+            del self._pending[path]
+        return processed
+
+    def _process(self, path: Path) -> WatchOutcome:
+        file_id = opaque_file_id(path)
+        try:
+            source_type = self.use_case.detect_source_type(path)
+        except OSError:
+            logger.warning("Watched file could not be read id={}", file_id)
+            return "failed"
+        if source_type is None:
+            logger.warning("Unsupported financial file id={}", file_id)
+            return "unsupported"
+        try:
+            succeeded = self.use_case.execute(path, source_type=source_type)
+        except StatementTypeError:
+            logger.warning("Unsupported statement contract id={}", file_id)
+            return "unsupported"
+        return "processed" if succeeded else "failed"
+
+    @property
+    def has_pending(self) -> bool:
+        return any(pending.retry_at < math.inf for pending in self._pending.values())
+
+    def run(
+        self,
+        backend: ChangeBackend,
+        *,
+        poll_interval: float = 1.0,
+        stop: threading.Event | None = None,
+    ) -> None:
+        """Scan, then wait for directory events until ``stop`` is set."""
+        stop = stop or threading.Event()
+        try:
+            while not stop.is_set():
+                count = self.scan_once()
+                if count:
+                    logger.info("Watch processed {} statement(s)", count)
+                # Files waiting to settle need a timed rescan even without events.
+                timeout = (
+                    min(poll_interval, self.settle_seconds)
+                    if self.has_pending
+                    else poll_interval
+                )
+                backend.wait(timeout)
+        finally:
+            backend.close()
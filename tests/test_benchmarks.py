@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import pytest
+
+from benchmarks.pipeline import run_case
+from benchmarks.synthetic import FORMATS, synthetic_suffix, write_statement
+from src.kakeibo.domain.cleaning import CleaningPipeline
+from src.kakeibo.statement_types import STATEMENT_TYPES
+
+
+def test_every_registered_type_has_a_synthetic_generator() -> None:
+    assert set(FORMATS) == set(STATEMENT_TYPES)
+
+
+@pytest.mark.parametrize("statement_type", sorted(STATEMENT_TYPES))
+def test_synthetic_statement_is_deterministic_and_parses_fully(
+    tmp_path: Path,
+    statement_type: str,
+) -> None:
+    suffix = synthetic_suffix(statement_type)
+    first = write_statement(statement_type, 250, tmp_path / f"first{suffix}", seed=7)
+    second = write_statement(statement_type, 250, tmp_path / f"second{suffix}", seed=7)
+    spec = STATEMENT_TYPES[statement_type]
+
+    raw = spec.parser_factory().parse(first, spec.encoding)
+    cleaned = CleaningPipeline().process(raw, statement_type)
+
+    assert first.read_bytes() == second.read_bytes()
+    assert raw.height == 250
+    assert cleaned.height == 250
+    assert cleaned.get_column("amount").null_count() == 0
+
+
+def test_run_case_reports_each_stage() -> None:
+    case = run_case("transaction", 100)
+
+    assert [stage["stage"] for stage in case["stages"]] == [
+        "parse",
+        "clean",
+        "write",
+        "snapshot",
+    ]
+    assert all(stage["peak_rss_bytes"] > 0 for stage in case["stages"])
+    assert case["stages"][0]["rows"] == 100
@@ -0,0 +1,131 @@
+import json
+from datetime import date
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from src.kakeibo.domain.categorization import (
+    CATEGORIZED_SCHEMA,
+    Categorizer,
+    CategoryRule,
+    CategoryRuleError,
+    load_category_rules,
+    rules_version,
+)
+from src.kakeibo.domain.cleaning import NORMALIZED_SCHEMA
+from src.kakeibo.use_cases.process_file import ProcessFileUseCase
+
+
+def _normalized(rows: list[tuple[str | None, int]]) -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "transaction_date": [date(2026, 1, 1)] * len(rows),
+            "amount": [amount for _, amount in rows],
+            "description": [description for description, _ in rows],
+            "balance": [None] * len(rows),
+            "memo": [None] * len(rows),
+            "source": ["card"] * len(rows),
+        },
+        schema=NORMALIZED_SCHEMA,
+    )
+
+
+RULES = [
+    CategoryRule(category="食費", sub_category="カフェ", keywords=("coffee", "喫茶")),
+    CategoryRule(category="交通", pattern=r"^(jr|metro)\b"),
+    CategoryRule(category="大口", keywords=("shop",), max_amount=-10000),
+    CategoryRule(category="日用品", keywords=("shop",)),
+    CategoryRule(category="収入", min_amount=1),
+]
+
+
+def test_first_matching_rule_wins_with_amount_conditions() -> None:
+    frame = _normalized(
+        [
+            ("  ＣＯＦＦＥＥ Stand ", -480),
+            ("JR East", -200),
+            ("Synthetic Shop", -20000),
+            ("Synthetic Shop", -300),
+            ("Payroll", 250000),
+            ("Unknown", -1),
+            (None, -1),
+        ]
+    )
+
+    result = Categorizer(RULES).categorize(frame)
+
+    assert result.schema == CATEGORIZED_SCHEMA
+    assert result["category"].to_list() == [
+        "食費",
+        "交通",
+        "大口",
+        "日用品",
+        "収入",
+        None,
+        None,
+    ]
+    assert result["sub_category"][0] == "カフェ"
+    assert result["description"].to_list() == frame["description"].to_list()
+
+
+def test_keyword_and_pattern_in_one_rule_must_both_match() -> None:
+    rules = [CategoryRule(category="書籍", keywords=("book",), pattern=r"store$")]
+    frame = _normalized([("Book Store", -1), ("Book Cafe", -1), ("Store", -1)])
+
+    result = Categorizer(rules).categorize(frame)
+
+    assert result["category"].to_list() == ["書籍", None, None]
+
+
+def test_rules_file_is_loaded_and_versioned(tmp_path: Path) -> None:
+    path = tmp_path / "rules.json"
+    path.write_text(
+        json.dumps({"rules": [{"category": "食費", "keywords": ["ＣＯＦＦＥＥ"]}]}),
+        encoding="utf-8",
+    )
+
+    rules = load_category_rules(path)
+
+    assert rules[0].keywords == ("coffee",)
+    assert rules_version(rules) == rules_version(list(rules))
+    assert rules_version(rules) != rules_version(RULES)
+
+
+def test_invalid_rules_are_rejected(tmp_path: Path) -> None:
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"rules": [{"pattern": "x"}]}), encoding="utf-8")
+    with pytest.raises(CategoryRuleError):
+        load_category_rules(path)
+
+    path.write_text(
+        json.dumps({"rules": [{"category": "x", "pattern": "("}]}), encoding="utf-8"
+    )
+    with pytest.raises(CategoryRuleError):
+        load_category_rules(path)
+
+
+@pytest.mark.parametrize("bound", ["100", 1.5, True, [1]])
+def test_non_integer_amount_bounds_are_rejected(tmp_path: Path, bound: object) -> None:
+    path = tmp_path / "rules.json"
+    path.write_text(
+        json.dumps({"rules": [{"category": "x", "max_amount": bound}]}),
+        encoding="utf-8",
+    )
+    with pytest.raises(CategoryRuleError, match="amount bounds"):
+        load_category_rules(path)
+
+
+def test_processed_output_always_has_category_columns(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from src.kakeibo.config import settings
+
+    monkeypatch.setattr(settings, "category_rules_path", tmp_path / "absent.json")
+    frame = _normalized([("Synthetic Shop", -300)])
+
+    uncategorized = ProcessFileUseCase()
+    categorized = ProcessFileUseCase(categorizer=Categorizer(RULES))
+
+    assert uncategorized.categorize(frame)["category"].to_list() == [None]
+    assert categorized.categorize(frame)["category"].to_list() == ["日用品"]
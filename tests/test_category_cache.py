@@ -0,0 +1,85 @@
+from datetime import date
+from pathlib import Path
+
+import polars as pl
+
+from src.kakeibo.category_cache import CategoryCache
+from src.kakeibo.domain.categorization import Categorizer, CategoryRule
+from src.kakeibo.domain.cleaning import NORMALIZED_SCHEMA
+
+RULES = [
+    CategoryRule(category="大口", keywords=("shop",), max_amount=-10000),
+    CategoryRule(category="日用品", keywords=("shop",)),
+    CategoryRule(category="交通", pattern=r"^jr\b"),
+]
+
+
+def _normalized(rows: list[tuple[str, int]]) -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "transaction_date": [date(2026, 1, 1)] * len(rows),
+            "amount": [amount for _, amount in rows],
+            "description": [description for description, _ in rows],
+            "balance": [None] * len(rows),
+            "memo": [None] * len(rows),
+            "source": ["card"] * len(rows),
+        },
+        schema=NORMALIZED_SCHEMA,
+    )
+
+
+def test_cached_categories_match_uncached_and_reuse_descriptions(
+    tmp_path: Path,
+) -> None:
+    frame = _normalized(
+        [("Shop", -20000), ("ｓｈｏｐ ", -300), ("JR East", -200), ("Other", -1)]
+    )
+    cache = CategoryCache(tmp_path / "cache.parquet", max_entries=100)
+    categorizer = Categorizer(RULES, cache=cache)
+
+    first = categorizer.categorize(frame)
+    second = categorizer.categorize(frame)
+
+    assert first.equals(Categorizer(RULES).categorize(frame))
+    assert second.equals(first)
+    assert first["category"].to_list() == ["大口", "日用品", "交通", None]
+    # "Shop" and "ｓｈｏｐ " share one normalized key
+    assert (cache.misses, cache.hits) == (3, 3)
+    assert cache.hit_rate == 0.5
+
+
+def test_cache_persists_and_is_keyed_by_rules_version(tmp_path: Path) -> None:
+    path = tmp_path / "cache.parquet"
+    frame = _normalized([("Shop", -300)])
+    cache = CategoryCache(path, max_entries=100)
+    Categorizer(RULES, cache=cache).categorize(frame)
+    cache.save()
+
+    reloaded = CategoryCache(path, max_entries=100)
+    Categorizer(RULES, cache=reloaded).categorize(frame)
+    changed = [CategoryRule(category="買い物", keywords=("shop",))]
+    result = Categorizer(changed, cache=reloaded).categorize(frame)
+
+    assert (reloaded.hits, reloaded.misses) == (1, 1)
+    assert result["category"].to_list() == ["買い物"]
+    assert path.stat().st_mode & 0o777 == 0o600
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path) -> None:
+    cache = CategoryCache(None, max_entries=2)
+    categorizer = Categorizer(RULES, cache=cache)
+    categorizer.categorize(_normalized([("a", -1)]))
+    categorizer.categorize(_normalized([("b", -1)]))
+    categorizer.categorize(_normalized([("a", -1)]))
+    categorizer.categorize(_normalized([("c", -1)]))
+
+    assert len(cache) == 2
+    categorizer.categorize(_normalized([("a", -1), ("b", -1)]))
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_damaged_cache_file_is_ignored(tmp_path: Path) -> None:
+    path = tmp_path / "cache.parquet"
+    path.write_bytes(b"not parquet")
+
+    assert len(CategoryCache(path, max_entries=10)) == 0
@@ -1,6 +1,7 @@
 import polars as pl
 
 from src.kakeibo.domain.cleaning import CleaningPipeline
+from src.kakeibo.ports.parser import RAW_SCHEMA
 
 
 def test_cleaning_pipeline_basic():
@@ -25,3 +26,41 @@ def test_cleaning_pipeline_basic():
     assert str(clean_df["transaction_date"][0]) == "2023-10-01"
     assert str(clean_df["transaction_date"][1]) == "2023-10-05"
     assert clean_df["source"][0] == "test"
+
+
+def _raw_frame(dates: list[str | None]) -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "raw_date": dates,
+            "raw_deposit": [None] * len(dates),
+            "raw_withdrawal": ["1"] * len(dates),
+            "raw_description": ["synthetic"] * len(dates),
+            "raw_balance": [None] * len(dates),
+            "raw_memo": [None] * len(dates),
+        },
+        schema={column: pl.Utf8 for column in RAW_SCHEMA},
+    )
+
+
+def test_date_format_is_inferred_from_sample() -> None:
+    pipeline = CleaningPipeline()
+
+    assert pipeline._infer_date_format(pl.Series(["2026年8月1日", None])) == (
+        "%Y年%m月%d日"
+    )
+    assert pipeline._infer_date_format(pl.Series(["2026/08/01"])) == "%Y/%m/%d"
+    assert pipeline._infer_date_format(pl.Series(["2026-08-01"])) == "%Y-%m-%d"
+    assert pipeline._infer_date_format(pl.Series([None], dtype=pl.Utf8)) is None
+
+
+def test_rows_outside_inferred_format_fall_back_individually() -> None:
+    dates = ["2026/08/01", "2026年8月2日", "2026-08-03", "2026/8/4", "不明", None]
+
+    clean_df = CleaningPipeline().process(_raw_frame(dates), source="test")
+
+    assert [str(value) for value in clean_df["transaction_date"]] == [
+        "2026-08-01",
+        "2026-08-02",
+        "2026-08-03",
+        "2026-08-04",
+    ]
@@ -0,0 +1,62 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Cron jobs and shell hooks call lightweight commands; keep them cheap to start.
+STARTUP_BUDGET_SECONDS = 3.0
+HEAVY_MODULES = (
+    "polars",
+    "fastapi",
+    "uvicorn",
+    "src.kakeibo.use_cases.process_file",
+    "src.kakeibo.adapters.parsers.generic_csv",
+)
+
+
+def _run_cli(*args: str) -> tuple[subprocess.CompletedProcess[str], float]:
+    script = (
+        "import sys\n"
+        "from typer.testing import CliRunner\n"
+        "from src.kakeibo.cli import app\n"
+        f"result = CliRunner().invoke(app, {list(args)!r})\n"
+        "assert result.exit_code == 0, result.output\n"
+        f"print('heavy=' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return completed, time.perf_counter() - started
+
+
+def test_config_command_skips_heavy_imports_within_budget() -> None:
+    completed, elapsed = _run_cli("config")
+
+    assert completed.stdout.strip() == "heavy="
+    assert elapsed < STARTUP_BUDGET_SECONDS
+
+
+def test_help_does_not_import_processing_stack() -> None:
+    completed, _ = _run_cli("--help")
+
+    assert completed.stdout.strip() == "heavy="
+
+
+def test_parser_registry_is_built_lazily() -> None:
+    from src.kakeibo.adapters.parsers.sony import SonyBankParser
+    from src.kakeibo.statement_types import STATEMENT_TYPES, build_parser_registry
+
+    registry = build_parser_registry()
+
+    assert set(registry) == set(STATEMENT_TYPES)
+    assert not registry._parsers
+    assert isinstance(registry["sony"], SonyBankParser)
+    assert registry["sony"] is registry["sony"]
+    assert set(registry._parsers) == {"sony"}
@@ -0,0 +1,143 @@
+import json
+from pathlib import Path
+from typing import Any
+
+from typer.testing import CliRunner
+
+from benchmarks.rakuten_html import synthetic_rakuten_bundle
+from src.kakeibo.cli import app
+from src.kakeibo.commerce_history.hashing import (
+    SemanticHasher,
+    canonical_row_bytes,
+    raw_record_sha256,
+    semantic_sha256,
+)
+from src.kakeibo.commerce_history.replay import (
+    ReplayMismatch,
+    build_replay_manifest,
+    default_manifest_path,
+    verify_replay,
+)
+
+
+def _tamper(bundle: dict[str, Any], position: int, *, rehash: bool) -> None:
+    record = bundle["records"][position - 1]
+    record["rendered_html"] = record["rendered_html"].replace("円", "円 ", 1)
+    record["rendered_html"] = record["rendered_html"].replace(
+        'class="value--21p0x">', 'class="value--21p0x">1', 1
+    )
+    if rehash:
+        record["raw_record_sha256"] = raw_record_sha256(
+            rendered_html=record["rendered_html"],
+            rendered_text=record["rendered_text"],
+        )
+
+
+def test_semantic_hasher_matches_semantic_sha256() -> None:
+    rows = [{"b": 1, "a": "円"}, {"a": None}, [1, 2]]
+    hasher = SemanticHasher()
+
+    assert hasher.hexdigest() == semantic_sha256([])
+    hasher.update(canonical_row_bytes(row) for row in rows[:1])
+    hasher.update(canonical_row_bytes(row) for row in rows[1:])
+
+    assert hasher.rows == 3
+    assert hasher.hexdigest() == semantic_sha256(rows)
+
+
+def test_replay_of_unchanged_bundle_passes_serially_and_in_parallel() -> None:
+    bundle = synthetic_rakuten_bundle(60, seed=2)
+    manifest = build_replay_manifest(bundle)
+
+    serial = verify_replay(bundle, manifest, workers=1, chunk_records=7)
+    parallel = verify_replay(bundle, manifest, workers=2, chunk_records=7)
+
+    assert serial.ok and parallel.ok
+    assert serial == parallel
+    assert serial.records == manifest.order_rows == 60
+    assert serial.item_rows == manifest.item_rows
+
+
+def test_replay_reports_first_changed_record_and_stops() -> None:
+    bundle = synthetic_rakuten_bundle(40, seed=2)
+    manifest = build_replay_manifest(bundle)
+    _tamper(bundle, 23, rehash=False)
+
+    result = verify_replay(bundle, manifest, workers=1, chunk_records=10)
+    parallel = verify_replay(bundle, manifest, workers=2, chunk_records=10)
+
+    assert result.mismatch == ReplayMismatch("raw_record_sha256", 23)
+    assert result.records == 20
+    assert parallel.mismatch == result.mismatch
+
+
+def test_parallel_replay_reports_the_earliest_mismatch_in_bundle_order() -> None:
+    bundle = synthetic_rakuten_bundle(120, seed=2)
+    manifest = build_replay_manifest(bundle)
+    # The second chunk fails on its first record, long before the first
+    # chunk reaches its last one.
+    _tamper(bundle, 60, rehash=False)
+    _tamper(bundle, 61, rehash=False)
+
+    result = verify_replay(bundle, manifest, workers=2, chunk_records=60)
+
+    assert result.mismatch == ReplayMismatch("raw_record_sha256", 60)
+    assert result.records == 0
+
+
+def test_replay_detects_semantic_drift_behind_a_rewritten_hash() -> None:
+    bundle = synthetic_rakuten_bundle(40, seed=2)
+    manifest = build_replay_manifest(bundle)
+    _tamper(bundle, 5, rehash=True)
+    changed = manifest.model_copy(
+        update={
+            "raw_record_sha256": tuple(
+                record["raw_record_sha256"] for record in bundle["records"]
+            )
+        }
+    )
+
+    result = verify_replay(bundle, changed, workers=2, chunk_records=10)
+
+    assert result.mismatch == ReplayMismatch("items_semantic_sha256")
+
+
+def test_replay_rejects_other_parser_versions_and_counts() -> None:
+    bundle = synthetic_rakuten_bundle(5, seed=2)
+    manifest = build_replay_manifest(bundle)
+    bundle["records"].pop()
+    bundle["reported_records"] = 4
+
+    old_parser = manifest.model_copy(update={"parser_version": "rakuten_v01"})
+
+    assert verify_replay(bundle, old_parser).mismatch == ReplayMismatch(
+        "parser_version"
+    )
+    assert verify_replay(bundle, manifest).mismatch == ReplayMismatch("order_rows")
+
+
+def test_commerce_cli_writes_manifest_and_verifies_without_paths(
+    tmp_path: Path,
+) -> None:
+    bundle_path = tmp_path / "rakuten-bundle-sample.json"
+    bundle = synthetic_rakuten_bundle(12, seed=4)
+    bundle_path.write_text(json.dumps(bundle, ensure_ascii=False), encoding="utf-8")
+    runner = CliRunner()
+
+    written = runner.invoke(app, ["commerce", "manifest", str(bundle_path)])
+    verified = runner.invoke(
+        app, ["commerce", "verify", str(bundle_path), "--workers", "1"]
+    )
+
+    assert written.exit_code == 0, written.output
+    assert default_manifest_path(bundle_path).is_file()
+    assert verified.exit_code == 0, verified.output
+    assert "status=PASS records=12" in verified.output
+    assert "rakuten-bundle-sample" not in written.output + verified.output
+
+    _tamper(bundle, 3, rehash=False)
+    bundle_path.write_text(json.dumps(bundle, ensure_ascii=False), encoding="utf-8")
+    failed = runner.invoke(app, ["commerce", "verify", str(bundle_path)])
+
+    assert failed.exit_code == 1
+    assert "check=raw_record_sha256 record_position=3" in failed.output
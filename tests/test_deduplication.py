@@ -0,0 +1,78 @@
+from datetime import date
+from pathlib import Path
+
+import polars as pl
+from typer.testing import CliRunner
+
+from src.kakeibo.adapters.normalized_csv import read_normalized_csv
+from src.kakeibo.cli import app
+from src.kakeibo.domain.cleaning import NORMALIZED_SCHEMA
+from src.kakeibo.domain.deduplication import deduplicate_overlaps
+
+
+def _normalized(rows: list[tuple[int, int, str]], source: str) -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "transaction_date": [date(2026, 1, day) for day, _, _ in rows],
+            "amount": [amount for _, amount, _ in rows],
+            "description": [description for _, _, description in rows],
+            "balance": [None] * len(rows),
+            "memo": [None] * len(rows),
+            "source": [source] * len(rows),
+        },
+        schema=NORMALIZED_SCHEMA,
+    )
+
+
+def test_overlapping_statements_keep_first_copy_in_input_order() -> None:
+    january = _normalized([(1, -100, "Shop A"), (5, -200, "Shop B")], "card")
+    overlap = _normalized([(5, -200, "Shop B"), (9, -300, "Shop C")], "card")
+
+    merged, reports = deduplicate_overlaps([january, overlap])
+
+    assert merged["description"].to_list() == ["Shop A", "Shop B", "Shop C"]
+    assert merged.schema == NORMALIZED_SCHEMA
+    assert [(r.input_rows, r.kept_rows, r.removed_rows) for r in reports] == [(4, 3, 1)]
+
+
+def test_identical_rows_within_one_statement_are_preserved() -> None:
+    twice = _normalized([(3, -150, "Cafe"), (3, -150, "Cafe")], "card")
+    once = _normalized([(3, -150, "Cafe")], "card")
+
+    merged, reports = deduplicate_overlaps([once, twice])
+
+    assert merged.height == 2
+    assert reports[0].removed_rows == 1
+
+
+def test_same_row_from_different_sources_is_not_a_duplicate() -> None:
+    bank = _normalized([(2, -500, "Transfer")], "bank")
+    card = _normalized([(2, -500, "Transfer")], "card")
+
+    merged, reports = deduplicate_overlaps([bank, card])
+
+    assert merged.height == 2
+    assert [(r.source, r.removed_rows) for r in reports] == [
+        ("bank", 0),
+        ("card", 0),
+    ]
+
+
+def test_dedup_command_writes_private_output_and_counts_only(
+    tmp_path: Path,
+) -> None:
+    first = tmp_path / "first.csv"
+    second = tmp_path / "second.csv"
+    _normalized([(1, -100, "Shop A"), (5, -200, "Shop B")], "card").write_csv(first)
+    _normalized([(5, -200, "Shop B")], "card").write_csv(second)
+    output_dir = tmp_path / "out"
+
+    result = CliRunner().invoke(
+        app, ["dedup", str(first), str(second), "--output-dir", str(output_dir)]
+    )
+
+    assert result.exit_code == 0
+    assert "card: kept=2 removed=1" in result.output
+    assert "Shop" not in result.output
+    (written,) = output_dir.iterdir()
+    assert read_normalized_csv(written).height == 2
@@ -0,0 +1,109 @@
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from benchmarks.synthetic import synthetic_suffix, write_statement
+from src.kakeibo.adapters.parsers.generic_csv import (
+    GenericCsvParser,
+    resolve_column_mapping,
+)
+from src.kakeibo.statement_types import STATEMENT_TYPES
+from src.kakeibo.use_cases.process_file import ProcessFileUseCase
+
+
+def _wide_statement(extra_columns: int) -> str:
+    extras = [f"unused_{index}" for index in range(extra_columns)]
+    header = [*extras[:3], " 利用日 ", *extras[3:], "利用店名・商品名", "支払総額"]
+    row = [*(f"noise{index}" for index in range(extra_columns))]
+    row.insert(3, "2026/08/01")
+    row.extend(["SYNTHETIC SHOP", "1200"])
+    return ",".join(header) + "\n" + ",".join(row) + "\n"
+
+
+def test_mapping_prefers_earlier_candidates_and_ignores_unused_columns() -> None:
+    header = ["Amount", "摘要", "利用店名", "日付", "利用日", "memo"]
+
+    assert resolve_column_mapping(header) == {
+        0: "raw_withdrawal",
+        2: "raw_description",
+        4: "raw_date",
+    }
+
+
+def test_wide_export_reads_only_mapped_columns(tmp_path: Path) -> None:
+    statement = tmp_path / "wide.csv"
+    statement.write_text(_wide_statement(40), encoding="utf-8-sig")
+
+    parsed = GenericCsvParser().parse(statement, "utf-8-sig")
+
+    assert parsed.columns == [
+        "raw_date",
+        "raw_deposit",
+        "raw_withdrawal",
+        "raw_description",
+        "raw_balance",
+        "raw_memo",
+    ]
+    assert parsed.row(0) == (
+        "2026/08/01",
+        None,
+        "1200",
+        "SYNTHETIC SHOP",
+        None,
+        None,
+    )
+
+
+def test_unmapped_statement_keeps_row_count() -> None:
+    parsed = GenericCsvParser().parse(b"a,b\n1,2\n3,4\n", "utf-8")
+
+    assert parsed.height == 2
+    assert parsed.get_column("raw_date").dtype == pl.Utf8
+    assert parsed.get_column("raw_date").null_count() == 2
+
+
+@pytest.mark.parametrize("statement_type", sorted(STATEMENT_TYPES))
+def test_batched_processing_matches_whole_file(
+    tmp_path: Path,
+    statement_type: str,
+) -> None:
+    statement = write_statement(
+        statement_type,
+        103,
+        tmp_path / f"synthetic{synthetic_suffix(statement_type)}",
+        seed=3,
+    )
+    use_case = ProcessFileUseCase()
+
+    assert use_case.execute(statement, tmp_path / "whole", source_type=statement_type)
+    assert use_case.execute(
+        statement,
+        tmp_path / "batched",
+        source_type=statement_type,
+        batch_rows=10,
+    )
+
+    (whole,) = (tmp_path / "whole").iterdir()
+    (batched,) = (tmp_path / "batched").iterdir()
+    assert batched.read_bytes() == whole.read_bytes()
+
+
+def test_generic_batches_are_bounded_and_transcoded(tmp_path: Path) -> None:
+    statement = write_statement("generic", 25, tmp_path / "synthetic.csv")
+
+    batches = list(GenericCsvParser().iter_batches(statement, "shift_jis", 10))
+
+    assert [batch.height for batch in batches] == [10, 10, 5]
+    assert batches[0].get_column("raw_description").str.starts_with("SYNTHETIC").all()
+
+
+def test_batched_processing_of_header_only_statement(tmp_path: Path) -> None:
+    statement = tmp_path / "transaction-history.csv"
+    statement.write_text("Date,Description,Amount\n", encoding="utf-8")
+
+    assert ProcessFileUseCase().execute(
+        statement, tmp_path / "out", source_type="transaction", batch_rows=10
+    )
+    (output,) = (tmp_path / "out").iterdir()
+    assert output.read_text(encoding="utf-8").startswith("transaction_date,amount")
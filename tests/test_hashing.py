@@ -0,0 +1,53 @@
+import hashlib
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from src.kakeibo import hashing
+from src.kakeibo.hashing import file_sha256, open_text_hashed
+from src.kakeibo.monthly_snapshot import _aggregate_input
+
+
+def test_file_sha256_matches_hashlib(tmp_path: Path) -> None:
+    path = tmp_path / "payload.bin"
+    payload = bytes(range(256)) * 9000
+    path.write_bytes(payload)
+
+    assert file_sha256(path) == hashlib.sha256(payload).hexdigest()
+
+
+def test_hashed_text_stream_covers_bytes_not_yet_decoded(tmp_path: Path) -> None:
+    path = tmp_path / "payload.csv"
+    payload = "﻿a,b\n" + "1,２\n" * 50_000
+    path.write_text(payload, encoding="utf-8")
+
+    text, reader = open_text_hashed(path, "utf-8-sig")
+    with text:
+        assert text.readline() == "a,b\n"
+        digest = reader.hexdigest()
+
+    assert digest == hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_snapshot_aggregation_memory_does_not_scale_with_file_size(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(hashing, "HASH_BUFFER_BYTES", 16 * 1024)
+    path = tmp_path / "normalized.csv"
+    line = "2026-07-01,-1234,synthetic description,,,fixture\n"
+    with path.open("w", encoding="utf-8") as handle:
+        handle.write("transaction_date,amount,description,balance,memo,source\n")
+        handle.writelines(line for _ in range(10_000))
+    size = path.stat().st_size
+
+    tracemalloc.start()
+    try:
+        aggregate = _aggregate_input(path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert aggregate.sha256 == hashlib.sha256(path.read_bytes()).hexdigest()
+    assert aggregate.row_count == 10_000
+    assert peak < size / 2
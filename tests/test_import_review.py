@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import json
 from pathlib import Path
 
+import polars as pl
 from fastapi.testclient import TestClient
 
 from src.kakeibo.config import Settings
@@ -20,6 +22,8 @@ def client_for(tmp_path: Path) -> tuple[TestClient, Settings]:
         input_dir=tmp_path / "local-input",
         output_dir=tmp_path / "local-output",
         log_dir=tmp_path / "local-logs",
+        category_rules_path=tmp_path / "category-rules.json",
+        category_cache_path=tmp_path / "cache" / "category-matches.parquet",
     )
     service = LocalImportService(app_settings)
     return TestClient(create_app(service)), app_settings
@@ -172,3 +176,29 @@ def test_cancel_removes_staged_file_and_invalidates_session(tmp_path: Path) -> N
         },
     )
     assert committed.status_code == 409
+
+
+def test_committed_output_is_categorized_like_processed_output(
+    tmp_path: Path,
+) -> None:
+    client, app_settings = client_for(tmp_path)
+    app_settings.category_rules_path.write_text(
+        json.dumps({"rules": [{"category": "食費", "keywords": ["alpha"]}]}),
+        encoding="utf-8",
+    )
+    review = review_statement(client).json()
+
+    committed = client.post(
+        "/commit",
+        json={
+            "review_token": review["review_token"],
+            "destination": review["destination"],
+            "confirmed": True,
+        },
+    )
+
+    assert committed.status_code == 200
+    written = pl.read_csv(review["destination"])
+    assert written["category"].to_list() == ["食費", None]
+    assert written["sub_category"].null_count() == 2
+    assert app_settings.category_cache_path.is_file()
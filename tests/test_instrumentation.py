@@ -0,0 +1,86 @@
+import json
+import tracemalloc
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from src.kakeibo.cli import app
+from src.kakeibo.config import settings
+from src.kakeibo.instrumentation import (
+    STAGE_METRICS_FILENAME,
+    JsonlStageRecorder,
+    summarize_stage_metrics,
+)
+from src.kakeibo.use_cases.process_file import ProcessFileUseCase
+
+SYNTHETIC_STATEMENT = (
+    "Date,Description,Amount\n"
+    "2026-08-01,PRIVATE_MERCHANT_ALPHA,100\n"
+    "2026-08-02,PRIVATE_MERCHANT_BETA,250\n"
+    "not-a-date,PRIVATE_MERCHANT_GAMMA,1\n"
+)
+
+
+def _process(tmp_path: Path, recorder: JsonlStageRecorder) -> None:
+    statement = tmp_path / "transaction-history.csv"
+    statement.write_text(SYNTHETIC_STATEMENT, encoding="utf-8")
+    use_case = ProcessFileUseCase(recorder=recorder)
+    assert use_case.execute(statement, tmp_path / "out", source_type="transaction")
+
+
+def test_stage_metrics_record_rows_and_memory_without_content(tmp_path: Path) -> None:
+    metrics_path = tmp_path / "logs" / STAGE_METRICS_FILENAME
+    tracemalloc.start()
+    try:
+        _process(tmp_path, JsonlStageRecorder(metrics_path))
+    finally:
+        tracemalloc.stop()
+
+    text = metrics_path.read_text(encoding="utf-8")
+    entries = [json.loads(line) for line in text.splitlines()]
+    assert [entry["stage"] for entry in entries] == [
+        "parse",
+        "clean",
+        "categorize",
+        "write",
+    ]
+    assert [(entry["rows_in"], entry["rows_out"]) for entry in entries] == [
+        (None, 3),
+        (3, 2),
+        (2, 2),
+        (2, 2),
+    ]
+    assert all(entry["source_type"] == "transaction" for entry in entries)
+    assert all(entry["tracemalloc_peak_bytes"] is not None for entry in entries)
+    assert "PRIVATE_MERCHANT" not in text
+    assert "transaction-history" not in text
+    assert str(tmp_path) not in text
+
+
+def test_stats_command_aggregates_recorded_stages(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    log_dir = tmp_path / "logs"
+    recorder = JsonlStageRecorder(log_dir / STAGE_METRICS_FILENAME)
+    _process(tmp_path, recorder)
+    _process(tmp_path, recorder)
+
+    summary = summarize_stage_metrics(log_dir / STAGE_METRICS_FILENAME)
+    assert [(entry["stage"], entry["runs"]) for entry in summary] == [
+        ("categorize", 2),
+        ("clean", 2),
+        ("parse", 2),
+        ("write", 2),
+    ]
+    assert summary[2]["rows_out"] == 6
+
+    monkeypatch.setattr(settings, "log_dir", log_dir)
+    result = CliRunner().invoke(app, ["stats"])
+    assert result.exit_code == 0
+    assert "parse" in result.output
+    assert "write" in result.output
+
+    monkeypatch.setattr(settings, "log_dir", tmp_path / "empty")
+    assert CliRunner().invoke(app, ["stats"]).exit_code == 1
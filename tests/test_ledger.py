@@ -0,0 +1,121 @@
+import json
+from datetime import date
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from src.kakeibo.domain.cleaning import NORMALIZED_SCHEMA
+from src.kakeibo.ledger import LEDGER_SCHEMA, MANIFEST_NAME, Ledger, LedgerError
+
+
+def _normalized(rows: list[tuple[date, int]], source: str) -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "transaction_date": [day for day, _ in rows],
+            "amount": [amount for _, amount in rows],
+            "description": ["synthetic"] * len(rows),
+            "balance": [None] * len(rows),
+            "memo": [None] * len(rows),
+            "source": [source] * len(rows),
+        },
+        schema=NORMALIZED_SCHEMA,
+    )
+
+
+def test_append_partitions_by_month_and_source(tmp_path: Path) -> None:
+    ledger = Ledger(tmp_path / "ledger")
+    frame = pl.concat(
+        [
+            _normalized([(date(2026, 1, 3), -100), (date(2026, 2, 1), -200)], "card"),
+            _normalized([(date(2026, 1, 9), 5000)], "bank"),
+        ]
+    )
+
+    result = ledger.append(frame)
+
+    assert result.appended_rows == 3
+    assert result.partitions == 3
+    assert (tmp_path / "ledger" / MANIFEST_NAME).is_file()
+    assert len(ledger.files(month_from="2026-01", month_to="2026-01")) == 2
+    assert len(ledger.files(sources=["card"])) == 2
+    january_card = ledger.scan(
+        month_from="2026-01", month_to="2026-01", sources=["card"]
+    ).collect()
+    assert january_card["amount"].to_list() == [-100]
+    assert ledger.scan().collect().schema == LEDGER_SCHEMA
+
+
+def test_append_csv_skips_inputs_already_in_ledger(tmp_path: Path) -> None:
+    normalized = tmp_path / "normalized.csv"
+    _normalized([(date(2026, 3, 1), -300)], "card").write_csv(normalized)
+    ledger = Ledger(tmp_path / "ledger")
+
+    first = ledger.append_csv([normalized])
+    second = ledger.append_csv([normalized])
+
+    assert first.appended_rows == 1
+    assert second.skipped_inputs == 1
+    assert ledger.scan().collect().height == 1
+
+
+def test_compact_merges_partition_files_without_changing_rows(
+    tmp_path: Path,
+) -> None:
+    ledger = Ledger(tmp_path / "ledger")
+    for day in range(1, 4):
+        ledger.append(_normalized([(date(2026, 4, day), -day)], "card"))
+    ledger.append(_normalized([(date(2026, 5, 1), -9)], "card"))
+    before = ledger.scan().collect().sort("transaction_date")
+
+    assert ledger.compact() == 1
+
+    partition = tmp_path / "ledger" / "month=2026-04" / "source=card"
+    assert len(list(partition.glob("*.parquet"))) == 1
+    assert ledger.scan().collect().sort("transaction_date").equals(before)
+    assert ledger.compact() == 0
+
+
+def test_version_1_ledger_is_rejected_until_migrated(tmp_path: Path) -> None:
+    root = tmp_path / "ledger"
+    partition = root / "month=2026-06" / "source=card"
+    partition.mkdir(parents=True)
+    _normalized([(date(2026, 6, 1), -600)], "card").write_parquet(
+        partition / "part-legacy.parquet"
+    )
+    (root / MANIFEST_NAME).write_text(
+        json.dumps(
+            {
+                "version": 1,
+                "inputs": [],
+                "partitions": {
+                    "month=2026-06/source=card": [
+                        {"name": "part-legacy.parquet", "rows": 1}
+                    ]
+                },
+            }
+        ),
+        encoding="utf-8",
+    )
+    ledger = Ledger(root)
+
+    with pytest.raises(LedgerError, match="ledger migrate"):
+        ledger.scan()
+
+    assert ledger.migrate() == 1
+    assert ledger.migrate() == 0
+    migrated = ledger.scan().collect()
+    assert migrated.schema == LEDGER_SCHEMA
+    assert migrated["amount"].to_list() == [-600]
+    assert not (partition / "part-legacy.parquet").exists()
+    ledger.append(_normalized([(date(2026, 6, 2), -1)], "card"))
+    assert ledger.scan().collect().height == 2
+
+
+def test_unsafe_source_is_rejected_before_writing(tmp_path: Path) -> None:
+    ledger = Ledger(tmp_path / "ledger")
+
+    with pytest.raises(LedgerError):
+        ledger.append(_normalized([(date(2026, 1, 1), -1)], "../escape"))
+
+    assert not list((tmp_path / "ledger").rglob("*.parquet"))
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import io
+import tarfile
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import SecretStr
+
+from src.kakeibo import api
+from src.kakeibo.config import Settings, settings
+from src.kakeibo.import_review import LocalImportService, create_app
+from src.kakeibo.metrics import MetricsRegistry, ServiceMetrics, _Metric
+
+SYNTHETIC_STATEMENT = (
+    b"Date,Description,Amount\n"
+    b"2026-08-01,PRIVATE_MERCHANT_ALPHA,100\n"
+    b"2026-08-02,PRIVATE_MERCHANT_BETA,250\n"
+)
+LOCAL_CLIENT = ("127.0.0.1", 50000)
+UPLOAD_HEADERS = {
+    "X-Statement-Type": "transaction",
+    "X-File-Suffix": ".csv",
+    "Content-Type": "application/octet-stream",
+}
+
+
+def test_registry_renders_text_exposition_format() -> None:
+    registry = MetricsRegistry()
+    requests = registry.counter("demo_requests_total", "Requests.", ("route",))
+    latency = registry.histogram(
+        "demo_seconds", "Latency.", ("route",), buckets=(0.1, 1.0)
+    )
+    registry.gauge("demo_sessions", "Sessions.", lambda: 3)
+
+    requests.inc(route="/a")
+    requests.inc(2, route="/a")
+    latency.observe(0.05, route="/a")
+    latency.observe(0.5, route="/a")
+    latency.observe(7.0, route="/a")
+
+    assert registry.render().splitlines() == [
+        "# HELP demo_requests_total Requests.",
+        "# TYPE demo_requests_total counter",
+        'demo_requests_total{route="/a"} 3',
+        "# HELP demo_seconds Latency.",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{route="/a",le="0.1"} 1',
+        'demo_seconds_bucket{route="/a",le="1"} 2',
+        'demo_seconds_bucket{route="/a",le="+Inf"} 3',
+        'demo_seconds_sum{route="/a"} 7.55',
+        'demo_seconds_count{route="/a"} 3',
+        "# HELP demo_sessions Sessions.",
+        "# TYPE demo_sessions gauge",
+        "demo_sessions 3",
+    ]
+    with pytest.raises(ValueError):
+        requests.inc(path="/a")
+    with pytest.raises(TypeError):
+        _Metric("demo_abstract", "Abstract.", ())  # type: ignore[abstract]
+
+
+def test_api_metrics_cover_routes_stages_bytes_and_rejections(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "api_enabled", True)
+    monkeypatch.setattr(settings, "api_token", SecretStr("x" * 32))
+    client = TestClient(api.app, client=LOCAL_CLIENT)
+    metrics = api.metrics
+    labels = {"method": "POST", "route": "/process", "status": "200"}
+    before = (
+        metrics.request_seconds.count(**labels),
+        metrics.received_bytes.value(route="/process"),
+        metrics.stage_seconds.count(source_type="transaction", stage="parse"),
+        metrics.rows.value(source_type="transaction", stage="write"),
+        metrics.rejections.value(reason="unauthorized"),
+    )
+
+    accepted = client.post(
+        "/process",
+        content=SYNTHETIC_STATEMENT,
+        headers={**UPLOAD_HEADERS, "X-API-Key": "x" * 32},
+    )
+    rejected = client.post(
+        "/process",
+        content=SYNTHETIC_STATEMENT,
+        headers={**UPLOAD_HEADERS, "X-API-Key": "wrong"},
+    )
+    assert accepted.status_code == 200
+    assert rejected.status_code == 401
+
+    after = (
+        metrics.request_seconds.count(**labels),
+        metrics.received_bytes.value(route="/process"),
+        metrics.stage_seconds.count(source_type="transaction", stage="parse"),
+        metrics.rows.value(source_type="transaction", stage="write"),
+        metrics.rejections.value(reason="unauthorized"),
+    )
+    # The unauthorized body is never read, so only one upload is counted.
+    assert [new - old for new, old in zip(after, before, strict=True)] == [
+        1,
+        len(SYNTHETIC_STATEMENT),
+        1,
+        2,
+        1,
+    ]
+
+
+def test_failed_statement_has_one_reason_on_single_and_batch_routes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "api_enabled", True)
+    monkeypatch.setattr(settings, "api_token", SecretStr("x" * 32))
+    client = TestClient(api.app, client=LOCAL_CLIENT)
+    undecodable = b"\xff\xfe\x00synthetic"
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode="w", format=tarfile.PAX_FORMAT) as writer:
+        info = tarfile.TarInfo("member")
+        info.size = len(undecodable)
+        info.pax_headers = {"X-Statement-Type": "transaction", "X-File-Suffix": ".csv"}
+        writer.addfile(info, io.BytesIO(undecodable))
+    headers = {**UPLOAD_HEADERS, "X-API-Key": "x" * 32}
+    reasons = api.metrics.rejections
+
+    before = reasons.value(reason="unprocessable")
+    single = client.post("/process", content=undecodable, headers=headers)
+    after_single = reasons.value(reason="unprocessable")
+    batch = client.post("/process-batch", content=archive.getvalue(), headers=headers)
+
+    assert single.status_code == 422
+    assert batch.json()["parts"][0]["status"] == "failed"
+    assert after_single - before == 1
+    assert reasons.value(reason="unprocessable") - after_single == 1
+
+
+def test_metrics_endpoint_is_local_only_and_content_free(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    scrape = TestClient(api.app, client=LOCAL_CLIENT).get("/metrics")
+
+    assert scrape.status_code == 200
+    assert scrape.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "kakeibo_http_request_duration_seconds" in scrape.text
+    assert "PRIVATE_MERCHANT" not in scrape.text
+
+    remote = TestClient(api.app, client=("203.0.113.10", 50000)).get("/metrics")
+    default_host = TestClient(api.app).get("/metrics")
+    forwarded = TestClient(api.app, client=LOCAL_CLIENT).get(
+        "/metrics", headers={"X-Forwarded-For": "203.0.113.10"}
+    )
+    assert remote.status_code == 404
+    assert default_host.status_code == 404
+    assert forwarded.status_code == 404
+
+    monkeypatch.setattr(settings, "metrics_enabled", False)
+    assert TestClient(api.app, client=LOCAL_CLIENT).get("/metrics").status_code == 404
+
+
+def test_review_metrics_track_sessions_without_statement_content(
+    tmp_path: Path,
+) -> None:
+    app_settings = Settings(
+        _env_file=None,
+        input_dir=tmp_path / "local-input",
+        output_dir=tmp_path / "local-output",
+        log_dir=tmp_path / "local-logs",
+    )
+    metrics = ServiceMetrics()
+    service = LocalImportService(app_settings, recorder=metrics)
+    client = TestClient(create_app(service, metrics), client=LOCAL_CLIENT)
+
+    assert client.post("/review", content=SYNTHETIC_STATEMENT, headers=UPLOAD_HEADERS)
+    rejected = client.post(
+        "/review",
+        content=SYNTHETIC_STATEMENT,
+        headers={**UPLOAD_HEADERS, "X-Statement-Type": "unknown"},
+    )
+    assert rejected.status_code == 415
+
+    text = client.get("/metrics").text
+    assert "kakeibo_review_active_sessions 1" in text
+    assert 'kakeibo_rejections_total{reason="unsupported_statement"} 1' in text
+    assert (
+        'kakeibo_stage_duration_seconds_count{source_type="transaction",'
+        'stage="clean"} 1'
+    ) in text
+    assert "PRIVATE_MERCHANT" not in text
+    assert str(tmp_path) not in text
@@ -2,7 +2,11 @@ from pathlib import Path
 
 import pytest
 
-from src.kakeibo.monthly_snapshot import SnapshotError, build_monthly_snapshot
+from src.kakeibo.monthly_snapshot import (
+    SnapshotError,
+    SnapshotInputCache,
+    build_monthly_snapshot,
+)
 
 
 def _write_csv(path: Path, rows: list[tuple[str, int]]) -> None:
@@ -87,3 +91,107 @@ def test_invalid_month_and_csv_fail_closed(tmp_path: Path) -> None:
             fx_source="fixture://fx",
             fx_retrieved_at="2026-08-10T00:00:00Z",
         )
+
+
+def test_cached_snapshot_is_byte_identical_and_reads_only_new_inputs(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from src.kakeibo import monthly_snapshot
+
+    first_input = tmp_path / "first.csv"
+    second_input = tmp_path / "second.csv"
+    _write_csv(first_input, [("2026-06-30", 999), ("2026-07-01", 1000)])
+    _write_csv(second_input, [("2026-07-02", -250)])
+    cache_path = tmp_path / "cache" / "snapshot-inputs.json"
+    reads: list[Path] = []
+    aggregate_input = monthly_snapshot._aggregate_input
+
+    def counting_aggregate(path: Path) -> monthly_snapshot.InputAggregate:
+        reads.append(path)
+        return aggregate_input(path)
+
+    monkeypatch.setattr(monthly_snapshot, "_aggregate_input", counting_aggregate)
+
+    def snapshot(month: str, paths: list[Path], root: str, cache: bool) -> Path:
+        build_monthly_snapshot(
+            month=month,
+            input_paths=paths,
+            artifact_root=tmp_path / root,
+            fx_source="fixture://fx",
+            fx_retrieved_at="2026-08-10T00:00:00Z",
+            cache=SnapshotInputCache(cache_path) if cache else None,
+        )
+        return tmp_path / root / month
+
+    snapshot("2026-07", [first_input], "cached", cache=True)
+    assert reads == [first_input]
+    cached = snapshot("2026-07", [first_input, second_input], "cached", cache=True)
+    assert reads == [first_input, second_input]
+    june = snapshot("2026-06", [first_input, second_input], "cached", cache=True)
+    assert len(reads) == 2
+
+    fresh = snapshot("2026-07", [first_input, second_input], "fresh", cache=False)
+    fresh_june = snapshot("2026-06", [first_input, second_input], "fresh", cache=False)
+    for name in ("aggregation.json", "metadata.json"):
+        assert (cached / name).read_bytes() == (fresh / name).read_bytes()
+        assert (june / name).read_bytes() == (fresh_june / name).read_bytes()
+
+    _write_csv(first_input, [("2026-07-01", 5)])
+    snapshot("2026-07", [first_input], "cached", cache=True)
+    assert reads[-1] == first_input
+    assert "first.csv" not in cache_path.read_text(encoding="utf-8")
+    assert cache_path.stat().st_mode & 0o777 == 0o600
+
+
+@pytest.mark.parametrize(
+    "payload",
+    ["[]", '"cache"', '{"version": 1, "inputs": [], "stat_index": {}}'],
+)
+def test_cache_file_with_unexpected_shape_is_treated_as_empty(
+    tmp_path: Path, payload: str
+) -> None:
+    input_path = tmp_path / "normalized.csv"
+    _write_csv(input_path, [("2026-07-01", 1000)])
+    cache_path = tmp_path / "snapshot-inputs.json"
+    cache_path.write_text(payload, encoding="utf-8")
+
+    cache = SnapshotInputCache(cache_path)
+    build_monthly_snapshot(
+        month="2026-07",
+        input_paths=[input_path],
+        artifact_root=tmp_path / "artifacts",
+        fx_source="fixture://fx",
+        fx_retrieved_at="2026-08-10T00:00:00Z",
+        cache=cache,
+    )
+
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert SnapshotInputCache(cache_path).lookup(input_path)[1] is not None
+
+
+def test_parallel_snapshot_matches_sequential_ids_and_bytes(tmp_path: Path) -> None:
+    paths = []
+    for index in range(6):
+        path = tmp_path / f"input-{index}.csv"
+        _write_csv(path, [("2026-07-01", index * 100 - 250), ("2026-07-15", index)])
+        paths.append(path)
+
+    roots = {}
+    for workers in (1, 4):
+        roots[workers] = tmp_path / f"workers-{workers}"
+        build_monthly_snapshot(
+            month="2026-07",
+            input_paths=list(reversed(paths)) if workers > 1 else paths,
+            artifact_root=roots[workers],
+            fx_source="fixture://fx",
+            fx_retrieved_at="2026-08-10T00:00:00Z",
+            workers=workers,
+        )
+
+    for name in ("aggregation.json", "metadata.json"):
+        assert (roots[1] / "2026-07" / name).read_bytes() == (
+            roots[4] / "2026-07" / name
+        ).read_bytes()
+    assert '"input_id":"input-006"' in (
+        roots[4] / "2026-07" / "metadata.json"
+    ).read_text(encoding="utf-8")
@@ -0,0 +1,123 @@
+from datetime import date
+from pathlib import Path
+
+import polars as pl
+import pytest
+from typer.testing import CliRunner
+
+from src.kakeibo.adapters.normalized_csv import scan_normalized_csv
+from src.kakeibo.cli import app
+from src.kakeibo.domain.cleaning import NORMALIZED_SCHEMA
+from src.kakeibo.ledger import Ledger
+from src.kakeibo.query import QueryFilter, aggregate
+
+
+def _frame() -> pl.DataFrame:
+    rows = [
+        (date(2026, 1, 5), -1200, "Cafe North", "card"),
+        (date(2026, 2, 10), -800, "Cafe South", "card"),
+        (date(2026, 2, 25), 300000, "Salary", "bank"),
+        (date(2026, 3, 1), -5000, "Rent", "bank"),
+        (date(2026, 3, 31), -450, "Cafe North", "card"),
+    ]
+    return pl.DataFrame(
+        {
+            "transaction_date": [row[0] for row in rows],
+            "amount": [row[1] for row in rows],
+            "description": [row[2] for row in rows],
+            "balance": [None] * len(rows),
+            "memo": [None] * len(rows),
+            "source": [row[3] for row in rows],
+        },
+        schema=NORMALIZED_SCHEMA,
+    )
+
+
+def test_filters_combine_month_source_amount_and_description() -> None:
+    result = aggregate(
+        _frame().lazy(),
+        QueryFilter(
+            month_from="2026-02",
+            month_to="2026-03",
+            sources=("card",),
+            max_amount=0,
+            description_contains="Cafe",
+        ),
+    )
+
+    assert result.to_dicts() == [
+        {"transaction_count": 2, "inflow": 0, "outflow": 1250, "net": -1250}
+    ]
+
+
+def test_group_by_month_returns_aggregates_only() -> None:
+    result = aggregate(_frame().lazy(), QueryFilter(), ["month"])
+
+    assert result.columns == [
+        "month",
+        "transaction_count",
+        "inflow",
+        "outflow",
+        "net",
+    ]
+    assert result["month"].to_list() == ["2026-01", "2026-02", "2026-03"]
+    assert result["net"].to_list() == [-1200, 299200, -5450]
+
+
+def test_unknown_group_key_and_month_are_rejected() -> None:
+    with pytest.raises(ValueError):
+        aggregate(_frame().lazy(), QueryFilter(), ["description"])
+    with pytest.raises(ValueError):
+        QueryFilter(month_from="2026-13")
+
+
+def test_csv_scan_matches_ledger_scan(tmp_path: Path) -> None:
+    normalized = tmp_path / "normalized.csv"
+    _frame().write_csv(normalized)
+    ledger = Ledger(tmp_path / "ledger")
+    ledger.append(_frame())
+    query = QueryFilter(month_from="2026-03", month_to="2026-03")
+
+    from_csv = aggregate(scan_normalized_csv([normalized]), query, ["source"])
+    from_ledger = aggregate(
+        ledger.scan(month_from="2026-03", month_to="2026-03"), query, ["source"]
+    )
+
+    assert from_csv.equals(from_ledger)
+
+
+def test_csv_scan_groups_old_and_categorized_outputs_by_category(
+    tmp_path: Path,
+) -> None:
+    old = tmp_path / "before-categorization.csv"
+    new = tmp_path / "categorized.csv"
+    _frame().write_csv(old)
+    _frame().with_columns(
+        pl.lit("食費").alias("category"), pl.lit(None, pl.Utf8).alias("sub_category")
+    ).write_csv(new)
+
+    only_old = aggregate(scan_normalized_csv([old]), QueryFilter(), ["category"])
+    mixed = aggregate(scan_normalized_csv([old, new]), QueryFilter(), ["category"])
+
+    assert only_old["category"].to_list() == [None]
+    assert only_old["transaction_count"].to_list() == [5]
+    assert mixed["category"].to_list() == [None, "食費"]
+    assert mixed["transaction_count"].to_list() == [5, 5]
+
+
+def test_query_command_prints_no_descriptions(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from src.kakeibo.config import settings
+
+    monkeypatch.setattr(settings, "ledger_dir", tmp_path / "ledger")
+    Ledger(settings.ledger_dir).append(_frame())
+
+    result = CliRunner().invoke(
+        app,
+        ["query", "--description-contains", "Cafe", "--group-by", "source"],
+    )
+
+    assert result.exit_code == 0
+    assert "card" in result.output
+    assert "Cafe" not in result.output
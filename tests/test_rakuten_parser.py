@@ -0,0 +1,152 @@
+import random
+
+import pytest
+
+from benchmarks.rakuten_html import run_case, synthetic_rakuten_bundle
+from src.kakeibo.commerce_history.parsers import parse_rakuten_bundle
+from src.kakeibo.commerce_history.parsers.rakuten_jp import (
+    _OrderEvidence,
+    _RakutenOrderHTMLParser,
+    _scan_order_html,
+)
+
+_ROW = "flex-row-start--1GHo9 padding-all-xlarge--1DSZs"
+
+TRICKY_PAGES = [
+    # Entities, comments, a stray "<", uppercase tags and self-closing divs.
+    (
+        "<!DOCTYPE html><DIV CLASS='shop'><A HREF='/s?l-id=ph_pc_shopname&amp;x=1'>"
+        "Shop &lt;A&gt; &#x3042;</A></DIV>"
+        f'<div class="{_ROW}"><!-- <div> --><div/>'
+        "<a href='https://item.rakuten.co.jp/x/?s-id=ph_pc_itemname'>Item 1 < 2</a>"
+        "<div class=\"value--21p0x\" data-note='a > b'>1,200<span>円</span></div>"
+        "<a href=https://my.bookmark.rakuten.co.jp/?shop_bid=1&amp;iid=2>fav</a>"
+        "</div>"
+    ),
+    # Script and style bodies, bogus comments and attributes without values.
+    (
+        "<style>div{}</style><script>if(a<b){'</div>'}</SCRIPT>"
+        '<a hidden href="/?l-id=ph_pc_shopname">Shop</a></a>'
+        f'<div class="{_ROW} extra" hidden><? pi ?></ br>'
+        "<div class=value--21p0x>&yen;980</div>"
+        "<a href='/?s-id=ph_pc_itemname'>unclosed item"
+        "</div>"
+    ),
+    # Markup that an idle scan must not mistake for an item row.
+    (
+        f"<img alt='<div class=\"{_ROW}\">'><p>text</p>"
+        f'<div data-x="/" class="{_ROW}">'
+        '<div class="a/b"><div class=\'v\' title="value--21p0x">5</div></div>'
+        "<a>no href</a></div><div class='broken"
+    ),
+]
+
+
+# Fragments that the randomized test strings together and truncates.
+FRAGMENTS = [
+    f'<div class="{_ROW}">',
+    "<div class='value--21p0x'>",
+    "<div>",
+    "</div>",
+    "<div/>",
+    "<a href='/?l-id=ph_pc_shopname&amp;x=1'>",
+    "<a href='https://item.rakuten.co.jp/x/?s-id=ph_pc_itemname'>",
+    "<a href=https://my.bookmark.rakuten.co.jp/?shop_bid=1&amp;iid=2>",
+    "</a>",
+    "<span>円</span>",
+    "Shop &lt;A&gt; ",
+    "&#x3042;",
+    "&yen;980",
+    "1,200",
+    " < 2",
+    "a > b",
+    "&",
+    "<!-- note -->",
+    "<script>if(a<b){'</div>'}</script>",
+    "<br/>",
+]
+
+
+def _reference(markup: str) -> _OrderEvidence:
+    # parse_rakuten_record fed the whole page without close(), so a truncated
+    # tag or character reference at the end was never reported.
+    parser = _RakutenOrderHTMLParser()
+    parser.feed(markup)
+    return parser.evidence
+
+
+@pytest.mark.parametrize("markup", TRICKY_PAGES)
+def test_tokenizer_matches_html_parser_on_tricky_markup(markup: str) -> None:
+    expected = _reference(markup)
+    actual = _scan_order_html(markup)
+
+    assert actual.items == expected.items
+    assert actual.shop_texts == expected.shop_texts
+    assert expected.items or expected.shop_texts
+
+
+def test_tokenizer_matches_html_parser_on_synthetic_bundle() -> None:
+    bundle = synthetic_rakuten_bundle(200, seed=3)
+
+    for record in bundle["records"]:
+        expected = _reference(record["rendered_html"])
+        actual = _scan_order_html(record["rendered_html"])
+        assert actual.items == expected.items
+        assert actual.shop_texts == expected.shop_texts
+
+
+_SHOP = "<a href='/?l-id=ph_pc_shopname'>Shop"
+
+
+@pytest.mark.parametrize(
+    ("markup", "shop_texts"),
+    [
+        (f"{_SHOP} <scr", ["Shop"]),
+        (f"{_SHOP} <", ["Shop"]),
+        (f"{_SHOP} <!-- open </a>", ["Shop"]),
+        (f"{_SHOP} &amp", []),
+    ],
+)
+def test_tokenizer_holds_back_a_truncated_tail(
+    markup: str, shop_texts: list[str]
+) -> None:
+    assert _reference(markup).shop_texts == shop_texts
+    assert _scan_order_html(markup).shop_texts == shop_texts
+
+
+def test_tokenizer_matches_html_parser_on_random_truncated_markup() -> None:
+    rng = random.Random(49)
+    pages = TRICKY_PAGES + [
+        record["rendered_html"]
+        for record in synthetic_rakuten_bundle(20, seed=6)["records"]
+    ]
+
+    for _ in range(2000):
+        if rng.random() < 0.5:
+            markup = rng.choice(pages)
+        else:
+            markup = "".join(rng.choices(FRAGMENTS, k=rng.randint(1, 30)))
+        markup = markup[: rng.randint(0, len(markup))]
+
+        expected = _reference(markup)
+        actual = _scan_order_html(markup)
+        assert actual.items == expected.items, markup
+        assert actual.shop_texts == expected.shop_texts, markup
+
+
+def test_synthetic_bundle_parses_and_is_deterministic() -> None:
+    first = synthetic_rakuten_bundle(50, seed=5)
+
+    parsed = parse_rakuten_bundle(first)
+
+    assert first == synthetic_rakuten_bundle(50, seed=5)
+    assert len(parsed) == 50
+    assert all(record.items for record in parsed)
+
+
+def test_run_case_reports_records_per_second() -> None:
+    case = run_case(20)
+
+    assert case["records"] == 20
+    for engine in ("html_parser", "tokenizer", "bundle_parse"):
+        assert case[engine]["records_per_second"] > 0
@@ -0,0 +1,264 @@
+import json
+import random
+import subprocess
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import polars as pl
+from typer.testing import CliRunner
+
+from src.kakeibo.cli import app
+from src.kakeibo.commerce_history.hashing import raw_record_sha256
+from src.kakeibo.commerce_history.parsers import parse_rakuten_bundle
+from src.kakeibo.commerce_history.reconciliation import (
+    LINK_SCHEMA,
+    orders_frame,
+    reconcile_card_orders,
+    summarize_links,
+)
+from src.kakeibo.domain.categorization import CATEGORIZED_SCHEMA
+
+
+def _card(rows: list[tuple[date, int]], source: str = "enavi") -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "transaction_date": [day for day, _ in rows],
+            "amount": [amount for _, amount in rows],
+            "description": ["synthetic"] * len(rows),
+            "balance": [None] * len(rows),
+            "memo": [None] * len(rows),
+            "source": [source] * len(rows),
+            "category": [None] * len(rows),
+            "sub_category": [None] * len(rows),
+        },
+        schema=CATEGORIZED_SCHEMA,
+    )
+
+
+def _orders(rows: list[tuple[str, date, int]]) -> pl.DataFrame:
+    return pl.DataFrame(
+        rows,
+        schema={"order_id": pl.Utf8, "order_date": pl.Date, "amount": pl.Int64},
+        orient="row",
+    )
+
+
+def _rakuten_record(order_id: str, order_date: date, prices: list[int]) -> dict:
+    items = "".join(
+        '<div class="flex-row-start--1GHo9 padding-all-xlarge--1DSZs">'
+        f'<a href="https://item.rakuten.co.jp/shop/{index}/?s-id=ph_pc_itemname">'
+        f"Synthetic item {index}</a>"
+        f'<a href="https://my.bookmark.rakuten.co.jp/?shop_bid=1&iid={index}">'
+        "お気に入りに追加する</a>"
+        f'<div class="value--21p0x">{price:,}</div><span>円</span>'
+        "</div>"
+        for index, price in enumerate(prices, start=1)
+    )
+    html = (
+        '<a href="https://www.rakuten.co.jp/shop/?l-id=ph_pc_shopname">'
+        f"Synthetic Shop</a>{items}"
+    )
+    text = f"注文日：{order_date:%Y/%m/%d} 注文番号：{order_id}"
+    return {
+        "source": "rakuten.co.jp",
+        "captured_at": "2026-08-10T00:00:00Z",
+        "partition": str(order_date.year),
+        "page": "1",
+        "record_position": 1,
+        "source_page_url": "https://order.my.rakuten.co.jp/",
+        "rendered_html": html,
+        "rendered_text": text,
+        "raw_record_sha256": raw_record_sha256(rendered_html=html, rendered_text=text),
+    }
+
+
+def test_links_nearest_order_of_equal_amount_within_tolerance() -> None:
+    card = _card(
+        [
+            (date(2026, 1, 2), -1000),
+            (date(2026, 1, 3), -1000),
+            (date(2026, 1, 10), -500),
+            (date(2026, 1, 4), 1000),
+        ]
+    )
+    orders = _orders(
+        [
+            ("A", date(2026, 1, 1), 1000),
+            ("B", date(2026, 1, 3), 1000),
+            ("C", date(2026, 1, 20), 500),
+        ]
+    )
+
+    links = reconcile_card_orders(card, orders, tolerance_days=3)
+
+    assert links.schema == LINK_SCHEMA
+    assert links.select("card_row", "order_id", "day_gap").rows() == [
+        (0, "A", 1),
+        (1, "B", 0),
+    ]
+    assert links["confidence"].to_list() == [0.75, 1.0]
+    summary = summarize_links(card, orders, links)
+    assert (summary.linked, summary.unmatched_card_rows, summary.unmatched_orders) == (
+        2,
+        1,
+        1,
+    )
+
+
+def test_each_order_and_card_row_is_linked_at_most_once() -> None:
+    card = _card([(date(2026, 2, 1), -300)] * 3)
+    orders = _orders(
+        [("A", date(2026, 2, 1), 300), ("B", date(2026, 2, 2), 300)],
+    )
+
+    links = reconcile_card_orders(card, orders)
+
+    assert links["order_id"].sort().to_list() == ["A", "B"]
+    assert links["card_row"].n_unique() == 2
+
+
+def test_rows_competing_for_one_amount_link_in_a_single_sweep() -> None:
+    days = [date(2026, 2, 1 + offset % 20) for offset in range(2000)]
+    card = _card([(day, -300) for day in days])
+    orders = _orders([(f"O{index}", day, 300) for index, day in enumerate(days)])
+
+    links = reconcile_card_orders(card, orders, tolerance_days=0)
+
+    assert links.height == 2000
+    assert links["order_id"].n_unique() == 2000
+    assert links["day_gap"].abs().max() == 0
+
+
+def test_earlier_order_is_taken_when_it_leaves_a_later_row_a_link() -> None:
+    card = _card([(date(2026, 5, 4), -800), (date(2026, 5, 5), -800)])
+    orders = _orders([("A", date(2026, 5, 1), 800), ("B", date(2026, 5, 4), 800)])
+
+    links = reconcile_card_orders(card, orders, tolerance_days=3)
+
+    assert links.select("card_row", "order_id", "day_gap").rows() == [
+        (0, "A", 3),
+        (1, "B", 1),
+    ]
+
+
+def _most_links(card_days: list[int], order_days: list[int], tolerance: int) -> int:
+    # Two-pointer reference for one amount: each card row takes the earliest
+    # order still in reach.
+    orders = sorted(order_days)
+    position = linked = 0
+    for day in sorted(card_days):
+        while position < len(orders) and orders[position] < day - tolerance:
+            position += 1
+        if position < len(orders) and orders[position] <= day + tolerance:
+            linked += 1
+            position += 1
+    return linked
+
+
+def test_link_count_matches_a_reference_greedy_on_random_histories() -> None:
+    rng = random.Random(40)
+    start = date(2026, 1, 1)
+    for _ in range(100):
+        tolerance = rng.randint(0, 4)
+        card_rows = [(rng.choice([300, 500]), rng.randrange(30)) for _ in range(30)]
+        order_rows = [(rng.choice([300, 500]), rng.randrange(30)) for _ in range(30)]
+        card = _card(
+            [(start + timedelta(days=day), -amount) for amount, day in card_rows]
+        )
+        orders = _orders(
+            [
+                (f"O{index:02d}", start + timedelta(days=day), amount)
+                for index, (amount, day) in enumerate(order_rows)
+            ]
+        )
+
+        links = reconcile_card_orders(card, orders, tolerance_days=tolerance)
+
+        expected = sum(
+            _most_links(
+                [day for amount, day in card_rows if amount == value],
+                [day for amount, day in order_rows if amount == value],
+                tolerance,
+            )
+            for value in (300, 500)
+        )
+        assert links.height == expected
+        assert links["order_id"].n_unique() == links["card_row"].n_unique() == expected
+        assert (links["day_gap"].abs() <= tolerance).all()
+
+
+def test_rows_left_open_by_the_pass_cap_stay_unlinked() -> None:
+    # The second row finds its window used up, so the third needs a new pass.
+    card = _card(
+        [(date(2026, 6, 1), -400), (date(2026, 6, 1), -400), (date(2026, 6, 9), -400)]
+    )
+    orders = _orders([("A", date(2026, 6, 1), 400), ("B", date(2026, 6, 9), 400)])
+
+    capped = reconcile_card_orders(card, orders, max_passes=1)
+    complete = reconcile_card_orders(card, orders)
+
+    assert capped.select("card_row", "order_id").rows() == [(0, "A")]
+    assert complete.select("card_row", "order_id").rows() == [(0, "A"), (2, "B")]
+
+
+def test_commerce_package_import_does_not_load_polars() -> None:
+    code = (
+        "import sys; import src.kakeibo.commerce_history; "
+        "raise SystemExit('polars' in sys.modules)"
+    )
+
+    assert subprocess.run([sys.executable, "-c", code], check=False).returncode == 0
+
+
+def test_other_sources_and_refunds_are_not_matched() -> None:
+    card = _card([(date(2026, 3, 1), -700)], source="sony")
+    orders = _orders([("A", date(2026, 3, 1), 700)])
+
+    assert reconcile_card_orders(card, orders).is_empty()
+
+
+def test_orders_frame_uses_visible_item_price_sum() -> None:
+    bundle = {
+        "capture_status": "PASS",
+        "records": [_rakuten_record("100-1", date(2026, 4, 5), [1200, 300])],
+    }
+
+    frame = orders_frame(parse_rakuten_bundle(bundle))
+
+    assert frame.rows() == [("100-1", date(2026, 4, 5), 1500)]
+
+
+def test_reconcile_command_writes_links_and_prints_counts(tmp_path: Path) -> None:
+    card_path = tmp_path / "card.csv"
+    _card([(date(2026, 4, 6), -1500)]).write_csv(card_path)
+    bundle_path = tmp_path / "bundle.json"
+    bundle_path.write_text(
+        json.dumps(
+            {
+                "capture_status": "PASS",
+                "records": [_rakuten_record("100-1", date(2026, 4, 5), [1500])],
+            },
+            ensure_ascii=False,
+        ),
+        encoding="utf-8",
+    )
+    output_dir = tmp_path / "out"
+
+    result = CliRunner().invoke(
+        app,
+        [
+            "reconcile",
+            str(card_path),
+            "--orders",
+            str(bundle_path),
+            "--output-dir",
+            str(output_dir),
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert "linked=1 unmatched_card_rows=0 unmatched_orders=0" in result.output
+    assert "100-1" not in result.output
+    (written,) = output_dir.iterdir()
+    assert written.name.startswith("reconciliation-")
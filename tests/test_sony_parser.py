@@ -0,0 +1,72 @@
+import io
+import tracemalloc
+from pathlib import Path
+
+import polars as pl
+
+from benchmarks.synthetic import write_statement
+from src.kakeibo.adapters.parsers.sony import SonyBankParser
+from src.kakeibo.ports.parser import RAW_SCHEMA
+
+
+def test_path_bytes_and_stream_sources_parse_identically(tmp_path: Path) -> None:
+    path = write_statement("sony", 120, tmp_path / "synthetic.txt")
+    payload = path.read_bytes()
+    parser = SonyBankParser()
+
+    expected = parser.parse(path, "utf-8-sig")
+    stream = io.BytesIO(payload)
+
+    assert expected.height == 120
+    assert expected.schema == pl.Schema(RAW_SCHEMA)
+    assert parser.parse(payload, "utf-8-sig").equals(expected)
+    assert parser.parse(stream, "utf-8-sig").equals(expected)
+    assert not stream.closed
+
+
+def test_only_dated_lines_become_rows() -> None:
+    payload = (
+        "\n"
+        "header without a date\n"
+        "2026年8月1日 振込 1,000円 synthetic deposit 5,000円\r\n"
+        "2026年8月2日 ATM 300円 synthetic withdrawal 4,700円\n"
+    ).encode()
+
+    df = SonyBankParser().parse(payload, "utf-8-sig")
+
+    assert df.get_column("raw_date").to_list() == ["2026年8月1日", "2026年8月2日"]
+    assert df.get_column("raw_deposit").to_list() == [None, None]
+    assert df.get_column("raw_withdrawal").to_list() == ["1,000円", "300円"]
+    assert df.get_column("raw_balance").to_list() == ["5,000円", "4,700円"]
+
+
+def test_batches_are_bounded_and_concatenate_to_parse(tmp_path: Path) -> None:
+    path = write_statement("sony", 250, tmp_path / "synthetic.txt")
+    parser = SonyBankParser()
+
+    batches = list(parser.iter_batches(path, "utf-8-sig", 100))
+
+    assert [batch.height for batch in batches] == [100, 100, 50]
+    assert pl.concat(batches).equals(parser.parse(path, "utf-8-sig"))
+    assert list(parser.iter_batches(b"", "utf-8-sig", 100)) == []
+    assert parser.parse(b"", "utf-8-sig").schema == pl.Schema(RAW_SCHEMA)
+
+
+def test_batched_parsing_memory_does_not_scale_with_file_size(
+    tmp_path: Path,
+) -> None:
+    path = write_statement("sony", 20_000, tmp_path / "synthetic.txt")
+    size = path.stat().st_size
+
+    tracemalloc.start()
+    try:
+        rows = sum(
+            batch.height
+            for batch in SonyBankParser().iter_batches(path, "utf-8-sig", 500)
+        )
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert rows == 20_000
+    assert peak < size / 2
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import hashlib
+import io
+import tarfile
 from pathlib import Path
+from typing import BinaryIO
 
 import pytest
 from fastapi.testclient import TestClient
@@ -15,9 +19,13 @@ from src.kakeibo.adapters.parsers.sony import SonyBankParser
 from src.kakeibo.api import app
 from src.kakeibo.config import settings
 from src.kakeibo.statement_types import (
+    CONTENT_OVER_FILENAME_CONFIDENCE,
+    DETECTION_BYTES,
     InvalidStatementSuffix,
     UnknownStatementType,
+    detect_statement_type,
     infer_statement_type,
+    sniff_statement_type,
     statement_spec,
 )
 from src.kakeibo.use_cases.process_file import ProcessFileUseCase
@@ -89,10 +97,12 @@ def test_api_preserves_explicit_type_without_original_filename(
         output_dir: Path | None = None,
         *,
         source_type: str | None = None,
+        content: bytes | None = None,
     ) -> bool:
         del self, output_dir
         captured["temporary_name"] = file_path.name
         captured["source_type"] = source_type
+        captured["in_memory"] = content is not None and not file_path.exists()
         return True
 
     monkeypatch.setattr(ProcessFileUseCase, "execute", fake_execute)
@@ -111,6 +121,7 @@ def test_api_preserves_explicit_type_without_original_filename(
     assert captured == {
         "temporary_name": "upload.csv",
         "source_type": statement_type,
+        "in_memory": True,
     }
     assert "transaction-history.csv" not in response.text
     assert "enavi" not in response.text or statement_type == "enavi"
@@ -135,3 +146,290 @@ def test_api_rejects_unknown_or_incompatible_contract(api_client: TestClient) ->
     assert incompatible.status_code == 415
     assert "synthetic" not in unknown.text
     assert "synthetic" not in incompatible.text
+
+
+def test_api_hashes_upload_and_spills_only_past_spool_limit(
+    api_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    body = b"Date,Description,Amount\n2026-08-01,synthetic,100\n"
+    captured: dict[str, object] = {}
+
+    def fake_execute(
+        self: ProcessFileUseCase,
+        file_path: Path,
+        output_dir: Path | None = None,
+        *,
+        source_type: str | None = None,
+        content: bytes | None = None,
+    ) -> bool:
+        del self, output_dir, source_type
+        captured["content"] = content
+        captured["on_disk"] = file_path.read_bytes() if file_path.exists() else None
+        return True
+
+    monkeypatch.setattr(ProcessFileUseCase, "execute", fake_execute)
+    monkeypatch.setattr(settings, "upload_spool_bytes", 8)
+    response = api_client.post(
+        "/process",
+        content=body,
+        headers={
+            "X-API-Key": "x" * 32,
+            "X-File-Suffix": ".csv",
+            "X-Statement-Type": "transaction",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["input_sha256"] == hashlib.sha256(body).hexdigest()
+    assert captured == {"content": None, "on_disk": body}
+
+
+SYNTHETIC_BODIES = {
+    "sony": "2026年8月1日 振込 1,000円 synthetic 5,000円\n".encode(),
+    "enavi": "\ufeff利用日,利用店名・商品名,支払総額\n2026/08/01,synthetic,100\n".encode(),
+    "aplus": "\ufeff利用日,利用店名,支払金額\n2026/08/01,synthetic,100\n".encode(),
+    "transaction": b"Date,Description,Amount\n2026-08-01,synthetic,100\n",
+    "generic": "日付,摘要,出金\n2026/08/01,synthetic,100\n".encode("shift_jis"),
+}
+
+
+def _tar_member(body: bytes) -> BinaryIO:
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode="w") as writer:
+        info = tarfile.TarInfo("member")
+        info.size = len(body)
+        writer.addfile(info, io.BytesIO(body))
+    archive.seek(0)
+    member = tarfile.open(fileobj=archive, mode="r").extractfile("member")
+    assert member is not None
+    return member
+
+
+@pytest.mark.parametrize("statement_type", sorted(SYNTHETIC_BODIES))
+@pytest.mark.parametrize("source_kind", ["bytes", "stream", "archive"])
+def test_parsers_read_bytes_and_streams_like_files(
+    tmp_path: Path,
+    statement_type: str,
+    source_kind: str,
+) -> None:
+    body = SYNTHETIC_BODIES[statement_type]
+    suffix = ".txt" if statement_type == "sony" else ".csv"
+    spec = statement_spec(statement_type, suffix)
+    path = tmp_path / f"upload{suffix}"
+    path.write_bytes(body)
+    parser = spec.parser_factory()
+    sources: dict[str, bytes | BinaryIO] = {
+        "bytes": body,
+        "stream": io.BytesIO(body),
+        "archive": _tar_member(body),
+    }
+
+    from_path = parser.parse(path, spec.encoding)
+    from_source = parser.parse(sources[source_kind], spec.encoding)
+
+    assert from_source.height == 1
+    assert from_source.get_column("raw_date").null_count() == 0
+    assert from_source.equals(from_path)
+
+
+def _batch_archive(parts: list[tuple[dict[str, str], bytes]]) -> bytes:
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode="w", format=tarfile.PAX_FORMAT) as writer:
+        for index, (headers, body) in enumerate(parts):
+            info = tarfile.TarInfo(f"private-statement-name-{index}")
+            info.size = len(body)
+            info.pax_headers = headers
+            writer.addfile(info, io.BytesIO(body))
+    return archive.getvalue()
+
+
+def test_batch_endpoint_reports_per_part_outcomes(api_client: TestClient) -> None:
+    archive = _batch_archive(
+        [
+            (
+                {"X-Statement-Type": "transaction", "X-File-Suffix": ".csv"},
+                SYNTHETIC_BODIES["transaction"],
+            ),
+            (
+                {"X-Statement-Type": "sony", "X-File-Suffix": ".txt"},
+                SYNTHETIC_BODIES["sony"],
+            ),
+            (
+                {"X-Statement-Type": "unknown", "X-File-Suffix": ".csv"},
+                SYNTHETIC_BODIES["transaction"],
+            ),
+            (
+                {"X-Statement-Type": "sony", "X-File-Suffix": ".csv"},
+                SYNTHETIC_BODIES["transaction"],
+            ),
+            (
+                {"X-Statement-Type": "transaction", "X-File-Suffix": ".csv"},
+                b"",
+            ),
+        ]
+    )
+
+    response = api_client.post(
+        "/process-batch",
+        content=archive,
+        headers={"X-API-Key": "x" * 32, "Content-Type": "application/x-tar"},
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["processed_files"] == 2
+    assert payload["rejected_files"] == 3
+    assert payload["failed_files"] == 0
+    assert payload["input_sha256"] == hashlib.sha256(archive).hexdigest()
+    assert [part["status"] for part in payload["parts"]] == [
+        "processed",
+        "processed",
+        "rejected",
+        "rejected",
+        "rejected",
+    ]
+    assert payload["parts"][0]["input_sha256"] == (
+        hashlib.sha256(SYNTHETIC_BODIES["transaction"]).hexdigest()
+    )
+    assert payload["parts"][2]["detail"] == "Unsupported statement type"
+    assert payload["parts"][3]["detail"] == (
+        "Statement type and suffix are incompatible"
+    )
+    assert "private-statement-name" not in response.text
+    assert "synthetic" not in response.text
+
+
+def test_batch_endpoint_enforces_limits(
+    api_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    headers = {"X-API-Key": "x" * 32}
+    part = (
+        {"X-Statement-Type": "transaction", "X-File-Suffix": ".csv"},
+        SYNTHETIC_BODIES["transaction"],
+    )
+
+    not_tar = api_client.post("/process-batch", content=b"x" * 2048, headers=headers)
+    assert not_tar.status_code == 400
+
+    monkeypatch.setattr(settings, "max_batch_files", 1)
+    too_many = api_client.post(
+        "/process-batch", content=_batch_archive([part, part]), headers=headers
+    )
+    assert too_many.status_code == 413
+
+    monkeypatch.setattr(settings, "max_upload_bytes", 8)
+    oversized = api_client.post(
+        "/process-batch", content=_batch_archive([part]), headers=headers
+    )
+    assert oversized.status_code == 200
+    assert oversized.json()["parts"][0]["detail"] == (
+        "Upload exceeds the configured size limit"
+    )
+
+    unauthenticated = api_client.post("/process-batch", content=b"x")
+    assert unauthenticated.status_code == 401
+
+
+def test_batch_members_are_copied_to_disk_without_buffering(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    import tracemalloc
+
+    from src.kakeibo.api import _read_batch_parts
+
+    body = b"2026/01/01,Synthetic,1\n" * 400_000
+    archive_path = tmp_path / "batch.tar"
+    archive_path.write_bytes(
+        _batch_archive(
+            [({"X-Statement-Type": "transaction", "X-File-Suffix": ".csv"}, body)]
+        )
+    )
+    input_dir = tmp_path / "parts"
+    input_dir.mkdir()
+    monkeypatch.setattr(settings, "max_upload_bytes", len(body))
+
+    tracemalloc.start()
+    try:
+        (part,) = _read_batch_parts(archive_path, input_dir)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert part.path is not None and part.path.read_bytes() == body
+    assert part.path.name == "part-001.csv"
+    assert part.sha256 == hashlib.sha256(body).hexdigest()
+    assert peak < len(body) // 2
+
+
+_CARD_COLUMNS = "利用日,利用店名・商品名,利用者,支払方法,利用金額,支払手数料"
+DETECTION_HEADS = {
+    "sony": (".txt", "2026年8月1日 振込 1,000円 synthetic 5,000円\n".encode()),
+    "enavi": (
+        ".csv",
+        f"\ufeff{_CARD_COLUMNS},支払総額\n2026/08/01,synthetic,本人,1回払い,100,0,100\n".encode(),
+    ),
+    "aplus": (
+        ".csv",
+        f"\ufeff{_CARD_COLUMNS},支払金額\n2026/08/01,synthetic,本人,1回払い,100,0,100\n".encode(),
+    ),
+    "transaction": (".csv", b"Date,Description,Amount\n2026-08-01,synthetic,100\n"),
+    "generic": (
+        ".csv",
+        "日付,摘要,出金\n2026/08/01,synthetic,100\n".encode("shift_jis"),
+    ),
+}
+
+
+@pytest.mark.parametrize("statement_type", sorted(DETECTION_HEADS))
+def test_content_detection_ignores_misleading_names(
+    tmp_path: Path, statement_type: str
+) -> None:
+    suffix, head = DETECTION_HEADS[statement_type]
+    path = tmp_path / f"renamed{suffix}"
+    path.write_bytes(head)
+
+    detection = detect_statement_type(head, suffix)
+
+    assert detection.statement_type == statement_type
+    assert detection.confidence >= CONTENT_OVER_FILENAME_CONFIDENCE
+    assert ProcessFileUseCase().detect_source_type(path) == statement_type
+
+
+def test_header_with_extra_and_renamed_columns_is_still_detected(
+    tmp_path: Path,
+) -> None:
+    # One column renamed and two added, as a newer export might do.
+    head = (
+        "\ufeff利用日,利用店名・商品名,利用者,支払区分,利用金額,支払手数料,"
+        "支払総額,備考,ポイント\n2026/08/01,synthetic,本人,1回払い,100,0,100,,1\n"
+    ).encode()
+    path = tmp_path / "transaction-history.csv"
+    path.write_bytes(head)
+
+    detection = detect_statement_type(head, ".csv")
+
+    assert detection.statement_type == "enavi"
+    assert detection.confidence >= CONTENT_OVER_FILENAME_CONFIDENCE
+    assert sniff_statement_type(path) == "enavi"
+
+
+def test_content_detection_reads_only_the_leading_bytes() -> None:
+    _, head = DETECTION_HEADS["enavi"]
+    # Bytes past the detection window cannot change the outcome.
+    padded = head * 40 + b"\xff" * (10 * DETECTION_BYTES)
+    assert detect_statement_type(padded, ".csv") == detect_statement_type(
+        padded[: DETECTION_BYTES + 1], ".csv"
+    )
+
+
+def test_unrecognized_content_falls_back_to_filename(tmp_path: Path) -> None:
+    notes = tmp_path / "notes.txt"
+    notes.write_text("memo\nanother line\n", encoding="utf-8")
+    assert detect_statement_type(notes.read_bytes(), ".txt").statement_type is None
+    assert sniff_statement_type(notes) is None
+
+    named = tmp_path / "sony_202608.txt"
+    named.write_bytes(b"")
+    assert sniff_statement_type(named) == "sony"
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from benchmarks.synthetic import write_statement
+from src.kakeibo.domain.models import Transaction
+from src.kakeibo.ports.parser import StatementSource
+from src.kakeibo.ports.repository import TransactionRepositoryPort
+from src.kakeibo.use_cases.process_file import ProcessFileUseCase, ProcessingPlan
+from src.kakeibo.use_cases.sync_repository import SyncRepositoryUseCase
+
+
+class RecordingRepository(TransactionRepositoryPort):
+    def __init__(self, delay: float = 0.0, fail: bool = False) -> None:
+        self.delay = delay
+        self.fail = fail
+        self.batches: list[int] = []
+
+    def save_bulk(self, transactions: list[Transaction]) -> int:
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("synthetic outage")
+        self.batches.append(len(transactions))
+        return len(transactions)
+
+
+class CountingUseCase(ProcessFileUseCase):
+    """Counts produced batches to observe how far parsing runs ahead."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.produced = 0
+        self.lock = threading.Lock()
+
+    def iter_clean_batches(
+        self, plan: ProcessingPlan, source: StatementSource, batch_rows: int
+    ) -> Iterator[tuple[int, pl.DataFrame]]:
+        for item in super().iter_clean_batches(plan, source, batch_rows):
+            with self.lock:
+                self.produced += 1
+            yield item
+
+
+def _statements(tmp_path: Path, count: int, rows: int) -> list[tuple[Path, str]]:
+    return [
+        (
+            write_statement(
+                "transaction", rows, tmp_path / f"synthetic-{index}.csv", seed=index
+            ),
+            "transaction",
+        )
+        for index in range(count)
+    ]
+
+
+def test_sync_uploads_every_batch_and_skips_failed_files(tmp_path: Path) -> None:
+    files = _statements(tmp_path, 3, 40)
+    mismatched = tmp_path / "synthetic.txt"
+    mismatched.write_bytes(b"")
+    repository = RecordingRepository()
+
+    result = SyncRepositoryUseCase(
+        repository, batch_rows=15, parse_workers=2, queue_batches=2
+    ).run([*files, (mismatched, "transaction")])
+
+    assert result.files == 4
+    assert result.failed_files == 1
+    assert result.parsed_rows == result.saved_rows == 120
+    assert sorted(repository.batches) == sorted([15, 15, 10] * 3)
+
+
+def test_parsing_is_throttled_by_the_uploader(tmp_path: Path) -> None:
+    files = _statements(tmp_path, 2, 100)
+    use_case = CountingUseCase()
+    ahead: list[int] = []
+
+    class SlowRepository(RecordingRepository):
+        def save_bulk(self, transactions: list[Transaction]) -> int:
+            # Batches produced but not yet uploaded, including this one.
+            ahead.append(use_case.produced - len(self.batches))
+            return super().save_bulk(transactions)
+
+    repository = SlowRepository(delay=0.01)
+    result = SyncRepositoryUseCase(
+        repository, use_case, batch_rows=10, parse_workers=2, queue_batches=1
+    ).run(files)
+
+    assert result.saved_rows == 200
+    assert len(repository.batches) == 20
+    # One queued batch, one being uploaded, and one pending put per worker.
+    assert max(ahead) <= 1 + 1 + 2
+
+
+def test_upload_failure_stops_parse_workers(tmp_path: Path) -> None:
+    files = _statements(tmp_path, 2, 100)
+    use_case = CountingUseCase()
+
+    with pytest.raises(ConnectionError):
+        SyncRepositoryUseCase(
+            RecordingRepository(fail=True),
+            use_case,
+            batch_rows=10,
+            parse_workers=1,
+            queue_batches=1,
+        ).run(files)
+
+    assert use_case.produced < 20
+
+
+def test_late_validation_failure_is_reported_as_partial(tmp_path: Path) -> None:
+    files = _statements(tmp_path, 2, 30)
+
+    class LateFailure(ProcessFileUseCase):
+        def __init__(self) -> None:
+            super().__init__()
+            self.cache_saves = 0
+
+        def iter_clean_batches(
+            self, plan: ProcessingPlan, source: StatementSource, batch_rows: int
+        ) -> Iterator[tuple[int, pl.DataFrame]]:
+            for index, item in enumerate(
+                super().iter_clean_batches(plan, source, batch_rows)
+            ):
+                if source == files[0][0] and index == 1:
+                    raise ValueError("synthetic invalid row")
+                yield item
+
+        def save_category_cache(self) -> None:
+            self.cache_saves += 1
+
+    use_case = LateFailure()
+    repository = RecordingRepository()
+
+    result = SyncRepositoryUseCase(
+        repository, use_case, batch_rows=10, parse_workers=1, queue_batches=4
+    ).run(files)
+
+    assert result.partial_files == 1
+    assert result.failed_files == 0
+    assert result.parsed_rows == result.saved_rows == 10 + 30
+    assert use_case.cache_saves == 1
@@ -0,0 +1,205 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from benchmarks.synthetic import write_statement
+from src.kakeibo.ledger import Ledger
+from src.kakeibo.use_cases.process_file import ProcessFileUseCase
+from src.kakeibo.watch import InotifyBackend, ProcessedSet, StatementWatcher
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def private_dirs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    from src.kakeibo.config import settings
+
+    monkeypatch.setattr(settings, "output_dir", tmp_path / "out")
+    monkeypatch.setattr(settings, "category_rules_path", tmp_path / "absent.json")
+    (tmp_path / "incoming").mkdir()
+    return tmp_path
+
+
+def _watcher(root: Path, clock: _Clock, ledger: Ledger | None = None):
+    return StatementWatcher(
+        root / "incoming",
+        ProcessFileUseCase(ledger=ledger),
+        ProcessedSet(root / "state" / "processed.json"),
+        settle_seconds=2.0,
+        clock=clock,
+    )
+
+
+def test_statement_is_processed_once_after_it_settles(private_dirs: Path) -> None:
+    clock = _Clock()
+    ledger = Ledger(private_dirs / "ledger")
+    watcher = _watcher(private_dirs, clock, ledger)
+    write_statement("generic", 5, private_dirs / "incoming" / "synthetic.csv")
+
+    assert watcher.scan_once() == 0
+    clock.now = 1.0
+    assert watcher.scan_once() == 0
+    clock.now = 2.5
+    assert watcher.scan_once() == 1
+    clock.now = 10.0
+    assert watcher.scan_once() == 0
+
+    assert len(list((private_dirs / "out").iterdir())) == 1
+    assert ledger.scan().collect().height == 5
+
+
+def test_growing_file_restarts_the_settle_window(private_dirs: Path) -> None:
+    clock = _Clock()
+    watcher = _watcher(private_dirs, clock)
+    statement = private_dirs / "incoming" / "synthetic.csv"
+    write_statement("generic", 5, statement)
+    watcher.scan_once()
+
+    clock.now = 1.5
+    with statement.open("a", encoding="utf-8") as handle:
+        handle.write("2026/01/31,Synthetic,1\n")
+    os.utime(statement, ns=(1, 1))
+    clock.now = 2.5
+    assert watcher.scan_once() == 0
+    clock.now = 5.0
+    assert watcher.scan_once() == 1
+
+
+def test_restart_skips_handled_files_and_state_has_no_names(
+    private_dirs: Path,
+) -> None:
+    clock = _Clock()
+    write_statement("generic", 5, private_dirs / "incoming" / "synthetic.csv")
+    (private_dirs / "incoming" / "notes.txt").write_text("x", encoding="utf-8")
+    watcher = _watcher(private_dirs, clock)
+    watcher.scan_once()
+    clock.now = 3.0
+    assert watcher.scan_once() == 1
+
+    restart_clock = _Clock()
+    restarted = _watcher(private_dirs, restart_clock)
+    restarted.scan_once()
+    restart_clock.now = 3.0
+    assert restarted.scan_once() == 0
+    assert not restarted.has_pending
+
+    state = (private_dirs / "state" / "processed.json").read_text(encoding="utf-8")
+    assert "synthetic" not in state and "notes" not in state
+    assert len(ProcessedSet(private_dirs / "state" / "processed.json")) == 2
+
+
+def test_failed_statement_is_retried_after_another_settle_window(
+    private_dirs: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    clock = _Clock()
+    watcher = _watcher(private_dirs, clock)
+    write_statement("generic", 5, private_dirs / "incoming" / "synthetic.csv")
+    results = iter([False, True])
+    monkeypatch.setattr(
+        watcher.use_case, "execute", lambda *args, **kwargs: next(results)
+    )
+
+    watcher.scan_once()
+    clock.now = 2.5
+    assert watcher.scan_once() == 0
+    assert watcher.has_pending
+    assert len(watcher.processed) == 0
+    clock.now = 3.0
+    assert watcher.scan_once() == 0
+    clock.now = 5.0
+    assert watcher.scan_once() == 1
+    assert len(watcher.processed) == 1
+
+
+def test_statement_removed_before_processing_does_not_stop_the_scan(
+    private_dirs: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    clock = _Clock()
+    watcher = _watcher(private_dirs, clock)
+    statement = private_dirs / "incoming" / "synthetic.csv"
+    write_statement("generic", 5, statement)
+
+    def vanish(path: Path) -> str | None:
+        path.unlink()
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(watcher.use_case, "detect_source_type", vanish)
+    watcher.scan_once()
+    clock.now = 2.5
+
+    assert watcher.scan_once() == 0
+    assert len(watcher.processed) == 0
+    clock.now = 5.0
+    assert watcher.scan_once() == 0
+    assert not watcher.has_pending
+
+
+def test_failing_statement_backs_off_and_stops_after_max_attempts(
+    private_dirs: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    clock = _Clock()
+    watcher = _watcher(private_dirs, clock)
+    write_statement("generic", 5, private_dirs / "incoming" / "synthetic.csv")
+    attempts: list[float] = []
+
+    def fail(*args: object, **kwargs: object) -> bool:
+        attempts.append(clock.now)
+        return False
+
+    monkeypatch.setattr(watcher.use_case, "execute", fail)
+    for second in range(0, 200):
+        clock.now = float(second)
+        watcher.scan_once()
+
+    # Delays of one settle window, doubling: 2, 4, 8, 16 seconds.
+    assert attempts == [2.0, 4.0, 8.0, 16.0, 32.0]
+    assert not watcher.has_pending
+    assert len(watcher.processed) == 0
+
+
+def test_ledger_failure_removes_the_written_output(private_dirs: Path) -> None:
+    ledger_root = private_dirs / "ledger"
+    ledger_root.mkdir()
+    (ledger_root / "manifest.json").write_text(
+        '{"version": 1, "inputs": [], "partitions": {}}', encoding="utf-8"
+    )
+    statement = write_statement(
+        "generic", 5, private_dirs / "incoming" / "synthetic.csv"
+    )
+
+    use_case = ProcessFileUseCase(ledger=Ledger(ledger_root))
+
+    assert use_case.execute(statement, source_type="generic") is False
+    assert use_case.execute(statement, source_type="generic") is False
+    assert list((private_dirs / "out").iterdir()) == []
+
+
+@pytest.mark.parametrize("content", ["{not json", "[]", '{"processed": 3}'])
+def test_unreadable_state_file_starts_empty(tmp_path: Path, content: str) -> None:
+    state = tmp_path / "processed.json"
+    state.write_text(content, encoding="utf-8")
+
+    processed = ProcessedSet(state)
+
+    assert len(processed) == 0
+    processed.add("a" * 64)
+    assert len(ProcessedSet(state)) == 1
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify only")
+def test_inotify_backend_wakes_on_completed_write(tmp_path: Path) -> None:
+    backend = InotifyBackend(tmp_path)
+    try:
+        assert backend.wait(0.01) is False
+        (tmp_path / "arrived.csv").write_text("a\n", encoding="utf-8")
+        assert backend.wait(1.0) is True
+    finally:
+        backend.close()